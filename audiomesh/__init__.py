@@ -2,21 +2,166 @@
 
 from __future__ import annotations
 
+import asyncio
+import logging
 import os
+import select
 import shutil
 import signal
+import sqlite3
 import subprocess
-from typing import Dict
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from .latency import Profile, resolve_profile
+from .output import StreamMetrics, StreamOutput
+from .registry import (
+    ExitWatcher,
+    StreamRecord,
+    StreamRegistry,
+    is_alive,
+    open_pidfd,
+    process_start_ticks,
+)
+
+logger = logging.getLogger(__name__)
 
 
 class JackError(RuntimeError):
     """Raised when JACK interaction fails or a required tool is missing."""
 
 
+# Children of this process; every stream is also in the StreamRegistry.
 _PROCESSES: Dict[int, subprocess.Popen[bytes]] = {}
+# Streams started with :func:`start_stream_async`.
+_ASYNC_PROCESSES: Dict[int, asyncio.subprocess.Process] = {}
+_WAITERS: Dict[int, asyncio.Task[int]] = {}
+# Captured output of running streams, and of the last EXITED_OUTPUTS to exit.
+_OUTPUTS: Dict[int, StreamOutput] = {}
+_EXITED_OUTPUTS: OrderedDict[int, StreamOutput] = OrderedDict()
+_CAPTURES: Dict[int, asyncio.Task[None]] = {}
+_WATCHERS: List[StreamWatcher] = []
+
+# Seconds to wait after SIGTERM before sending SIGKILL.
+STOP_TIMEOUT = 5.0
+# Default number of streams started or stopped at once by the bulk API.
+BULK_CONCURRENCY = 16
+# Exited streams whose captured output is kept for inspection.
+EXITED_OUTPUTS = 64
+# jacktrip hub patch mode: every client hears all the others, not itself.
+# The server's own ports are left out, so the hub node joins as a client.
+HUB_PATCH = 2
+
+
+class StreamResult(NamedTuple):
+    """Outcome of one item of :func:`start_streams` or :func:`stop_streams`."""
+
+    pid: Optional[int]
+    error: Optional[str] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+# Absolute path of jacktrip, set by the first successful resolve_jacktrip().
+_JACKTRIP: Optional[str] = None
+
+
+def resolve_jacktrip(refresh: bool = False) -> str:
+    """Return the absolute path of ``jacktrip``.
+
+    The binary is looked up once (``AUDIOMESH_JACKTRIP`` overrides the
+    ``PATH`` search), checked to be executable and cached; pass
+    ``refresh=True`` to look it up again. Raises :class:`JackError` if it
+    cannot be found.
+    """
+
+    global _JACKTRIP
+    if _JACKTRIP is not None and not refresh:
+        return _JACKTRIP
+    override = os.environ.get("AUDIOMESH_JACKTRIP")
+    if override:
+        # shutil.which() only returns executables; check an explicit path.
+        if not os.access(override, os.X_OK):
+            raise JackError(f"jacktrip at {override} is not executable")
+        path: Optional[str] = os.path.abspath(override)
+    else:
+        path = shutil.which("jacktrip")
+    if path is None:
+        raise JackError("jacktrip not installed")
+    _JACKTRIP = path
+    return path
+
+
+def _jacktrip_command(peer_ip: str, source_name: str, *options: str) -> List[str]:
+    return [resolve_jacktrip(), "-C", peer_ip, "--clientname", source_name, *options]
 
 
-def start_stream(peer_ip: str, source_name: str) -> int:
+def _hub_command(*options: str) -> List[str]:
+    return [resolve_jacktrip(), "-S", "-p", str(HUB_PATCH), *options]
+
+
+def _profile_options(profile: Optional[Profile]) -> List[str]:
+    return profile.args() if profile is not None else []
+
+
+def _register(pid: int, peer_ip: str, source_name: str) -> None:
+    try:
+        with StreamRegistry() as registry:
+            registry.add(pid, peer_ip, source_name)
+    except (OSError, sqlite3.Error) as exc:
+        # The stream runs regardless; it just cannot be found by others.
+        logger.warning("could not register stream %d: %s", pid, exc)
+    for watcher in _WATCHERS:
+        watcher.loop.call_soon_threadsafe(watcher.watch, pid)
+
+
+def _forget(pid: int) -> None:
+    try:
+        with StreamRegistry() as registry:
+            registry.remove(pid)
+    except (OSError, sqlite3.Error) as exc:
+        logger.warning("could not unregister stream %d: %s", pid, exc)
+
+
+def _lookup(pid: int) -> StreamRecord:
+    """Remove and return the live registry record for ``pid``."""
+    try:
+        with StreamRegistry() as registry:
+            record = registry.get(pid)
+            if record is not None:
+                registry.remove(pid)
+    except (OSError, sqlite3.Error) as exc:
+        raise JackError(f"stream registry unavailable: {exc}") from exc
+    if record is None:
+        raise JackError(f"unknown stream {pid}")
+    return record
+
+
+def list_streams() -> List[StreamRecord]:
+    """Return every running stream on this host, whoever started it."""
+    try:
+        with StreamRegistry() as registry:
+            return registry.records()
+    except (OSError, sqlite3.Error) as exc:
+        raise JackError(f"stream registry unavailable: {exc}") from exc
+
+
+def start_stream(
+    peer_ip: str, source_name: str, profile: Union[str, Profile, None] = None
+) -> int:
     """Start a JACK network stream using ``jacktrip``.
 
     Parameters
@@ -25,6 +170,10 @@ def start_stream(peer_ip: str, source_name: str) -> int:
         Address of the remote JACK peer.
     source_name:
         Name for the local JACK client.
+    profile:
+        Latency profile name or :class:`~audiomesh.latency.Profile`;
+        ``"auto"`` measures the link to ``peer_ip`` first. ``None`` keeps
+        jacktrip's defaults.
 
     Returns
     -------
@@ -32,10 +181,8 @@ def start_stream(peer_ip: str, source_name: str) -> int:
         PID of the launched ``jacktrip`` process.
     """
 
-    if shutil.which("jacktrip") is None:
-        raise JackError("jacktrip not installed")
-
-    cmd = ["jacktrip", "-C", peer_ip, "--clientname", source_name]
+    options = _profile_options(resolve_profile(profile, peer_ip))
+    cmd = _jacktrip_command(peer_ip, source_name, *options)
     try:
         proc = subprocess.Popen(
             cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
@@ -43,22 +190,409 @@ def start_stream(peer_ip: str, source_name: str) -> int:
     except OSError as exc:
         raise JackError(f"failed to launch jacktrip: {exc}") from exc
     _PROCESSES[proc.pid] = proc
+    _register(proc.pid, peer_ip, source_name)
     return proc.pid
 
 
-def stop_stream(pid: int) -> None:
+def stop_stream(pid: int, timeout: float = STOP_TIMEOUT) -> None:
     """Stop a JACK network stream previously started with
-    :func:`start_stream`."""
+    :func:`start_stream`.
+
+    Streams started by other processes are found through the
+    :class:`~audiomesh.registry.StreamRegistry`.
+    """
 
     proc = _PROCESSES.pop(pid, None)
     if proc is None:
-        raise JackError(f"unknown stream {pid}")
+        _stop_registered(_lookup(pid), timeout)
+        return
 
     proc.terminate()
     try:
-        proc.wait(timeout=5)
+        proc.wait(timeout=timeout)
     except subprocess.TimeoutExpired:
         os.kill(proc.pid, signal.SIGKILL)
+    _forget(pid)
+
+
+def _pidfd_for(record: StreamRecord) -> Optional[int]:
+    """Open a pidfd for ``record``, or ``None`` if its process is gone.
+
+    Signals sent through the pidfd cannot reach a later process that reuses
+    the PID.
+    """
+    fd = open_pidfd(record.pid)
+    if fd is not None and record.start_ticks is not None:
+        if process_start_ticks(record.pid) != record.start_ticks:
+            os.close(fd)
+            return None
+    return fd
+
+
+def _stop_registered(record: StreamRecord, timeout: float) -> None:
+    if not hasattr(os, "pidfd_open"):  # pragma: no cover - no pidfd support
+        _stop_by_pid(record, timeout)
+        return
+    fd = _pidfd_for(record)
+    if fd is None:
+        return
+    try:
+        signal.pidfd_send_signal(fd, signal.SIGTERM)
+        exited, _, _ = select.select([fd], [], [], timeout)
+        if not exited:
+            signal.pidfd_send_signal(fd, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _stop_by_pid(record: StreamRecord, timeout: float) -> None:  # pragma: no cover
+    try:
+        os.kill(record.pid, signal.SIGTERM)
+        deadline = time.monotonic() + timeout
+        while is_alive(record) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        if is_alive(record):
+            os.kill(record.pid, signal.SIGKILL)
+    except ProcessLookupError:
+        pass
+
+
+async def start_stream_async(
+    peer_ip: str,
+    source_name: str,
+    profile: Union[str, Profile, None] = None,
+    *,
+    capture: bool = False,
+) -> int:
+    """Asynchronous :func:`start_stream` that does not block the event loop.
+
+    The stream is registered like one from :func:`start_stream` and its
+    record is dropped as soon as the process exits. With ``capture=True``
+    jacktrip's output is kept for :func:`stream_output` and
+    :func:`stream_metrics` instead of being discarded. The link probe of
+    the ``"auto"`` profile runs in a thread.
+    """
+
+    if profile == "auto":
+        chosen = await asyncio.to_thread(resolve_profile, profile, peer_ip)
+    else:
+        chosen = resolve_profile(profile, peer_ip)
+    proc = await _launch_async(
+        _jacktrip_command(peer_ip, source_name, *_profile_options(chosen)),
+        peer_ip,
+        source_name,
+        StreamOutput() if capture else None,
+    )
+    return proc.pid
+
+
+async def start_hub_async(
+    profile: Union[str, Profile, None] = None, *, capture: bool = False
+) -> int:
+    """Start a jacktrip hub server (``jacktrip -S``) and return its PID.
+
+    Other nodes join it with :func:`start_stream_async` pointed at this
+    host. The server is registered and stopped like any stream. A hub has
+    no single link to measure, so the ``"auto"`` profile leaves jacktrip's
+    defaults in place.
+    """
+
+    chosen = None if profile == "auto" else resolve_profile(profile, "")
+    proc = await _launch_async(
+        _hub_command(*_profile_options(chosen)),
+        "",
+        "jacktrip-hub",
+        StreamOutput() if capture else None,
+    )
+    return proc.pid
+
+
+async def _launch_async(
+    cmd: List[str],
+    peer_ip: str,
+    source_name: str,
+    output: Optional[StreamOutput] = None,
+) -> asyncio.subprocess.Process:
+    """Spawn and register ``cmd`` as an asynchronously managed stream.
+
+    If ``output`` is given, stdout and stderr are read into it.
+    """
+    stdout = subprocess.DEVNULL if output is None else subprocess.PIPE
+    try:
+        proc = await asyncio.create_subprocess_exec(
+            *cmd, stdout=stdout, stderr=subprocess.STDOUT
+        )
+    except OSError as exc:
+        raise JackError(f"failed to launch jacktrip: {exc}") from exc
+    _ASYNC_PROCESSES[proc.pid] = proc
+    # SQLite may block on a busy database; keep it off the event loop.
+    await asyncio.to_thread(_register, proc.pid, peer_ip, source_name)
+    if output is not None:
+        assert proc.stdout is not None
+        _OUTPUTS[proc.pid] = output
+        reader = _CAPTURES[proc.pid] = asyncio.create_task(output.capture(proc.stdout))
+        reader.add_done_callback(lambda task: _CAPTURES.pop(proc.pid, None))
+    waiter = _WAITERS[proc.pid] = asyncio.create_task(_reap(proc))
+    waiter.add_done_callback(lambda task: _WAITERS.pop(proc.pid, None))
+    return proc
+
+
+async def wait_stream(pid: int) -> int:
+    """Wait for a stream started with :func:`start_stream_async` to exit.
+
+    Returns the exit status, negative for a signal. The wait is driven by
+    the event loop's child watcher, not by polling. Captured output has been
+    read to the end when it returns.
+    """
+
+    waiter = _WAITERS.get(pid)
+    if waiter is None:
+        raise JackError(f"unknown stream {pid}")
+    status = await asyncio.shield(waiter)
+    reader = _CAPTURES.get(pid)
+    if reader is not None:
+        await asyncio.shield(reader)
+    return status
+
+
+async def _reap(proc: asyncio.subprocess.Process) -> int:
+    """Wait for ``proc`` to exit and drop its registry record."""
+    status = await proc.wait()
+    _ASYNC_PROCESSES.pop(proc.pid, None)
+    output = _OUTPUTS.pop(proc.pid, None)
+    if output is not None:
+        _EXITED_OUTPUTS[proc.pid] = output
+        while len(_EXITED_OUTPUTS) > EXITED_OUTPUTS:
+            _EXITED_OUTPUTS.popitem(last=False)
+    await asyncio.to_thread(_forget, proc.pid)
+    return status
+
+
+def _output(pid: int) -> StreamOutput:
+    output = _OUTPUTS.get(pid) or _EXITED_OUTPUTS.get(pid)
+    if output is None:
+        raise JackError(
+            f"no captured output for stream {pid}; only streams started in "
+            "this process with capture=True have any"
+        )
+    return output
+
+
+def stream_output(pid: int) -> List[str]:
+    """Return the last lines printed by a stream started with ``capture``.
+
+    Output of recently exited streams stays available, which helps to see
+    why a session died.
+    """
+
+    return _output(pid).lines()
+
+
+def stream_metrics(pid: int) -> StreamMetrics:
+    """Return the underrun, overflow, reconnect and buffer-size counters
+    parsed from a captured stream's output.
+
+    Only streams started by this process with ``capture=True`` have them;
+    :func:`start_stream` discards jacktrip's output.
+    """
+
+    return _output(pid).metrics()
+
+
+async def stop_stream_async(pid: int, timeout: float = STOP_TIMEOUT) -> None:
+    """Stop a stream without blocking the event loop.
+
+    The process gets SIGTERM and, if still running after ``timeout``
+    seconds, SIGKILL. Only the calling task waits; if it is cancelled while
+    waiting, the process is killed before the cancellation propagates.
+    Streams started by other processes are found through the registry.
+    """
+
+    proc = _ASYNC_PROCESSES.pop(pid, None)
+    if proc is None:
+        record = await asyncio.to_thread(_lookup, pid)
+        await _stop_registered_async(record, timeout)
+        return
+    try:
+        if proc.returncode is None:
+            proc.terminate()
+            await asyncio.wait_for(proc.wait(), timeout)
+    except ProcessLookupError:
+        pass
+    except asyncio.TimeoutError:
+        _kill(proc)
+        await proc.wait()
+    except asyncio.CancelledError:
+        # The reaper drops the record once the process has exited.
+        _kill(proc)
+        raise
+    await asyncio.to_thread(_forget, pid)
+
+
+def _kill(proc: asyncio.subprocess.Process) -> None:
+    if proc.returncode is None:
+        try:
+            proc.kill()
+        except ProcessLookupError:
+            pass
+
+
+async def _stop_registered_async(record: StreamRecord, timeout: float) -> None:
+    if not hasattr(os, "pidfd_open"):  # pragma: no cover - no pidfd support
+        await asyncio.to_thread(_stop_by_pid, record, timeout)
+        return
+    fd = _pidfd_for(record)
+    if fd is None:
+        return
+    loop = asyncio.get_running_loop()
+    exited = loop.create_future()
+    loop.add_reader(fd, exited.set_result, None)
+    try:
+        signal.pidfd_send_signal(fd, signal.SIGTERM)
+        try:
+            await asyncio.wait_for(exited, timeout)
+        except asyncio.TimeoutError:
+            signal.pidfd_send_signal(fd, signal.SIGKILL)
+        except asyncio.CancelledError:
+            signal.pidfd_send_signal(fd, signal.SIGKILL)
+            raise
+    except ProcessLookupError:
+        pass
+    finally:
+        loop.remove_reader(fd)
+        os.close(fd)
+
+
+async def _run_bulk(
+    func: Callable[..., Any],
+    calls: List[tuple[Any, ...]],
+    pids: List[Optional[int]],
+    concurrency: int,
+    threaded: bool,
+) -> List[StreamResult]:
+    """Run ``func(*args)`` for each of ``calls``, ``concurrency`` at a time."""
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    loop = asyncio.get_running_loop()
+    semaphore = asyncio.Semaphore(concurrency)
+    # Sized to the limit: the default executor may have fewer threads.
+    executor = ThreadPoolExecutor(concurrency) if threaded else None
+
+    async def run(args: tuple[Any, ...], pid: Optional[int]) -> StreamResult:
+        async with semaphore:
+            try:
+                if executor is not None:
+                    result = await loop.run_in_executor(executor, func, *args)
+                else:
+                    result = await func(*args)
+            except JackError as exc:
+                return StreamResult(pid, str(exc))
+        return StreamResult(result if pid is None else pid)
+
+    try:
+        return list(await asyncio.gather(*map(run, calls, pids)))
+    finally:
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+
+async def start_streams(
+    streams: Iterable[tuple[str, str]],
+    *,
+    profile: Union[str, Profile, None] = None,
+    concurrency: int = BULK_CONCURRENCY,
+    threaded: bool = False,
+) -> List[StreamResult]:
+    """Start a ``(peer_ip, source_name)`` stream for each item concurrently.
+
+    Every stream uses latency ``profile``; with ``"auto"`` each peer's link
+    is measured separately.
+
+    At most ``concurrency`` launches run at once. Returns one
+    :class:`StreamResult` per item, in order; a failed launch carries its
+    error instead of raising. With ``threaded=True`` the synchronous
+    :func:`start_stream` runs in worker threads, so the processes outlive
+    the event loop (as a one-shot CLI command needs) and are stopped with
+    :func:`stop_stream`.
+    """
+
+    # Only pass a profile when one is set, so ``func`` keeps its defaults.
+    extra = (profile,) if profile is not None else ()
+    calls = [(*stream, *extra) for stream in streams]
+    func = start_stream if threaded else start_stream_async
+    return await _run_bulk(func, calls, [None] * len(calls), concurrency, threaded)
+
+
+async def stop_streams(
+    pids: Iterable[int],
+    *,
+    concurrency: int = BULK_CONCURRENCY,
+    timeout: float = STOP_TIMEOUT,
+    threaded: bool = False,
+) -> List[StreamResult]:
+    """Stop each stream in ``pids`` concurrently.
+
+    Takes about as long as the slowest stop rather than the sum of them. See
+    :func:`start_streams` for ``concurrency``, ``threaded`` and the results.
+    """
+
+    targets: List[Optional[int]] = list(pids)
+    calls = [(pid, timeout) for pid in targets]
+    func = stop_stream if threaded else stop_stream_async
+    return await _run_bulk(func, calls, targets, concurrency, threaded)
+
+
+class StreamWatcher(ExitWatcher):
+    """Drops registry records, and reaps children, as streams exit."""
+
+    def close(self) -> None:
+        if self in _WATCHERS:
+            _WATCHERS.remove(self)
+        super().close()
+
+
+def _stream_exited(pid: int) -> None:
+    proc = _PROCESSES.pop(pid, None)
+    if proc is not None:
+        proc.poll()  # collect the zombie
+    # Called on the event loop; the database write may block.
+    asyncio.get_running_loop().run_in_executor(None, _forget, pid)
+
+
+def watch_streams() -> StreamWatcher:
+    """Track every registered stream from the running event loop.
+
+    Meant for long-running processes such as daemons: each stream's record
+    is removed the moment its process exits, and this process's own
+    children are reaped, without polling. Streams started here later are
+    watched too. Call ``close()`` on the result to stop watching.
+    """
+
+    watcher = StreamWatcher(_stream_exited)
+    for record in list_streams():
+        watcher.watch(record.pid)
+    _WATCHERS.append(watcher)
+    return watcher
 
 
-__all__ = ["start_stream", "stop_stream", "JackError"]
+__all__ = [
+    "resolve_jacktrip",
+    "start_stream",
+    "stop_stream",
+    "start_stream_async",
+    "stop_stream_async",
+    "start_hub_async",
+    "wait_stream",
+    "stream_output",
+    "stream_metrics",
+    "StreamMetrics",
+    "start_streams",
+    "stop_streams",
+    "StreamResult",
+    "StreamRecord",
+    "list_streams",
+    "watch_streams",
+    "JackError",
+]
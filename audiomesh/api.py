@@ -1,6 +1,17 @@
 from __future__ import annotations
 
-from fastapi import FastAPI  # type: ignore[import-not-found]
+import os
+from pathlib import Path
+from typing import Any
+
+from fastapi import FastAPI, HTTPException  # type: ignore[import-not-found]
+
+from discovery.service import fetch_peers
+
+# Unix socket published by ``audiomesh discovery start --daemon``.
+PEER_SOCKET = Path(
+    os.environ.get("AUDIOMESH_DISCOVERY_SOCKET", "~/.audiomesh/discovery.sock")
+).expanduser()
 
 app = FastAPI()
 
@@ -9,3 +20,12 @@ app = FastAPI()
 async def health() -> dict[str, str]:
     """Return service health status."""
     return {"status": "ok"}
+
+
+@app.get("/api/nodes")  # type: ignore[misc]
+async def nodes() -> dict[str, Any]:
+    """Return the peer table shared by the local discovery daemon."""
+    try:
+        return await fetch_peers(PEER_SOCKET)
+    except OSError as exc:
+        raise HTTPException(status_code=503, detail="discovery not running") from exc
@@ -3,13 +3,15 @@
 from __future__ import annotations
 
 import asyncio
+import ipaddress
 import json
 import logging
 import os
 import signal
 import sys
 import time
-from collections.abc import Callable
+import uuid
+from collections.abc import Awaitable, Callable
 from pathlib import Path
 from typing import Any
 
@@ -17,9 +19,31 @@ import click
 import uvicorn  # type: ignore[import-not-found]
 from tabulate import tabulate
 
+from discovery.announcer import Announcer
+from discovery.eventloop import LOOP_CHOICES, install_event_loop
+from discovery.interfaces import resolve_interfaces
 from discovery.listener import Listener
+from discovery.service import PeerTableServer, read_peers
+from discovery.sharded import ShardedListener
+from discovery.snapshot import export_peers, restore_snapshot, write_snapshot
 
-from . import JackError, start_stream, stop_stream
+from . import (
+    BULK_CONCURRENCY,
+    STOP_TIMEOUT,
+    JackError,
+    StreamResult,
+    list_streams,
+    start_stream,
+    start_streams,
+    stop_stream,
+    stop_streams,
+    watch_streams,
+)
+from .hub import HUB_PORT, MAX_LOAD, HubPlanner
+from .latency import PROFILE_CHOICES
+from .ndjson import OVERFLOW_POLICIES, NDJSONWriter
+from .render import TableRenderer, format_table
+from .supervisor import MAX_BACKOFF, MIN_BACKOFF, Supervisor
 
 try:
     from .config import API_HOST, API_PORT  # type: ignore[import-not-found]
@@ -28,6 +52,11 @@ except Exception:  # pragma: no cover - optional config
     API_PORT = 8080
 
 
+# Change in jitter (ms) or loss (fraction) that triggers a ``link`` event.
+LINK_JITTER_STEP = 1.0
+LINK_LOSS_STEP = 0.01
+
+
 def _clean_stale_pid(pid_path: Path) -> None:
     if not pid_path.exists():
         return
@@ -58,13 +87,48 @@ def _fork_daemon(pid_path: Path) -> bool:
     return False
 
 
+loop_option = click.option(
+    "--loop",
+    default="auto",
+    type=click.Choice(LOOP_CHOICES),
+    show_default=True,
+    help="Event loop; auto uses uvloop when installed",
+)
+
+
+def _check_interface(ctx: click.Context, param: click.Parameter, value: str) -> str:
+    """Reject ``--interface`` values naming no local IPv4 interface."""
+    try:
+        ipaddress.IPv4Address(value)
+    except ValueError:
+        try:
+            resolve_interfaces(value)
+        except ValueError as exc:
+            raise click.BadParameter(str(exc)) from exc
+    return value
+
+
+def _install_loop(name: str) -> str:
+    try:
+        backend = install_event_loop(name)
+    except RuntimeError as exc:
+        raise click.BadParameter(str(exc), param_hint="--loop") from exc
+    logging.debug("using the %s event loop", backend)
+    return backend
+
+
 @click.group()
 def discovery() -> None:
     """Manage LAN peer discovery."""
 
 
 @discovery.command()
-@click.option("--interface", default="0.0.0.0", help="NIC IP to bind to")
+@click.option(
+    "--interface",
+    default="0.0.0.0",
+    callback=_check_interface,
+    help="NIC IP to bind to, or a comma-separated list of IPs/names, or 'all'",
+)
 @click.option("--timeout", default=10.0, type=float, help="Peer expiry (s)")
 @click.option(
     "--format",
@@ -80,6 +144,71 @@ def discovery() -> None:
     default="~/.audiomesh/discovery.pid",
     help="PID file path",
 )
+@click.option(
+    "--query/--no-query",
+    default=False,
+    help="Ask peers to announce themselves immediately on startup",
+)
+@click.option(
+    "--snapshot-interval",
+    default=5.0,
+    type=float,
+    show_default=True,
+    help="Seconds between daemon peer-table snapshots (0 disables)",
+)
+@click.option(
+    "--serve/--no-serve",
+    default=None,
+    help="Publish the peer table on a Unix socket next to the PID file "
+    "(default: on with --daemon)",
+)
+@click.option(
+    "--rate-limit",
+    default=100.0,
+    type=float,
+    show_default=True,
+    help="Max announcements/s accepted per source IP (0 disables); with "
+    "--workers each worker enforces it, so a source may get up to "
+    "--workers times as much",
+)
+@click.option(
+    "--node-rate-limit",
+    default=20.0,
+    type=float,
+    show_default=True,
+    help="Max announcements/s accepted per node id (0 disables)",
+)
+@click.option(
+    "--refresh",
+    default=1.0,
+    type=click.FloatRange(min=0.05),
+    show_default=True,
+    help="Seconds between table redraws with --format table",
+)
+@click.option(
+    "--overflow",
+    default="coalesce",
+    type=click.Choice(OVERFLOW_POLICIES),
+    show_default=True,
+    help="What to do with JSON events when stdout falls behind: keep the "
+    "latest per peer or drop new ones",
+)
+@click.option(
+    "--link-interval",
+    default=5.0,
+    type=float,
+    show_default=True,
+    help="Seconds between checks for changed link quality, reported as "
+    "'link' events with --format json (0 disables)",
+)
+@click.option(
+    "--workers",
+    default=1,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Ingest processes; more than one shards decoding across cores",
+)
+@loop_option
 @click.option("--verbose", is_flag=True, help="Enable debug output")
 def start(
     interface: str,
@@ -87,10 +216,27 @@ def start(
     outfmt: str,
     daemon: bool,
     pid_file: Path,
+    query: bool,
+    snapshot_interval: float,
+    serve: bool | None,
+    rate_limit: float,
+    node_rate_limit: float,
+    refresh: float,
+    overflow: str,
+    link_interval: float,
+    workers: int,
+    loop: str,
     verbose: bool,
 ) -> None:
     """Start peer discovery."""
 
+    if workers > 1 and "interfaces" in _interface_kwargs(interface):
+        # Sharded workers bind one address; a single name is resolved to it.
+        addresses = resolve_interfaces(interface)
+        if len(addresses) > 1:
+            raise click.UsageError("--workers > 1 needs a single --interface")
+        interface = addresses[0]
+
     pid_path = Path(os.path.expanduser(str(pid_file)))
     os.makedirs(pid_path.parent, exist_ok=True)
 
@@ -98,6 +244,7 @@ def start(
         logging.basicConfig(level=logging.DEBUG)
     else:
         logging.basicConfig(level=logging.INFO)
+    _install_loop(loop)
 
     _clean_stale_pid(pid_path)
 
@@ -105,7 +252,24 @@ def start(
         return
 
     try:
-        asyncio.run(_serve(interface, timeout, outfmt, pid_path, daemon))
+        asyncio.run(
+            _serve(
+                interface,
+                timeout,
+                outfmt,
+                pid_path,
+                daemon,
+                query=query,
+                snapshot_interval=snapshot_interval,
+                serve=daemon if serve is None else serve,
+                rate_limit=rate_limit or None,
+                node_rate_limit=node_rate_limit or None,
+                refresh=refresh,
+                overflow=overflow,
+                link_interval=link_interval,
+                workers=workers,
+            )
+        )
     except OSError as exc:
         click.echo(f"error: {exc}", err=True)
         if daemon and pid_path.exists():
@@ -113,69 +277,288 @@ def start(
         sys.exit(1)
 
 
-def _format_table(peers: dict[str, dict[str, Any]]) -> str:
-    rows = []
-    now = time.time()
-    for nid, data in peers.items():
-        rows.append([nid, data["ip"], data["port"], f"{now - data['ts']:.1f}s ago"])
-    if not rows:
-        return "no peers"
-    return tabulate(rows, headers=["ID", "IP", "PORT", "LAST SEEN"])
+def _emit(
+    outfmt: str,
+    message: dict[str, Any],
+    output: Callable[[dict[str, Any]], None] | None,
+) -> None:
+    if output is not None:
+        output(message)
+    elif outfmt == "json":
+        click.echo(json.dumps(message))
 
 
 def _announcement_handler(
-    peers: dict[str, dict[str, Any]], outfmt: str
+    peers: dict[str, dict[str, Any]],
+    outfmt: str,
+    publish: Callable[[bytes, str], None] | None = None,
+    output: Callable[[dict[str, Any]], None] | None = None,
+    link: Callable[[str], dict[str, float] | None] | None = None,
 ) -> Callable[[bytes, str, int, int], None]:
     def handler(node_id: bytes, ip: str, port: int, ts: int) -> None:
         nid = node_id.hex()
+        event = "changed" if nid in peers else "added"
         peers[nid] = {"ip": ip, "port": port, "ts": time.time()}
-        if outfmt == "json":
-            click.echo(
-                json.dumps(
-                    {
-                        "event": "added",
-                        "id": nid,
-                        "ip": ip,
-                        "port": port,
-                        "ts": ts,
-                    }
-                )
-            )
-        else:
-            click.echo(_format_table(peers))
+        if publish is not None:
+            publish(node_id, event)
+        message: dict[str, Any] = {
+            "event": event,
+            "id": nid,
+            "ip": ip,
+            "port": port,
+            "ts": ts,
+        }
+        stats = link(nid) if link is not None else None
+        if stats is not None:
+            message["link"] = stats
+        _emit(outfmt, message, output)
 
     return handler
 
 
 def _remove_handler(
-    peers: dict[str, dict[str, Any]], outfmt: str
+    peers: dict[str, dict[str, Any]],
+    outfmt: str,
+    publish: Callable[[bytes, str], None] | None = None,
+    output: Callable[[dict[str, Any]], None] | None = None,
 ) -> Callable[[bytes], None]:
     def handler(node_id: bytes) -> None:
         nid = node_id.hex()
         peers.pop(nid, None)
-        if outfmt == "json":
-            click.echo(json.dumps({"event": "removed", "id": nid}))
-        else:
-            click.echo(_format_table(peers))
+        if publish is not None:
+            publish(node_id, "removed")
+        _emit(outfmt, {"event": "removed", "id": nid}, output)
 
     return handler
 
 
+def _snapshot_path(pid_path: Path) -> Path:
+    return pid_path.with_name(f"{pid_path.stem}.peers.json")
+
+
+def _socket_path(pid_path: Path) -> Path:
+    return pid_path.with_name(f"{pid_path.stem}.sock")
+
+
+def _restore_peers(
+    listener: Listener,
+    path: Path,
+    peers: dict[str, dict[str, Any]],
+    outfmt: str,
+    output: Callable[[dict[str, Any]], None] | None = None,
+) -> None:
+    restored = restore_snapshot(listener, path)
+    if not restored:
+        return
+    now = time.time()
+    for nid, entry in restored.items():
+        peers[nid] = {
+            "ip": entry["ip"],
+            "port": entry["port"],
+            "ts": now - entry["age"],
+            "provisional": True,
+        }
+        message = {
+            "event": "added",
+            "id": nid,
+            "ip": entry["ip"],
+            "port": entry["port"],
+            "provisional": True,
+        }
+        _emit(outfmt, message, output)
+
+
+def _save_snapshot(listener: Listener, path: Path) -> None:
+    try:
+        write_snapshot(path, export_peers(listener))
+    except OSError as exc:
+        logging.warning("peer snapshot failed: %s", exc)
+
+
+async def _snapshot_loop(listener: Listener, path: Path, interval: float) -> None:
+    while True:
+        await asyncio.sleep(interval)
+        _save_snapshot(listener, path)
+
+
+async def _cancel(task: asyncio.Task[None]) -> None:
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+def _start_snapshots(
+    listener: Listener, path: Path, interval: float
+) -> Callable[[], Awaitable[None]]:
+    """Start periodic snapshots and return a coroutine that stops them."""
+    task = asyncio.create_task(_snapshot_loop(listener, path, interval))
+
+    async def stop() -> None:
+        await _cancel(task)
+        _save_snapshot(listener, path)
+
+    return stop
+
+
+async def _start_peer_service(
+    listener: Listener,
+    pid_path: Path,
+    cleanups: list[Callable[[], Awaitable[None]]],
+) -> PeerTableServer:
+    server = PeerTableServer(listener, _socket_path(pid_path))
+    await server.start()
+    cleanups.append(server.stop)
+    return server
+
+
+def _interface_kwargs(interface: str) -> dict[str, str]:
+    """Map ``--interface`` to the matching :class:`Listener` keyword."""
+    try:
+        ipaddress.IPv4Address(interface)
+    except ValueError:
+        return {"interfaces": interface}
+    return {"interface_ip": interface}
+
+
+def _make_listener(workers: int, *args: Any, **kwargs: Any) -> Listener:
+    if workers > 1:
+        return ShardedListener(*args, workers=workers, **kwargs)
+    return Listener(*args, **kwargs)
+
+
+class _LiveView:
+    """Per-peer lookups against a listener and server created later."""
+
+    def __init__(self) -> None:
+        self.listener: Listener | None = None
+        self.server: PeerTableServer | None = None
+
+    def age(self, nid: str) -> float | None:
+        # Heartbeats only refresh the listener, so ask it for liveness.
+        if self.listener is None:
+            return None
+        return self.listener.age(bytes.fromhex(nid))
+
+    def link(self, nid: str) -> dict[str, float] | None:
+        if self.listener is None:
+            return None
+        return self.listener.link_stats(bytes.fromhex(nid))
+
+    def publish(self, node_id: bytes, event: str) -> None:
+        if self.server is not None:
+            self.server.publish(node_id, event)
+
+
+def _link_changed(old: dict[str, float] | None, new: dict[str, float]) -> bool:
+    if old is None:
+        return True
+    return (
+        abs(new["jitter_ms"] - old["jitter_ms"]) >= LINK_JITTER_STEP
+        or abs(new["loss"] - old["loss"]) >= LINK_LOSS_STEP
+    )
+
+
+async def _link_loop(
+    peers: dict[str, dict[str, Any]],
+    link: Callable[[str], dict[str, float] | None],
+    output: Callable[[dict[str, Any]], None],
+    interval: float,
+) -> None:
+    """Emit a ``link`` event whenever a peer's link quality moves notably.
+
+    Address events fire only on joins and moves, before any link stats
+    exist, so steady peers are reported here.
+    """
+    reported: dict[str, dict[str, float]] = {}
+    while True:
+        await asyncio.sleep(interval)
+        for nid in list(reported.keys() - peers.keys()):
+            del reported[nid]
+        for nid in list(peers):
+            stats = link(nid)
+            if stats is not None and _link_changed(reported.get(nid), stats):
+                reported[nid] = stats
+                output({"event": "link", "id": nid, "link": stats})
+
+
+def _start_output(
+    outfmt: str,
+    peers: dict[str, dict[str, Any]],
+    age: Callable[[str], float | None],
+    link: Callable[[str], dict[str, float] | None],
+    cleanups: list[Callable[[], Awaitable[None]]],
+    *,
+    refresh: float,
+    overflow: str,
+    link_interval: float = 0.0,
+) -> Callable[[dict[str, Any]], None]:
+    """Start the event writer or table view and return its event sink."""
+    if outfmt == "json":
+        writer = NDJSONWriter(sys.stdout.buffer, overflow=overflow)
+        writer.start()
+        cleanups.append(writer.stop)
+        if link_interval > 0:
+            task = asyncio.create_task(
+                _link_loop(peers, link, writer.emit, link_interval)
+            )
+            cleanups.append(lambda: _cancel(task))
+        return writer.emit
+    renderer = TableRenderer(peers, age, link, refresh=refresh)
+    renderer.start()
+    cleanups.append(renderer.stop)
+    return lambda message: renderer.mark_dirty()
+
+
 async def _serve(
     interface: str,
     timeout: float,
     outfmt: str,
     pid_path: Path,
     daemon: bool,
+    *,
+    query: bool = False,
+    snapshot_interval: float = 0.0,
+    serve: bool = False,
+    rate_limit: float | None = None,
+    node_rate_limit: float | None = None,
+    refresh: float = 1.0,
+    overflow: str = "coalesce",
+    link_interval: float = 0.0,
+    workers: int = 1,
 ) -> None:
     peers: dict[str, dict[str, Any]] = {}
-    listener = Listener(
-        _announcement_handler(peers, outfmt),
-        interface_ip=interface,
+    view = _LiveView()
+    cleanups: list[Callable[[], Awaitable[None]]] = []
+    output = _start_output(
+        outfmt,
+        peers,
+        view.age,
+        view.link,
+        cleanups,
+        refresh=refresh,
+        overflow=overflow,
+        link_interval=link_interval,
+    )
+    listener = view.listener = _make_listener(
+        workers,
+        _announcement_handler(peers, outfmt, view.publish, output, view.link),
         timeout=timeout,
-        on_removed=_remove_handler(peers, outfmt),
+        on_removed=_remove_handler(peers, outfmt, view.publish, output),
+        rate_limit=rate_limit,
+        node_rate_limit=node_rate_limit,
+        **_interface_kwargs(interface),
     )
     await listener.start()
+    if daemon and snapshot_interval > 0:
+        snapshot_path = _snapshot_path(pid_path)
+        _restore_peers(listener, snapshot_path, peers, outfmt, output)
+        cleanups.append(_start_snapshots(listener, snapshot_path, snapshot_interval))
+    if serve:
+        view.server = await _start_peer_service(listener, pid_path, cleanups)
+    if query:
+        listener.query()
 
     stop_event = asyncio.Event()
 
@@ -186,6 +569,8 @@ async def _serve(
     signal.signal(signal.SIGTERM, _handle)
 
     await stop_event.wait()
+    for cleanup in reversed(cleanups):
+        await cleanup()
     await listener.stop()
     if daemon:
         pid_path.unlink(missing_ok=True)
@@ -222,18 +607,69 @@ def stop(pid_file: Path) -> None:
     pid_path.unlink(missing_ok=True)
 
 
+@discovery.command()
+@click.option(
+    "--pid-file",
+    type=click.Path(path_type=str),
+    default="~/.audiomesh/discovery.pid",
+    help="PID file path",
+)
+@click.option(
+    "--format",
+    "outfmt",
+    default="table",
+    type=click.Choice(["table", "json"]),
+    help="Output format",
+)
+def peers(pid_file: Path, outfmt: str) -> None:
+    """Print the peer table published by a running discovery daemon."""
+
+    sock_path = _socket_path(Path(os.path.expanduser(str(pid_file))))
+    try:
+        table = read_peers(sock_path)
+    except OSError as exc:
+        click.echo(f"discovery not reachable: {exc}", err=True)
+        sys.exit(1)
+    if outfmt == "json":
+        click.echo(json.dumps(table))
+        return
+    now = time.time()
+    rows = {
+        nid: {"ip": entry["ip"], "port": entry["port"], "ts": entry["seen"]}
+        for nid, entry in table["peers"].items()
+    }
+    click.echo(
+        format_table(
+            rows,
+            lambda nid: now - rows[nid]["ts"],
+            lambda nid: table["peers"][nid].get("link"),
+        )
+    )
+
+
 @click.group()
 def audio_core() -> None:
     """Commands for managing jacktrip network streams."""
 
 
+profile_option = click.option(
+    "--profile",
+    type=click.Choice(PROFILE_CHOICES),
+    help="Latency profile; auto picks buffering from the measured link "
+    "(default: jacktrip's own)",
+)
+
+
 @audio_core.command(name="start")
 @click.argument("peer_ip")
 @click.argument("client_name")
-def start_session(peer_ip: str, client_name: str) -> None:
+@profile_option
+def start_session(peer_ip: str, client_name: str, profile: str | None) -> None:
     """Launch a jacktrip session and print its PID."""
+    # Without --profile, call as before profiles existed.
+    options = {"profile": profile} if profile is not None else {}
     try:
-        pid = start_stream(peer_ip, client_name)
+        pid = start_stream(peer_ip, client_name, **options)
     except JackError as exc:
         click.echo(str(exc), err=True)
         sys.exit(1)
@@ -252,6 +688,330 @@ def stop_session(pid: int) -> None:
     click.echo(f"stopped {pid}")
 
 
+@audio_core.command(name="list")
+@click.option(
+    "--format",
+    "outfmt",
+    default="table",
+    type=click.Choice(["table", "json"]),
+    help="Output format",
+)
+def list_sessions(outfmt: str) -> None:
+    """List running jacktrip sessions, whichever command started them."""
+    try:
+        records = list_streams()
+    except JackError as exc:
+        click.echo(str(exc), err=True)
+        sys.exit(1)
+    if outfmt == "json":
+        click.echo(json.dumps([record._asdict() for record in records]))
+        return
+    if not records:
+        click.echo("no streams")
+        return
+    now = time.time()
+    rows = [
+        [r.pid, r.peer_ip, r.client_name, f"{now - r.started:.0f}s"] for r in records
+    ]
+    click.echo(tabulate(rows, headers=["PID", "PEER", "CLIENT", "UPTIME"]))
+
+
+def _parse_stream(value: str) -> tuple[str, str]:
+    peer_ip, sep, client_name = value.rpartition(":")
+    if not sep or not peer_ip or not client_name:
+        raise click.BadParameter(
+            f"expected PEER_IP:CLIENT_NAME, got {value!r}", param_hint="STREAMS"
+        )
+    return peer_ip, client_name
+
+
+def _report_bulk(labels: list[str], results: list[StreamResult], verb: str) -> None:
+    """Print one line per item; exit 1 if any failed."""
+    for label, result in zip(labels, results):
+        if result.ok:
+            click.echo(f"{label}: {verb} {result.pid}")
+        else:
+            click.echo(f"{label}: {result.error}", err=True)
+    if not all(result.ok for result in results):
+        sys.exit(1)
+
+
+concurrency_option = click.option(
+    "--concurrency",
+    default=BULK_CONCURRENCY,
+    type=click.IntRange(min=1),
+    show_default=True,
+    help="Maximum sessions handled at once",
+)
+
+
+@audio_core.command(name="start-many")
+@click.argument("streams", nargs=-1, required=True)
+@concurrency_option
+@profile_option
+def start_sessions(
+    streams: tuple[str, ...], concurrency: int, profile: str | None
+) -> None:
+    """Launch a jacktrip session for each PEER_IP:CLIENT_NAME concurrently."""
+    pairs = [_parse_stream(value) for value in streams]
+    results = asyncio.run(
+        start_streams(pairs, profile=profile, concurrency=concurrency, threaded=True)
+    )
+    _report_bulk(list(streams), results, "started")
+
+
+@audio_core.command(name="stop-many")
+@click.argument("pids", nargs=-1, type=int, required=True)
+@concurrency_option
+@click.option(
+    "--timeout",
+    default=STOP_TIMEOUT,
+    type=float,
+    show_default=True,
+    help="Seconds to wait after SIGTERM before SIGKILL",
+)
+def stop_sessions(pids: tuple[int, ...], concurrency: int, timeout: float) -> None:
+    """Terminate several jacktrip sessions concurrently."""
+    results = asyncio.run(
+        stop_streams(pids, concurrency=concurrency, timeout=timeout, threaded=True)
+    )
+    _report_bulk([str(pid) for pid in pids], results, "stopped")
+
+
+async def _supervise(
+    pairs: list[tuple[str, str]],
+    follow: bool,
+    interface: str,
+    min_backoff: float,
+    max_backoff: float,
+    capture: bool = False,
+    profile: str | None = None,
+) -> None:
+    supervisor = Supervisor(
+        min_backoff=min_backoff,
+        max_backoff=max_backoff,
+        capture=capture,
+        profile=profile,
+    )
+    watcher = watch_streams()
+    for peer_ip, client_name in pairs:
+        supervisor.add(peer_ip, client_name, parked=follow)
+    listener: Listener | None = None
+    follower: asyncio.Task[None] | None = None
+    if follow:
+        listener = _make_listener(1, lambda *_: None, **_interface_kwargs(interface))
+        await listener.start()
+        follower = asyncio.create_task(supervisor.follow(listener))
+
+    stop_event = asyncio.Event()
+
+    def _handle(sig: int, frame: Any) -> None:  # pragma: no cover - signal
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _handle)
+    signal.signal(signal.SIGTERM, _handle)
+
+    await stop_event.wait()
+    if follower is not None:
+        follower.cancel()
+    await supervisor.close()
+    if listener is not None:
+        await listener.stop()
+    watcher.close()
+
+
+@audio_core.command(name="supervise")
+@click.argument("streams", nargs=-1, required=True)
+@click.option(
+    "--follow-discovery/--no-follow-discovery",
+    default=True,
+    show_default=True,
+    help="Run each session only while its peer is announced on the LAN",
+)
+@click.option(
+    "--interface",
+    default="0.0.0.0",
+    callback=_check_interface,
+    help="NIC IP(s) for discovery",
+)
+@click.option(
+    "--min-backoff",
+    default=MIN_BACKOFF,
+    type=float,
+    show_default=True,
+    help="First restart delay (s)",
+)
+@click.option(
+    "--max-backoff",
+    default=MAX_BACKOFF,
+    type=float,
+    show_default=True,
+    help="Longest restart delay (s)",
+)
+@click.option(
+    "--capture-output/--no-capture-output",
+    default=False,
+    show_default=True,
+    help="Parse jacktrip output and log underruns, overflows and reconnects "
+    "when a session exits",
+)
+@profile_option
+@loop_option
+def supervise_sessions(
+    streams: tuple[str, ...],
+    follow_discovery: bool,
+    interface: str,
+    min_backoff: float,
+    max_backoff: float,
+    capture_output: bool,
+    profile: str | None,
+    loop: str,
+) -> None:
+    """Keep jacktrip sessions for PEER_IP:CLIENT_NAME running until stopped.
+
+    Crashed sessions are restarted with exponential backoff. With discovery
+    followed, a session is parked while its peer is gone and resumed when
+    the peer returns.
+    """
+    logging.basicConfig(level=logging.INFO)
+    _install_loop(loop)
+    pairs = [_parse_stream(value) for value in streams]
+    asyncio.run(
+        _supervise(
+            pairs,
+            follow_discovery,
+            interface,
+            min_backoff,
+            max_backoff,
+            capture_output,
+            profile,
+        )
+    )
+
+
+async def _run_hub(
+    node_id: bytes,
+    client_name: str,
+    interface: str,
+    capabilities: dict[str, int],
+    max_load: int,
+    profile: str | None,
+) -> None:
+    interfaces = _interface_kwargs(interface)
+    announcer = Announcer(
+        node_id,
+        HUB_PORT,
+        interface_ip=interfaces.get("interface_ip", "0.0.0.0"),
+        capabilities=capabilities,
+        schedule="adaptive",
+        interfaces=interfaces.get("interfaces"),
+    )
+    listener = _make_listener(1, lambda *_: None, **interfaces)
+    planner = HubPlanner(
+        node_id,
+        client_name,
+        capabilities=capabilities,
+        announcer=announcer,
+        profile=profile,
+        max_load=max_load,
+    )
+    watcher = watch_streams()
+    await announcer.start()
+    await listener.start()
+    follower = asyncio.create_task(planner.follow(listener))
+
+    stop_event = asyncio.Event()
+
+    def _handle(sig: int, frame: Any) -> None:  # pragma: no cover - signal
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, _handle)
+    signal.signal(signal.SIGTERM, _handle)
+
+    await stop_event.wait()
+    follower.cancel()
+    await planner.close()
+    await listener.stop()
+    await announcer.stop()
+    watcher.close()
+
+
+def _node_id(ctx: click.Context, param: click.Parameter, value: str | None) -> bytes:
+    if value is None:
+        return uuid.uuid4().bytes
+    try:
+        node_id = bytes.fromhex(value)
+    except ValueError:
+        node_id = b""
+    if len(node_id) != 16:
+        raise click.BadParameter("expected 32 hex digits")
+    return node_id
+
+
+@audio_core.command(name="hub")
+@click.option(
+    "--node-id",
+    callback=_node_id,
+    help="This node's discovery id as hex (default: random)",
+)
+@click.option("--client-name", default="audiomesh-hub", show_default=True)
+@click.option(
+    "--interface",
+    default="0.0.0.0",
+    callback=_check_interface,
+    help="NIC IP(s) for discovery",
+)
+@click.option(
+    "--free-slots",
+    type=click.IntRange(0, 65535),
+    help="Clients this node can serve as hub, advertised for the election",
+)
+@click.option(
+    "--load",
+    type=click.IntRange(0, 100),
+    help="Percent busy, advertised for the election",
+)
+@click.option(
+    "--max-load",
+    default=MAX_LOAD,
+    type=click.IntRange(0, 100),
+    show_default=True,
+    help="Highest load of a node elected as a new hub",
+)
+@profile_option
+@loop_option
+def hub_session(
+    node_id: bytes,
+    client_name: str,
+    interface: str,
+    free_slots: int | None,
+    load: int | None,
+    max_load: int,
+    profile: str | None,
+    loop: str,
+) -> None:
+    """Join the LAN's jacktrip hub, or run it if this node is elected.
+
+    Every node runs this command. One is elected from discovery to run the
+    hub server and every node, the elected one included, connects to it, so
+    each node runs a single jacktrip client instead of one per peer. If the
+    hub disappears, another node takes over.
+    """
+    logging.basicConfig(level=logging.INFO)
+    _install_loop(loop)
+    capabilities = {"free_slots": free_slots, "load": load}
+    asyncio.run(
+        _run_hub(
+            node_id,
+            client_name,
+            interface,
+            {name: value for name, value in capabilities.items() if value is not None},
+            max_load,
+            profile,
+        )
+    )
+
+
 @click.group()
 def cli() -> None:
     """Root command group."""
@@ -261,12 +1021,21 @@ def cli() -> None:
 @click.option("--host", default=API_HOST, show_default=True, help="Bind address")
 @click.option("--port", default=API_PORT, type=int, show_default=True, help="Bind port")
 @click.option("--reload", is_flag=True, help="Enable auto-reload")
-def api(host: str, port: int, reload: bool) -> None:  # pragma: no cover - CLI
+@loop_option
+def api(
+    host: str, port: int, reload: bool, loop: str
+) -> None:  # pragma: no cover - CLI
     """Start the FastAPI server."""
     logging.basicConfig(level=logging.INFO)
     logging.info("Starting API on %s:%d", host, port)
     try:
-        uvicorn.run("audiomesh.api:app", host=host, port=port, reload=reload)
+        uvicorn.run(
+            "audiomesh.api:app",
+            host=host,
+            port=port,
+            reload=reload,
+            loop=_install_loop(loop),
+        )
     except KeyboardInterrupt:
         logging.info("API shutdown requested")
 
@@ -0,0 +1,190 @@
+"""Hub topology: one jacktrip hub server, every node its client.
+
+A full mesh of point-to-point sessions runs a jacktrip process per peer
+pair, N(N-1) of them across N nodes. In hub mode one elected node runs the
+jacktrip hub server (``jacktrip -S``) and every node runs a single client
+to it (``jacktrip -C <hub>``): N + 1 processes in total, one stream per
+node, and bandwidth that grows linearly with the mesh. The hub server only
+patches its clients to each other, so the elected node joins the mix
+through a client of its own over loopback.
+
+Every node elects the hub on its own from its discovery table, so no extra
+protocol is needed (:func:`elect_hub`):
+
+1. A node advertising the ``hub`` capability is already serving and keeps
+   the role. If several are, the lowest node id wins, so nodes that elected
+   themselves at the same time converge on one hub.
+2. Otherwise a node is eligible when its advertised ``load`` is at most
+   ``max_load`` and its ``free_slots`` cover every other node. Eligible
+   nodes are ranked by most free slots, then least load, then lowest node
+   id. If none is eligible, all nodes are ranked the same way.
+
+:class:`HubPlanner` applies the result through a
+:class:`~audiomesh.supervisor.Supervisor`: it runs the hub server while this
+node is elected and a client to the hub in either role, and advertises ``hub``
+through the node's :class:`~discovery.announcer.Announcer`. When discovery
+removes the hub, the next election fails over to another node.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import Dict, Mapping, Optional, Union
+
+from discovery.announcer import Announcer
+from discovery.listener import Listener, Peer
+
+from .latency import Profile
+from .supervisor import Supervisor
+
+logger = logging.getLogger(__name__)
+
+# jacktrip's default port, advertised by every node.
+HUB_PORT = 4464
+# Highest advertised load (percent busy) of a newly elected hub.
+MAX_LOAD = 80
+# Seconds to collect announcements before the first election.
+SETTLE = 2.0
+# Seconds between elections without peer events; capability changes, such
+# as another node starting to serve, are not reported as events.
+RECHECK = 2.0
+# Address the elected node's own client connects to.
+LOCAL_HUB = "127.0.0.1"
+
+
+def elect_hub(
+    nodes: Mapping[bytes, Mapping[str, int]], *, max_load: int = MAX_LOAD
+) -> Optional[bytes]:
+    """Return the node id that should run the hub, given each node's
+    capabilities, or ``None`` if ``nodes`` is empty."""
+    if not nodes:
+        return None
+    serving = [node for node, caps in nodes.items() if caps.get("hub")]
+    if serving:
+        return min(serving)
+
+    def rank(node: bytes) -> tuple[int, int, bytes]:
+        caps = nodes[node]
+        return (-caps.get("free_slots", 0), caps.get("load", 0), node)
+
+    needed = len(nodes) - 1
+    eligible = [
+        node
+        for node, caps in nodes.items()
+        if caps.get("load", 0) <= max_load and caps.get("free_slots", 0) >= needed
+    ]
+    return min(eligible or nodes, key=rank)
+
+
+class HubPlanner:
+    """Elect the hub from discovery and run this node's side of it.
+
+    ``capabilities`` are this node's own, as sent by ``announcer``; the
+    planner adds ``hub`` to them while this node serves. The client session
+    is supervised under ``client_name`` and the hub server, while this node
+    serves, under ``client_name`` with a ``-server`` suffix.
+    """
+
+    def __init__(
+        self,
+        node_id: bytes,
+        client_name: str = "audiomesh-hub",
+        *,
+        capabilities: Optional[Mapping[str, int]] = None,
+        announcer: Optional[Announcer] = None,
+        supervisor: Optional[Supervisor] = None,
+        profile: Union[str, Profile, None] = None,
+        max_load: int = MAX_LOAD,
+        settle: float = SETTLE,
+        recheck: float = RECHECK,
+    ) -> None:
+        self.node_id = node_id
+        self.client_name = client_name
+        self.capabilities = dict(capabilities or {})
+        self.capabilities.pop("hub", None)
+        self.announcer = announcer
+        self.supervisor = supervisor or Supervisor(profile=profile)
+        self.max_load = max_load
+        self.settle = settle
+        self.recheck = recheck
+        self.hub: Optional[bytes] = None
+
+    @property
+    def server_name(self) -> str:
+        return f"{self.client_name}-server"
+
+    @property
+    def role(self) -> str:
+        """``hub``, ``client``, or ``idle`` before the first election."""
+        if self.hub is None:
+            return "idle"
+        return "hub" if self.hub == self.node_id else "client"
+
+    def own_capabilities(self) -> Dict[str, int]:
+        if self.role == "hub":
+            return {**self.capabilities, "hub": 1}
+        return dict(self.capabilities)
+
+    async def replan(self, peers: Mapping[bytes, Peer]) -> bytes:
+        """Elect the hub from ``peers`` and switch roles if it changed.
+
+        Provisional peers, restored from a snapshot but not heard from, are
+        left out of the election.
+        """
+        nodes = {
+            node: peer.capabilities
+            for node, peer in peers.items()
+            if node != self.node_id and not peer.provisional
+        }
+        nodes[self.node_id] = self.own_capabilities()
+        hub = elect_hub(nodes, max_load=self.max_load)
+        assert hub is not None
+        if hub != self.hub:
+            await self._switch(hub, peers)
+        elif hub != self.node_id:
+            # The client follows the hub to a new address.
+            self.supervisor.peer_seen(hub, peers[hub].ip)
+        return hub
+
+    async def follow(self, listener: Listener) -> None:
+        """Keep the hub elected from ``listener``'s table until it stops."""
+        async with listener.events() as events:
+            listener.query()
+            await asyncio.sleep(self.settle)
+            while True:
+                await self.replan(listener.peers)
+                try:
+                    await asyncio.wait_for(events.__anext__(), self.recheck)
+                except asyncio.TimeoutError:
+                    pass
+                except StopAsyncIteration:
+                    return
+
+    async def close(self) -> None:
+        """Stop this node's hub server and client."""
+        await self.supervisor.close()
+        self.hub = None
+        self._advertise()
+
+    async def _switch(self, hub: bytes, peers: Mapping[bytes, Peer]) -> None:
+        for name in (self.client_name, self.server_name):
+            if name in self.supervisor.sessions:
+                await self.supervisor.remove(name)
+        previous, self.hub = self.hub, hub
+        if hub == self.node_id:
+            self.supervisor.add("", self.server_name, hub, mode="hub")
+            self.supervisor.add(LOCAL_HUB, self.client_name)
+        else:
+            self.supervisor.add(peers[hub].ip, self.client_name, hub)
+        logger.info(
+            "hub is %s (was %s); this node is a %s",
+            hub.hex(),
+            previous.hex() if previous else "none",
+            self.role,
+        )
+        self._advertise()
+
+    def _advertise(self) -> None:
+        if self.announcer is not None:
+            self.announcer.set_capabilities(self.own_capabilities())
@@ -0,0 +1,168 @@
+"""Latency profiles for jacktrip sessions.
+
+A :class:`Profile` sets jacktrip's receive queue length (``-q``, in packets)
+and packet redundancy (``-r``). Those two options trade latency against
+robustness; the period size comes from the JACK server and is not set per
+session. Named profiles:
+
+``ultra-low``
+    Shortest queue, no redundancy. For clean wired LANs.
+``balanced``
+    jacktrip's defaults.
+``robust``
+    Deep queue and every packet sent twice, for lossy or congested links.
+``auto``
+    Chosen per peer by :func:`choose_profile` from the link's jitter and
+    loss: the queue covers the jitter and redundancy grows with loss.
+
+Where discovery runs, its per-peer link statistics (RFC 3550 jitter and
+loss of the peer's announcements, :func:`link_sample`) measure the link.
+Otherwise a short probe does (:func:`measure_link`). The probe times TCP
+connects to the peer's jacktrip port. A refused
+connection answers just as fast as an accepted one, so it works whether or
+not the peer is listening yet; only unanswered probes count as loss.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import socket
+import statistics
+import time
+from typing import Dict, List, Mapping, NamedTuple, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+
+class Profile(NamedTuple):
+    """jacktrip buffering options for one session."""
+
+    name: str
+    queue: int  # -q, packets
+    redundancy: int  # -r, copies of each packet
+
+    def args(self) -> List[str]:
+        return ["-q", str(self.queue), "-r", str(self.redundancy)]
+
+
+PROFILES: Dict[str, Profile] = {
+    "ultra-low": Profile("ultra-low", 2, 1),
+    "balanced": Profile("balanced", 4, 1),
+    "robust": Profile("robust", 8, 2),
+}
+PROFILE_CHOICES = [*PROFILES, "auto"]
+
+# jacktrip's default peer port, probed by measure_link().
+PROBE_PORT = 4464
+PROBE_SAMPLES = 5
+PROBE_TIMEOUT = 1.0
+# Duration of one packet at JACK's usual 128 frames and 48 kHz.
+PERIOD_MS = 128 / 48
+# Paths slower than this are not a LAN; few probes underestimate their jitter.
+LAN_RTT_MS = 5.0
+MAX_QUEUE = 16
+
+
+class LinkSample(NamedTuple):
+    """Result of :func:`measure_link`."""
+
+    rtt_ms: float  # median of the answered probes
+    jitter_ms: float  # mean difference between consecutive RTTs
+    loss: float  # fraction of probes unanswered
+
+
+def _probe(peer_ip: str, port: int, timeout: float) -> Optional[float]:
+    """Time one TCP connect in milliseconds; ``None`` if unanswered."""
+    start = time.perf_counter()
+    try:
+        socket.create_connection((peer_ip, port), timeout=timeout).close()
+    except ConnectionRefusedError:
+        pass
+    except OSError:
+        return None
+    return (time.perf_counter() - start) * 1000
+
+
+def measure_link(
+    peer_ip: str,
+    *,
+    port: int = PROBE_PORT,
+    samples: int = PROBE_SAMPLES,
+    timeout: float = PROBE_TIMEOUT,
+) -> LinkSample:
+    """Measure round-trip time, jitter and loss to ``peer_ip``.
+
+    Blocks for at most ``samples * timeout`` seconds; call it through
+    ``asyncio.to_thread`` from the event loop.
+    """
+    rtts = [
+        rtt
+        for rtt in (_probe(peer_ip, port, timeout) for _ in range(samples))
+        if rtt is not None
+    ]
+    loss = 1 - len(rtts) / samples
+    if not rtts:
+        return LinkSample(math.inf, math.inf, loss)
+    diffs = [abs(b - a) for a, b in zip(rtts, rtts[1:])]
+    jitter = statistics.fmean(diffs) if diffs else 0.0
+    return LinkSample(statistics.median(rtts), jitter, loss)
+
+
+def link_sample(stats: Mapping[str, float]) -> LinkSample:
+    """Turn :meth:`~discovery.listener.Listener.link_stats` into a sample.
+
+    Announcements are one-way, so there is no round-trip time; discovery
+    only reaches the LAN, where it is negligible.
+    """
+    return LinkSample(0.0, stats["jitter_ms"], stats["loss"])
+
+
+def choose_profile(sample: LinkSample) -> Profile:
+    """Pick the smallest queue and redundancy that ``sample`` allows."""
+    if sample.loss >= 1:
+        return PROFILES["robust"]._replace(name="auto")
+    # Cover twice the jitter on top of the minimum queue, to the nearest
+    # packet: less than half a packet is absorbed by the minimum queue.
+    extra = math.floor(2 * sample.jitter_ms / PERIOD_MS + 0.5)
+    queue = PROFILES["ultra-low"].queue + extra
+    if sample.rtt_ms > LAN_RTT_MS:
+        queue += 1
+    if sample.loss == 0:
+        redundancy = 1
+    elif sample.loss <= 0.1:
+        redundancy = 2
+    else:
+        redundancy = 3
+    return Profile("auto", min(queue, MAX_QUEUE), redundancy)
+
+
+def resolve_profile(
+    profile: Union[str, Profile, None], peer_ip: str
+) -> Optional[Profile]:
+    """Turn a profile name into a :class:`Profile` for ``peer_ip``.
+
+    ``"auto"`` probes the peer and may block; see :func:`measure_link`.
+    ``None`` means jacktrip's own defaults. Raises ``ValueError`` for an
+    unknown name.
+    """
+    if profile is None or isinstance(profile, Profile):
+        return profile
+    if profile == "auto":
+        sample = measure_link(peer_ip)
+        chosen = choose_profile(sample)
+        logger.info(
+            "link to %s: rtt %.2f ms, jitter %.2f ms, loss %.0f%%; queue %d, "
+            "redundancy %d",
+            peer_ip,
+            sample.rtt_ms,
+            sample.jitter_ms,
+            sample.loss * 100,
+            chosen.queue,
+            chosen.redundancy,
+        )
+        return chosen
+    try:
+        return PROFILES[profile]
+    except KeyError:
+        raise ValueError(f"unknown latency profile {profile!r}") from None
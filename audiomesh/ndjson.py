@@ -0,0 +1,200 @@
+"""Non-blocking newline-delimited JSON event output.
+
+:class:`NDJSONWriter` queues events in memory and writes them in batches from
+a worker thread, so a slow reader on the other end of stdout never stalls
+the event loop. The queue is bounded. When it is full, the ``overflow``
+policy decides what happens to a new event:
+
+``coalesce``
+    Replace the event already queued for the same peer (``id``) with the new
+    one, so a consumer still sees each peer's latest state. Events for peers
+    with nothing queued are dropped.
+``drop``
+    Drop the new event.
+
+Either way the losses are counted in :attr:`NDJSONWriter.coalesced` and
+:attr:`NDJSONWriter.dropped`, as are events still unwritten when
+:meth:`NDJSONWriter.stop` gives up on a blocked reader. ``orjson`` is used
+for serialization when it is installed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+from collections import deque
+from typing import IO, Any, Deque, Dict, List, Optional
+
+from discovery.events import merge_kind
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional speedup
+    orjson = None  # type: ignore[assignment]
+
+logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("coalesce", "drop")
+MAX_PENDING = 4096
+FLUSH_INTERVAL = 0.05
+STOP_TIMEOUT = 1.0
+
+Message = Dict[str, Any]
+
+
+def dumps(message: Message) -> bytes:
+    """Serialize ``message`` as one compact JSON line."""
+    if orjson is not None:
+        return orjson.dumps(message) + b"\n"
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class NDJSONWriter:
+    """Write events to ``stream`` every ``flush_interval`` seconds."""
+
+    def __init__(
+        self,
+        stream: IO[bytes],
+        *,
+        max_pending: int = MAX_PENDING,
+        overflow: str = "coalesce",
+        flush_interval: float = FLUSH_INTERVAL,
+        stop_timeout: float = STOP_TIMEOUT,
+    ) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"unknown overflow policy: {overflow!r}")
+        self.stream = stream
+        self.max_pending = max_pending
+        self.overflow = overflow
+        self.flush_interval = flush_interval
+        self.stop_timeout = stop_timeout
+        self.written = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        # Each slot is [key, message]; a coalesced-away slot holds None.
+        self._queue: Deque[List[Any]] = deque()
+        self._latest: Dict[Any, List[Any]] = {}
+        self._pending = 0
+        self._task: Optional[asyncio.Task[None]] = None
+        # Keeps a cancelled flush's batch ahead of the final one in the stream.
+        self._write_lock = threading.Lock()
+        # Events handed to a writer thread and not yet accounted for.
+        self._in_flight = 0
+        # Set once stop() has counted the in-flight events as dropped.
+        self._abandoned = False
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def emit(self, message: Message) -> None:
+        """Queue ``message`` without blocking."""
+        if self.closed:
+            self.dropped += 1
+            return
+        key = message.get("id")
+        if self._pending >= self.max_pending:
+            slot = self._latest.get(key) if self.overflow == "coalesce" else None
+            if slot is None:
+                self.dropped += 1
+            else:
+                self._coalesce(slot, message)
+            return
+        slot = [key, message]
+        self._queue.append(slot)
+        self._latest[key] = slot
+        self._pending += 1
+
+    def _coalesce(self, slot: List[Any], message: Message) -> None:
+        self.coalesced += 1
+        queued = slot[1]
+        if message["event"] == "link" and queued["event"] != "link":
+            # Keep the queued state change and attach the newer link stats.
+            slot[1] = {**queued, "link": message["link"]}
+            return
+        kind = merge_kind(queued["event"], message["event"])
+        if kind is None:
+            # The peer came and went before anyone saw it.
+            slot[1] = None
+            self._pending -= 1
+            del self._latest[slot[0]]
+            return
+        if kind != message["event"]:
+            message = {**message, "event": kind}
+        slot[1] = message
+
+    def _drain(self) -> List[Message]:
+        messages = [slot[1] for slot in self._queue if slot[1] is not None]
+        self._queue.clear()
+        self._latest.clear()
+        self._pending = 0
+        return messages
+
+    def _write(self, messages: List[Message]) -> None:
+        data = b"".join(dumps(m) for m in messages)
+        try:
+            with self._write_lock:
+                if self._abandoned:
+                    return
+                self.stream.write(data)
+                self.stream.flush()
+        except OSError as exc:
+            # Typically EPIPE once the consumer has gone away.
+            logger.warning("event stream closed: %s", exc)
+            self.closed = True
+            if not self._abandoned:
+                self.dropped += len(messages)
+            return
+        finally:
+            self._in_flight -= len(messages)
+        if not self._abandoned:
+            self.written += len(messages)
+
+    async def flush(self) -> None:
+        """Write everything queued so far from a worker thread."""
+        messages = self._drain()
+        if not messages:
+            return
+        if self.closed:
+            self.dropped += len(messages)
+            return
+        self._in_flight += len(messages)
+        await asyncio.get_running_loop().run_in_executor(None, self._write, messages)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            await self.flush()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the flush task and write any remaining events.
+
+        Gives up after ``stop_timeout`` seconds if the reader has stopped
+        reading, counting whatever is still unwritten as dropped.
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        try:
+            await asyncio.wait_for(self.flush(), self.stop_timeout)
+        except asyncio.TimeoutError:
+            # The writer thread stays blocked; it cannot be interrupted.
+            self._abandoned = True
+            self.closed = True
+            self.dropped += self._in_flight
+        if self.dropped or self.coalesced:
+            logger.warning(
+                "event stream overflow: %d dropped, %d coalesced",
+                self.dropped,
+                self.coalesced,
+            )
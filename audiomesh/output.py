@@ -0,0 +1,101 @@
+"""Capture jacktrip output and count the events it reports.
+
+jacktrip reports buffer underruns and overflows, peer connections and the
+negotiated buffer size only as log lines. A :class:`StreamOutput` keeps the
+last ``maxlen`` lines of one session in a ring buffer and parses every line
+as it arrives into running counters, so a session's health can be read at
+any time without storing or rescanning its whole log.
+
+The default patterns match jacktrip's messages loosely. Pass ``counters``
+or ``buffer_size`` to :class:`StreamOutput` to adapt them to another
+jacktrip version.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import re
+from collections import deque
+from typing import Callable, Deque, Dict, List, Mapping, NamedTuple, Optional, Pattern
+
+# Lines kept per stream.
+OUTPUT_LINES = 200
+
+COUNTERS: Dict[str, Pattern[bytes]] = {
+    "underruns": re.compile(rb"(?i)under-?run"),
+    "overflows": re.compile(rb"(?i)over-?(?:flow|run)"),
+    "connects": re.compile(rb"(?i)received connection from peer"),
+}
+# The group captures the number of frames.
+BUFFER_SIZE = re.compile(rb"(?i)buffer size\s*[:=]?\s*(\d+)")
+
+
+class StreamMetrics(NamedTuple):
+    """Counters parsed from one stream's output."""
+
+    lines: int
+    underruns: int
+    overflows: int
+    reconnects: int  # connections after the first
+    buffer_size: Optional[int]  # last size reported, in frames
+
+
+class StreamOutput:
+    """Ring buffer of a stream's output with counters parsed from it.
+
+    ``on_line`` is called with every raw line after it has been counted.
+    """
+
+    def __init__(
+        self,
+        maxlen: int = OUTPUT_LINES,
+        *,
+        counters: Optional[Mapping[str, Pattern[bytes]]] = None,
+        buffer_size: Pattern[bytes] = BUFFER_SIZE,
+        on_line: Optional[Callable[[bytes], None]] = None,
+    ) -> None:
+        self.counters = dict(COUNTERS if counters is None else counters)
+        self.buffer_size_pattern = buffer_size
+        self.on_line = on_line
+        self.counts: Dict[str, int] = dict.fromkeys(self.counters, 0)
+        self.buffer_size: Optional[int] = None
+        self.total = 0
+        self._lines: Deque[bytes] = deque(maxlen=maxlen)
+
+    def feed(self, line: bytes) -> None:
+        """Record one line of output."""
+        self.total += 1
+        self._lines.append(line)
+        for name, pattern in self.counters.items():
+            if pattern.search(line):
+                self.counts[name] += 1
+        match = self.buffer_size_pattern.search(line)
+        if match:
+            self.buffer_size = int(match.group(1))
+        if self.on_line is not None:
+            self.on_line(line)
+
+    def lines(self) -> List[str]:
+        """The buffered lines, oldest first."""
+        return [line.decode(errors="replace").rstrip() for line in self._lines]
+
+    def metrics(self) -> StreamMetrics:
+        return StreamMetrics(
+            lines=self.total,
+            underruns=self.counts.get("underruns", 0),
+            overflows=self.counts.get("overflows", 0),
+            reconnects=max(self.counts.get("connects", 0) - 1, 0),
+            buffer_size=self.buffer_size,
+        )
+
+    async def capture(self, reader: asyncio.StreamReader) -> None:
+        """Feed lines from ``reader`` until end of file."""
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:
+                # Over-long line; the reader has dropped it.
+                continue
+            if not line:
+                return
+            self.feed(line)
@@ -0,0 +1,266 @@
+"""Pre-warmed jacktrip sessions for fast scene changes.
+
+Launching a session on demand costs a fork/exec, jacktrip start-up, and JACK
+client registration before the session can carry audio. A
+:class:`SessionPool` pays those costs ahead of time. It keeps ``size`` idle
+jacktrip servers (``jacktrip -s``), each registered with JACK and listening
+on its own port, and :meth:`SessionPool.acquire` binds one to a peer
+immediately. The peer then connects to the slot's port. A replacement slot
+is spawned in the background after each acquire.
+
+A slot counts as ready once jacktrip prints a line matching
+``ready_pattern``; pass ``ready_pattern=None`` to treat slots as ready as
+soon as they are spawned. Slot output is captured like that of
+``start_stream_async(capture=True)``, so :func:`~audiomesh.stream_metrics`
+works for acquired slots. A fixed latency ``profile`` applies to every
+slot; ``"auto"`` cannot be used because slots are started before their peer
+is known.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import re
+from typing import List, Optional, Pattern, Set, Union
+
+from . import (
+    STOP_TIMEOUT,
+    JackError,
+    _launch_async,
+    _register,
+    resolve_jacktrip,
+    stop_stream_async,
+    wait_stream,
+)
+from .latency import PROFILES, Profile
+from .output import StreamOutput
+
+logger = logging.getLogger(__name__)
+
+# jacktrip's default hub/peer port.
+BASE_PORT = 4464
+READY_PATTERN = re.compile(rb"[Ww]aiting for [Pp]eer")
+READY_TIMEOUT = 10.0
+# Seconds before an idle slot that exited is replaced.
+RESPAWN_DELAY = 1.0
+
+
+class PoolSlot:
+    """One pre-spawned jacktrip server."""
+
+    def __init__(self, pid: int, port: int, client_name: str) -> None:
+        self.pid = pid
+        self.port = port
+        self.client_name = client_name
+        self.peer_ip: Optional[str] = None
+        self.ready = asyncio.Event()
+        self.alive = True
+
+    def check_ready(self, line: bytes, pattern: Pattern[bytes]) -> None:
+        if not self.ready.is_set() and pattern.search(line):
+            self.ready.set()
+
+
+class SessionPool:
+    """Keep ``size`` idle, ready jacktrip sessions for :meth:`acquire`.
+
+    Slots listen on ports from ``base_port`` upwards, at most ``max_slots``
+    of them at a time (idle plus bound).
+    """
+
+    def __init__(
+        self,
+        size: int = 4,
+        *,
+        base_port: int = BASE_PORT,
+        max_slots: Optional[int] = None,
+        name_prefix: str = "audiomesh-pool",
+        ready_pattern: Optional[Pattern[bytes]] = READY_PATTERN,
+        ready_timeout: float = READY_TIMEOUT,
+        stop_timeout: float = STOP_TIMEOUT,
+        profile: Union[str, Profile, None] = None,
+    ) -> None:
+        if size < 1:
+            raise ValueError("size must be at least 1")
+        if isinstance(profile, str):
+            if profile not in PROFILES:
+                raise ValueError(f"pool cannot use latency profile {profile!r}")
+            profile = PROFILES[profile]
+        self.profile = profile
+        self.size = size
+        self.base_port = base_port
+        self.max_slots = max_slots if max_slots is not None else size * 4
+        self.name_prefix = name_prefix
+        self.ready_pattern = ready_pattern
+        self.ready_timeout = ready_timeout
+        self.stop_timeout = stop_timeout
+        self._idle: List[PoolSlot] = []
+        self._ports: Set[int] = set()
+        # Slots being spawned to top the pool up.
+        self._refills: Set[asyncio.Task[None]] = set()
+        # One per slot; keeps draining output after the slot is bound.
+        self._watchers: Set[asyncio.Task[None]] = set()
+        self._closed = False
+
+    @property
+    def idle(self) -> int:
+        """Number of idle slots, ready or still starting."""
+        return len(self._idle)
+
+    async def start(self) -> None:
+        """Validate jacktrip and fill the pool, waiting until it is ready.
+
+        If any slot fails to start, every slot is stopped, the pool is
+        closed and :class:`~audiomesh.JackError` is raised.
+        """
+        resolve_jacktrip(refresh=True)
+        try:
+            await self._warm_up()
+        except BaseException:
+            await self.close()
+            raise
+
+    async def _warm_up(self) -> None:
+        results = await asyncio.gather(
+            *(self._spawn() for _ in range(self.size)), return_exceptions=True
+        )
+        slots = [result for result in results if isinstance(result, PoolSlot)]
+        self._idle.extend(slots)
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        await self.wait_ready()
+        for slot in slots:
+            if not slot.alive:
+                raise JackError(f"pool session {slot.client_name} exited on start")
+
+    async def wait_ready(self) -> None:
+        """Wait until every idle slot is ready.
+
+        Raises :class:`~audiomesh.JackError` after ``ready_timeout``.
+        """
+        try:
+            await asyncio.wait_for(
+                asyncio.gather(*(slot.ready.wait() for slot in self._idle)),
+                self.ready_timeout,
+            )
+        except asyncio.TimeoutError:
+            raise JackError(
+                f"pool sessions not ready after {self.ready_timeout}s"
+            ) from None
+
+    async def acquire(self, peer_ip: str) -> PoolSlot:
+        """Bind an idle slot to ``peer_ip`` and return it.
+
+        Ready slots are handed out first. If none is idle, one is spawned on
+        the spot, which is as slow as an unpooled launch.
+        """
+        if self._closed:
+            raise JackError("session pool is closed")
+        slot = next((s for s in self._idle if s.ready.is_set()), None)
+        if slot is None and self._idle:
+            slot = self._idle[0]
+        if slot is not None:
+            # Claim it before waiting so concurrent callers get other slots.
+            self._idle.remove(slot)
+        else:
+            slot = await self._spawn()
+        self._refill()
+        try:
+            await self._ready(slot)
+        except BaseException:
+            # The slot is no longer idle, so nothing else would stop it.
+            await self.release(slot)
+            raise
+        slot.peer_ip = peer_ip
+        await asyncio.to_thread(_register, slot.pid, peer_ip, slot.client_name)
+        return slot
+
+    async def _ready(self, slot: PoolSlot) -> None:
+        try:
+            await asyncio.wait_for(slot.ready.wait(), self.ready_timeout)
+        except asyncio.TimeoutError:
+            raise JackError(
+                f"pool session {slot.client_name} not ready after "
+                f"{self.ready_timeout}s"
+            ) from None
+        if not slot.alive:
+            raise JackError(f"pool session {slot.client_name} exited")
+
+    async def release(self, slot: PoolSlot) -> None:
+        """Stop a slot returned by :meth:`acquire`."""
+        try:
+            await stop_stream_async(slot.pid, self.stop_timeout)
+        except JackError:
+            pass  # already exited
+        self._refill()
+
+    async def close(self) -> None:
+        """Stop the idle slots. Bound slots are left to their owners."""
+        self._closed = True
+        for task in list(self._refills):
+            task.cancel()
+        await asyncio.gather(*self._refills, return_exceptions=True)
+        idle, self._idle = self._idle, []
+        await asyncio.gather(*(self.release(slot) for slot in idle))
+
+    def _refill(self) -> None:
+        if self._closed:
+            return
+        for _ in range(self.size - len(self._idle) - len(self._refills)):
+            task = asyncio.create_task(self._add_slot())
+            self._refills.add(task)
+            task.add_done_callback(self._refills.discard)
+
+    async def _add_slot(self) -> None:
+        try:
+            self._idle.append(await self._spawn())
+        except JackError as exc:
+            logger.warning("could not refill session pool: %s", exc)
+
+    def _next_port(self) -> int:
+        for port in range(self.base_port, self.base_port + self.max_slots):
+            if port not in self._ports:
+                self._ports.add(port)
+                return port
+        raise JackError("no free session pool ports")
+
+    async def _spawn(self) -> PoolSlot:
+        port = self._next_port()
+        name = f"{self.name_prefix}-{port}"
+        cmd = [resolve_jacktrip(), "-s", "--bindport", str(port), "--clientname", name]
+        if self.profile is not None:
+            cmd += self.profile.args()
+        output = StreamOutput()
+        try:
+            proc = await _launch_async(cmd, "", name, output)
+        except JackError:
+            self._ports.discard(port)
+            raise
+        slot = PoolSlot(proc.pid, port, name)
+        pattern = self.ready_pattern
+        if pattern is None:
+            slot.ready.set()
+        else:
+            output.on_line = lambda line: slot.check_ready(line, pattern)
+        task = asyncio.create_task(self._watch(slot))
+        self._watchers.add(task)
+        task.add_done_callback(self._watchers.discard)
+        return slot
+
+    async def _watch(self, slot: PoolSlot) -> None:
+        """Notice the exit of ``slot``'s process."""
+        try:
+            await wait_stream(slot.pid)
+        except JackError:
+            pass  # already exited
+        slot.alive = False
+        # Wake any acquire() waiting on a slot that will never be ready.
+        slot.ready.set()
+        self._ports.discard(slot.port)
+        if slot in self._idle:
+            logger.warning("idle pool session %s exited", slot.client_name)
+            self._idle.remove(slot)
+            # Pause before replacing it so a broken setup cannot spin.
+            asyncio.get_running_loop().call_later(RESPAWN_DELAY, self._refill)
@@ -0,0 +1,211 @@
+"""Persistent registry of running jacktrip streams.
+
+Streams are recorded in a small SQLite database, so a stream started by one
+``audiomesh audio-core`` invocation can be listed and stopped by another.
+The database lives at ``~/.audiomesh/streams.db`` unless
+``AUDIOMESH_STREAM_DB`` names another file.
+
+PIDs are reused by the kernel, so each record also stores the process start
+time from ``/proc/<pid>/stat``. A record only refers to a live stream while
+a process with that PID *and* that start time exists; stale records are
+dropped when they are looked up. :class:`ExitWatcher` removes records as
+soon as their process exits, using Linux pidfds and the event loop instead
+of polling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS streams (
+    pid INTEGER PRIMARY KEY,
+    peer_ip TEXT NOT NULL,
+    client_name TEXT NOT NULL,
+    started REAL NOT NULL,
+    start_ticks INTEGER
+)
+"""
+
+
+def registry_path() -> Path:
+    return Path(
+        os.environ.get("AUDIOMESH_STREAM_DB", "~/.audiomesh/streams.db")
+    ).expanduser()
+
+
+class StreamRecord(NamedTuple):
+    """A registered stream process."""
+
+    pid: int
+    peer_ip: str
+    client_name: str
+    started: float  # wall-clock launch time
+    start_ticks: Optional[int]  # kernel start time, for PID reuse checks
+
+
+def process_start_ticks(pid: int) -> Optional[int]:
+    """Start time of ``pid`` in clock ticks since boot, or ``None``.
+
+    ``None`` means the process does not exist or ``/proc`` is unavailable.
+    """
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as fh:
+            stat = fh.read()
+    except OSError:
+        return None
+    # The command name may contain spaces; fields resume after its ")".
+    fields = stat[stat.rindex(b")") + 2 :].split()
+    return int(fields[19])
+
+
+def is_alive(record: StreamRecord) -> bool:
+    """Whether ``record``'s process is still running."""
+    if record.start_ticks is not None:
+        return process_start_ticks(record.pid) == record.start_ticks
+    try:
+        os.kill(record.pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class StreamRegistry:
+    """Stream records keyed by PID, shared by every process on the host.
+
+    Use as a context manager; each instance holds one database connection.
+    """
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path if path is not None else registry_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(SCHEMA)
+
+    def __enter__(self) -> StreamRegistry:
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._db.close()
+
+    def add(self, pid: int, peer_ip: str, client_name: str) -> StreamRecord:
+        record = StreamRecord(
+            pid, peer_ip, client_name, time.time(), process_start_ticks(pid)
+        )
+        # A leftover record for a reused PID is replaced.
+        self._db.execute(
+            "INSERT OR REPLACE INTO streams VALUES (?, ?, ?, ?, ?)", record
+        )
+        return record
+
+    def get(self, pid: int) -> Optional[StreamRecord]:
+        """Return the live stream with ``pid``; a stale record is removed."""
+        row = self._db.execute("SELECT * FROM streams WHERE pid = ?", (pid,))
+        found = row.fetchone()
+        if found is None:
+            return None
+        record = StreamRecord(*found)
+        if not is_alive(record):
+            self.remove(pid)
+            return None
+        return record
+
+    def remove(self, pid: int) -> None:
+        self._db.execute("DELETE FROM streams WHERE pid = ?", (pid,))
+
+    def records(self) -> List[StreamRecord]:
+        """Return every live stream, dropping records of exited ones."""
+        rows = self._db.execute("SELECT * FROM streams ORDER BY started")
+        live: List[StreamRecord] = []
+        stale: List[StreamRecord] = []
+        for row in rows.fetchall():
+            record = StreamRecord(*row)
+            (live if is_alive(record) else stale).append(record)
+        if stale:
+            self._db.executemany(
+                "DELETE FROM streams WHERE pid = ?", [(r.pid,) for r in stale]
+            )
+        return live
+
+
+def open_pidfd(pid: int) -> Optional[int]:
+    """Return a pidfd for ``pid``, or ``None`` if it has exited or pidfds are
+    unsupported."""
+    pidfd_open = getattr(os, "pidfd_open", None)
+    if pidfd_open is None:  # pragma: no cover - Linux < 5.3 or other OS
+        return None
+    try:
+        fd: int = pidfd_open(pid)
+    except OSError:
+        return None
+    return fd
+
+
+class ExitWatcher:
+    """Call ``on_exit(pid)`` from the event loop when watched processes exit.
+
+    Each watched process gets a pidfd, which becomes readable when the
+    process terminates, registered with ``loop.add_reader``. Nothing is
+    polled, and watching works for any process, not only children.
+    """
+
+    def __init__(
+        self,
+        on_exit: Callable[[int], None],
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+    ) -> None:
+        self.on_exit = on_exit
+        self.loop = loop if loop is not None else asyncio.get_running_loop()
+        self._fds: Dict[int, int] = {}
+
+    def __contains__(self, pid: int) -> bool:
+        return pid in self._fds
+
+    def watch(self, pid: int) -> bool:
+        """Start watching ``pid``.
+
+        Returns ``False`` if pidfds are unsupported. A process that has
+        already exited is reported through ``on_exit`` straight away.
+        """
+        if pid in self._fds:
+            return True
+        fd = open_pidfd(pid)
+        if fd is None:
+            if not hasattr(os, "pidfd_open"):  # pragma: no cover - no pidfd
+                return False
+            self.loop.call_soon(self.on_exit, pid)
+            return True
+        self._fds[pid] = fd
+        self.loop.add_reader(fd, self._exited, pid)
+        return True
+
+    def unwatch(self, pid: int) -> None:
+        fd = self._fds.pop(pid, None)
+        if fd is not None:
+            self.loop.remove_reader(fd)
+            os.close(fd)
+
+    def _exited(self, pid: int) -> None:
+        self.unwatch(pid)
+        try:
+            self.on_exit(pid)
+        except Exception:  # pragma: no cover - defensive
+            logger.exception("exit handler failed for %d", pid)
+
+    def close(self) -> None:
+        for pid in list(self._fds):
+            self.unwatch(pid)
@@ -0,0 +1,131 @@
+"""Throttled rendering of the live discovery peer table.
+
+Peer events only mark the table dirty; :class:`TableRenderer` redraws at most
+once per ``refresh`` seconds, so output cost no longer scales with packet
+rate. On a terminal, rows are rewritten in place and unchanged rows are
+skipped; otherwise the full table is printed on each redraw.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import shutil
+import sys
+import time
+from collections.abc import Callable
+from typing import Any, TextIO
+
+from tabulate import tabulate
+
+HEADERS = ["ID", "IP", "PORT", "LAST SEEN"]
+LINK_HEADERS = ["JITTER", "LOSS"]
+
+# ANSI control sequences used for in-place updates.
+CLEAR_LINE = "\x1b[2K"
+CLEAR_BELOW = "\x1b[J"
+NEXT_LINE = "\x1b[1E"
+
+
+def _link_columns(stats: dict[str, float] | None) -> list[str]:
+    if stats is None:
+        return ["-", "-"]
+    return [f"{stats['jitter_ms']:.0f}ms", f"{stats['loss']:.0%}"]
+
+
+def format_table(
+    peers: dict[str, dict[str, Any]],
+    age: Callable[[str], float | None] | None = None,
+    link: Callable[[str], dict[str, float] | None] | None = None,
+) -> str:
+    rows = []
+    now = time.time()
+    for nid, data in peers.items():
+        seen = age(nid) if age is not None else None
+        if seen is None:
+            seen = now - data["ts"]
+        row = [nid, data["ip"], data["port"], f"{seen:.0f}s ago"]
+        if link is not None:
+            row.extend(_link_columns(link(nid)))
+        rows.append(row)
+    if not rows:
+        return "no peers"
+    headers = HEADERS + LINK_HEADERS if link is not None else HEADERS
+    table: str = tabulate(rows, headers=headers)
+    return table
+
+
+class TableRenderer:
+    """Redraw ``peers`` on ``stream`` at most every ``refresh`` seconds."""
+
+    def __init__(
+        self,
+        peers: dict[str, dict[str, Any]],
+        age: Callable[[str], float | None] | None = None,
+        link: Callable[[str], dict[str, float] | None] | None = None,
+        *,
+        refresh: float = 1.0,
+        stream: TextIO | None = None,
+        in_place: bool | None = None,
+    ) -> None:
+        self.peers = peers
+        self.age = age
+        self.link = link
+        self.refresh = refresh
+        self.stream = stream if stream is not None else sys.stdout
+        if in_place is None:
+            in_place = self.stream.isatty()
+        self.in_place = in_place
+        self.dirty = False
+        self._lines: list[str] = []
+        self._task: asyncio.Task[None] | None = None
+
+    def mark_dirty(self) -> None:
+        self.dirty = True
+
+    def render(self) -> bool:
+        """Draw the table if it changed since the last draw."""
+        if not self.dirty:
+            return False
+        self.dirty = False
+        lines = format_table(self.peers, self.age, self.link).splitlines()
+        if self.in_place:
+            self.stream.write(self._diff(lines))
+        else:
+            self.stream.write("\n".join(lines) + "\n")
+        self.stream.flush()
+        self._lines = lines
+        return True
+
+    def _diff(self, lines: list[str]) -> str:
+        prev = self._lines
+        if not prev or len(prev) >= shutil.get_terminal_size().lines:
+            # Nothing drawn yet, or the old table scrolled out of reach.
+            return "".join(line + "\n" for line in lines)
+        out = [f"\x1b[{len(prev)}F"]
+        for i, line in enumerate(lines):
+            if i < len(prev) and prev[i] == line:
+                out.append(NEXT_LINE)
+            else:
+                out.append(CLEAR_LINE + line + "\n")
+        if len(lines) < len(prev):
+            out.append(CLEAR_BELOW)
+        return "".join(out)
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.refresh)
+            self.render()
+
+    def start(self) -> None:
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the refresh task and draw any pending change."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        self.render()
@@ -0,0 +1,318 @@
+"""Keep jacktrip sessions running.
+
+A :class:`Supervisor` owns one task per session. The task launches jacktrip
+with :func:`~audiomesh.start_stream_async`, or
+:func:`~audiomesh.start_hub_async` for a session in ``hub`` mode, and waits
+for it to exit; the
+child watcher wakes it, nothing is polled. A session that exits or fails to
+launch is restarted after a capped exponential backoff with jitter. The
+failure count resets once a session has stayed up for ``stable_after``
+seconds.
+
+Sessions can follow discovery (:meth:`Supervisor.follow`). When the
+:class:`~discovery.listener.Listener` reports a peer removed, its sessions
+are *parked*: stopped, without restart. When the peer reappears they resume
+immediately with a fresh backoff, and if it comes back on a new address
+they restart with that address.
+
+With ``capture=True`` each session's jacktrip output is parsed into
+:class:`~audiomesh.StreamMetrics`, reported by :meth:`Supervisor.status` and
+logged when the session exits. With ``profile="auto"`` the profile is
+chosen again at every restart: from the listener's link statistics for the
+peer while following discovery, otherwise by probing the link.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import random
+from typing import Any, Dict, List, Optional, Union
+
+from discovery.listener import Listener
+
+from . import (
+    STOP_TIMEOUT,
+    JackError,
+    StreamMetrics,
+    start_hub_async,
+    start_stream_async,
+    stop_stream_async,
+    stream_metrics,
+    wait_stream,
+)
+from .latency import Profile, choose_profile, link_sample
+
+logger = logging.getLogger(__name__)
+
+MIN_BACKOFF = 0.5
+MAX_BACKOFF = 30.0
+STABLE_AFTER = 10.0
+
+
+class Session:
+    """A supervised jacktrip session.
+
+    ``state`` is one of ``starting``, ``running``, ``backoff``, ``parked``
+    or ``stopped``. ``mode`` is ``client`` for a session to ``peer_ip`` or
+    ``hub`` for a hub server, which follows no peer.
+    """
+
+    def __init__(
+        self,
+        peer_ip: str,
+        client_name: str,
+        node_id: Optional[bytes] = None,
+        mode: str = "client",
+    ) -> None:
+        self.peer_ip = peer_ip
+        self.client_name = client_name
+        self.node_id = node_id
+        self.mode = mode
+        self.state = "stopped"
+        self.pid: Optional[int] = None
+        self.restarts = 0
+        self.failures = 0
+        self.last_exit: Optional[int] = None
+        # Of the current run, or of the last one once it has exited.
+        self.metrics: Optional[StreamMetrics] = None
+        self.task: Optional[asyncio.Task[None]] = None
+
+    def matches(self, node_id: bytes, ip: str) -> bool:
+        if self.mode == "hub":
+            return False
+        if self.node_id is not None:
+            return self.node_id == node_id
+        return self.peer_ip == ip
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "peer_ip": self.peer_ip,
+            "client_name": self.client_name,
+            "mode": self.mode,
+            "node_id": self.node_id.hex() if self.node_id else None,
+            "state": self.state,
+            "pid": self.pid,
+            "restarts": self.restarts,
+            "last_exit": self.last_exit,
+            "metrics": self.metrics._asdict() if self.metrics else None,
+        }
+
+
+class Supervisor:
+    """Restart failed sessions and tie their lifetime to discovery.
+
+    Sessions are keyed by JACK client name, which is unique per host.
+    """
+
+    def __init__(
+        self,
+        *,
+        min_backoff: float = MIN_BACKOFF,
+        max_backoff: float = MAX_BACKOFF,
+        stable_after: float = STABLE_AFTER,
+        jitter: float = 0.1,
+        stop_timeout: float = STOP_TIMEOUT,
+        capture: bool = False,
+        profile: Union[str, Profile, None] = None,
+    ) -> None:
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.stable_after = stable_after
+        self.jitter = jitter
+        self.stop_timeout = stop_timeout
+        self.capture = capture
+        self.profile = profile
+        self.sessions: Dict[str, Session] = {}
+        self._listener: Optional[Listener] = None
+
+    def backoff(self, failures: int) -> float:
+        """Delay before restart attempt number ``failures``."""
+        delay = min(self.max_backoff, self.min_backoff * 2.0 ** (failures - 1))
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def add(
+        self,
+        peer_ip: str,
+        client_name: str,
+        node_id: Optional[bytes] = None,
+        *,
+        parked: bool = False,
+        mode: str = "client",
+    ) -> Session:
+        """Supervise a new session; ``parked`` waits for its peer to appear."""
+        if client_name in self.sessions:
+            raise ValueError(f"session {client_name!r} already supervised")
+        if mode not in ("client", "hub"):
+            raise ValueError(f"unknown session mode {mode!r}")
+        session = self.sessions[client_name] = Session(
+            peer_ip, client_name, node_id, mode
+        )
+        if parked:
+            session.state = "parked"
+        else:
+            self._start(session)
+        return session
+
+    async def remove(self, client_name: str) -> None:
+        """Stop supervising ``client_name`` and stop its process."""
+        session = self.sessions.pop(client_name)
+        await self._halt(session, "stopped")
+
+    def peer_seen(self, node_id: bytes, ip: str) -> None:
+        """Resume parked sessions for a peer, following address changes."""
+        for session in self.sessions.values():
+            if not session.matches(node_id, ip):
+                continue
+            session.node_id = node_id
+            moved = session.peer_ip != ip
+            session.peer_ip = ip
+            if session.state == "parked" or moved:
+                logger.info("peer of %s is up at %s", session.client_name, ip)
+                session.failures = 0
+                self._start(session)
+
+    def peer_removed(self, node_id: bytes, ip: str = "") -> None:
+        """Park every session for a peer that discovery lost."""
+        for session in self.sessions.values():
+            if session.state != "parked" and session.matches(node_id, ip):
+                logger.info("peer of %s is gone; parking", session.client_name)
+                session.node_id = node_id
+                self._cancel(session, "parked")
+
+    async def follow(self, listener: Listener) -> None:
+        """Apply ``listener``'s peer events until it stops."""
+        self._listener = listener
+        try:
+            async with listener.events() as events:
+                for node_id, peer in list(listener.peers.items()):
+                    self.peer_seen(node_id, peer.ip)
+                async for event in events:
+                    if event.kind == "removed":
+                        self.peer_removed(event.node_id, event.ip)
+                    else:
+                        self.peer_seen(event.node_id, event.ip)
+        finally:
+            self._listener = None
+
+    def status(self) -> List[Dict[str, Any]]:
+        for session in self.sessions.values():
+            self._update_metrics(session)
+        return [session.as_dict() for session in self.sessions.values()]
+
+    async def close(self) -> None:
+        """Stop every session."""
+        await asyncio.gather(
+            *(self._halt(session, "stopped") for session in self.sessions.values())
+        )
+
+    def _start(self, session: Session) -> None:
+        previous = self._cancel(session, "starting")
+        session.task = asyncio.create_task(self._run(session, previous))
+
+    def _cancel(self, session: Session, state: str) -> Optional[asyncio.Task[None]]:
+        """Cancel ``session``'s task, which stops its process, and return it."""
+        session.state = state
+        task, session.task = session.task, None
+        if task is not None:
+            task.cancel()
+        return task
+
+    async def _halt(self, session: Session, state: str) -> None:
+        task = self._cancel(session, state)
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def _run(
+        self, session: Session, previous: Optional[asyncio.Task[None]]
+    ) -> None:
+        if previous is not None:
+            # The old process must be gone before its client name is reused.
+            await asyncio.gather(previous, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        while True:
+            session.state = "starting"
+            started = loop.time()
+            await self._run_once(session)
+            if loop.time() - started >= self.stable_after:
+                session.failures = 0
+            session.failures += 1
+            session.restarts += 1
+            delay = self.backoff(session.failures)
+            logger.warning(
+                "session %s exited (%s); restarting in %.1fs",
+                session.client_name,
+                session.last_exit,
+                delay,
+            )
+            if session.metrics is not None:
+                logger.info("session %s: %s", session.client_name, session.metrics)
+            session.state = "backoff"
+            await asyncio.sleep(delay)
+
+    def _profile_for(self, session: Session) -> Union[str, Profile, None]:
+        """Choose ``"auto"`` from discovery's link statistics if it has any."""
+        if self.profile != "auto" or self._listener is None:
+            return self.profile
+        stats = None
+        if session.node_id is not None:
+            stats = self._listener.link_stats(session.node_id)
+        if stats is None:
+            return self.profile  # probe the link instead
+        chosen = choose_profile(link_sample(stats))
+        logger.info(
+            "link to %s: jitter %.2f ms, loss %.1f%%; queue %d, redundancy %d",
+            session.peer_ip,
+            stats["jitter_ms"],
+            stats["loss"] * 100,
+            chosen.queue,
+            chosen.redundancy,
+        )
+        return chosen
+
+    async def _run_once(self, session: Session) -> None:
+        if session.mode == "hub":
+            start = start_hub_async(self.profile, capture=self.capture)
+        else:
+            start = start_stream_async(
+                session.peer_ip,
+                session.client_name,
+                self._profile_for(session),
+                capture=self.capture,
+            )
+        launch = asyncio.ensure_future(start)
+        try:
+            try:
+                session.pid = await asyncio.shield(launch)
+            except asyncio.CancelledError:
+                # Let a launch in flight finish so its process can be stopped.
+                try:
+                    session.pid = await launch
+                except JackError:
+                    pass
+                raise
+            session.state = "running"
+            session.last_exit = await wait_stream(session.pid)
+            self._update_metrics(session)
+        except JackError as exc:
+            logger.warning("session %s: %s", session.client_name, exc)
+        except asyncio.CancelledError:
+            await self._stop_process(session)
+            raise
+        session.pid = None
+
+    def _update_metrics(self, session: Session) -> None:
+        if self.capture and session.pid is not None:
+            try:
+                session.metrics = stream_metrics(session.pid)
+            except JackError:
+                pass  # launch failed; keep the previous run's
+
+    async def _stop_process(self, session: Session) -> None:
+        pid, session.pid = session.pid, None
+        if pid is None:
+            return
+        try:
+            await stop_stream_async(pid, self.stop_timeout)
+        except JackError:
+            pass  # already exited
@@ -0,0 +1,275 @@
+"""Scaling benchmarks for the discovery listener.
+
+Run with ``python -m benchmarks.discovery_suite``. Virtual announcers from
+:mod:`benchmarks.loadgen` drive a real :class:`~discovery.listener.Listener`
+on loopback and four metrics are recorded:
+
+``ingest``
+    Peak packets/sec and listener CPU microseconds per packet while a
+    generator blasts announcements as fast as it can.
+``convergence``
+    Seconds until every virtual node is in the peer table when all nodes
+    start announcing at random phases.
+``expiry``
+    How long after ``last seen + timeout`` each peer's ``on_removed`` fired
+    once its announcements stop.
+
+Results are written as JSON. ``--compare`` checks them against a previous
+run and exits non-zero when a metric regresses beyond ``--tolerance``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import platform
+import resource
+import socket
+import statistics
+import sys
+import time
+from importlib import metadata
+from pathlib import Path
+from typing import Any, Dict, List
+
+from discovery.eventloop import LOOP_CHOICES, install_event_loop
+from discovery.listener import Listener
+from discovery.sharded import ShardedListener
+
+from .loadgen import LoadGenerator, node_ids
+
+RCVBUF = 8 * 1024 * 1024
+# Metric paths and whether larger values are better.
+TRACKED = {
+    ("ingest", "packets_per_sec"): True,
+    ("ingest", "cpu_us_per_packet"): False,
+    ("convergence", "seconds"): False,
+    ("expiry", "p99_latency_ms"): False,
+}
+
+
+def _free_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+    return port
+
+
+def _percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def _start_listener(listener: Listener) -> None:
+    await listener.start()
+    if listener._reader is not None:
+        sock = listener._reader.sock
+    else:
+        assert listener.transport is not None
+        sock = listener.transport.get_extra_info("socket")
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF)
+
+
+async def bench_ingest(
+    nodes: int, packets: int, batch: bool, workers: int = 1
+) -> Dict[str, Any]:
+    port = _free_port()
+    received = 0
+    first = last = 0.0
+
+    def on_heartbeat(node_id: bytes, ip: str, port: int, ts: int) -> None:
+        nonlocal received, first, last
+        now = time.perf_counter()
+        if not received:
+            first = now
+        last = now
+        received += 1
+
+    listener: Listener
+    if workers > 1:
+        # Loopback unicast is balanced by the kernel, so keep every packet.
+        listener = ShardedListener(
+            lambda *_: None,
+            port=port,
+            workers=workers,
+            fanout=False,
+            recv_buffer=RCVBUF,
+            on_heartbeat=on_heartbeat,
+        )
+        await listener.start()
+    else:
+        listener = Listener(
+            lambda *_: None, port=port, batch=batch, on_heartbeat=on_heartbeat
+        )
+        await _start_listener(listener)
+    gen = LoadGenerator()
+    cpu_start = time.process_time()
+    gen.start_blast(("127.0.0.1", port), node_ids(nodes), packets, workers * 4)
+    idle_since = time.perf_counter()
+    seen = 0
+    while gen.running or time.perf_counter() - idle_since < 0.2:
+        await asyncio.sleep(0.01)
+        if received != seen:
+            seen = received
+            idle_since = time.perf_counter()
+    cpu = time.process_time() - cpu_start
+    gen.stop()
+    # Reaped worker processes show up in the children's usage; count theirs.
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    await listener.stop()
+    reaped = resource.getrusage(resource.RUSAGE_CHILDREN)
+    cpu += (reaped.ru_utime + reaped.ru_stime) - (children.ru_utime + children.ru_stime)
+    elapsed = max(last - first, 1e-9)
+    return {
+        "sent": packets,
+        "received": received,
+        "packets_per_sec": received / elapsed,
+        "cpu_us_per_packet": cpu / max(received, 1) * 1e6,
+    }
+
+
+async def bench_convergence(nodes: int, interval: float, batch: bool) -> Dict[str, Any]:
+    port = _free_port()
+    listener = Listener(lambda *_: None, port=port, batch=batch, timeout=interval * 3)
+    await _start_listener(listener)
+    gen = LoadGenerator()
+    start = time.perf_counter()
+    gen.start_announce(("127.0.0.1", port), node_ids(nodes), interval, interval * 3)
+    converged = None
+    while gen.running:
+        if len(listener.peers) >= nodes:
+            converged = time.perf_counter() - start
+            break
+        await asyncio.sleep(0.001)
+    gen.stop()
+    await listener.stop()
+    return {"nodes": nodes, "interval": interval, "seconds": converged}
+
+
+async def bench_expiry(
+    nodes: int, interval: float, timeout: float, batch: bool
+) -> Dict[str, Any]:
+    port = _free_port()
+    loop = asyncio.get_running_loop()
+    last_seen: Dict[bytes, float] = {}
+    latencies: List[float] = []
+
+    def on_heartbeat(node_id: bytes, ip: str, port: int, ts: int) -> None:
+        last_seen[node_id] = loop.time()
+
+    def on_removed(node_id: bytes) -> None:
+        latencies.append(loop.time() - (last_seen[node_id] + timeout))
+
+    listener = Listener(
+        lambda *_: None,
+        port=port,
+        batch=batch,
+        timeout=timeout,
+        on_removed=on_removed,
+        on_heartbeat=on_heartbeat,
+    )
+    await _start_listener(listener)
+    gen = LoadGenerator()
+    gen.start_announce(("127.0.0.1", port), node_ids(nodes), interval, interval * 2)
+    while gen.running:
+        await asyncio.sleep(0.05)
+    gen.stop()
+    deadline = loop.time() + timeout * 2 + 1
+    while listener.peers and loop.time() < deadline:
+        await asyncio.sleep(0.05)
+    await listener.stop()
+    ms = [lat * 1000 for lat in latencies]
+    return {
+        "removed": len(ms),
+        "mean_latency_ms": statistics.fmean(ms) if ms else None,
+        "p99_latency_ms": _percentile(ms, 99) if ms else None,
+        "max_latency_ms": max(ms) if ms else None,
+    }
+
+
+async def run_suite(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "ingest": await bench_ingest(
+            args.nodes, args.packets, args.batch, args.workers
+        ),
+        "convergence": await bench_convergence(args.nodes, args.interval, args.batch),
+        "expiry": await bench_expiry(
+            args.nodes, args.interval, args.timeout, args.batch
+        ),
+    }
+
+
+def compare(
+    current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float
+) -> List[str]:
+    """Return human-readable regressions of ``current`` against ``baseline``."""
+    problems = []
+    for (section, metric), higher_is_better in TRACKED.items():
+        new = current["results"].get(section, {}).get(metric)
+        old = baseline["results"].get(section, {}).get(metric)
+        if new is None or old is None or old == 0:
+            continue
+        change = (new - old) / abs(old)
+        if (higher_is_better and change < -tolerance) or (
+            not higher_is_better and change > tolerance
+        ):
+            problems.append(f"{section}.{metric}: {old:.4g} -> {new:.4g}")
+    return problems
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Discovery scaling benchmarks")
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--packets", type=int, default=200_000)
+    parser.add_argument("--interval", type=float, default=1.0)
+    parser.add_argument("--timeout", type=float, default=2.0)
+    parser.add_argument("--batch", action="store_true", help="Use batched ingest")
+    parser.add_argument(
+        "--workers", type=int, default=1, help="Sharded ingest processes"
+    )
+    parser.add_argument(
+        "--loop", choices=LOOP_CHOICES, default="asyncio", help="Event loop"
+    )
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    parser.add_argument("--compare", type=Path, help="Baseline JSON to check")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+    loop = install_event_loop(args.loop)
+
+    try:
+        version = metadata.version("audiomesh")
+    except metadata.PackageNotFoundError:
+        version = "unknown"
+    report = {
+        "version": version,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "timestamp": time.time(),
+        "params": {
+            "nodes": args.nodes,
+            "packets": args.packets,
+            "interval": args.interval,
+            "timeout": args.timeout,
+            "batch": args.batch,
+            "workers": args.workers,
+            "loop": loop,
+        },
+        "results": asyncio.run(run_suite(args)),
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+    if args.compare:
+        problems = compare(report, json.loads(args.compare.read_text()), args.tolerance)
+        for problem in problems:
+            print(f"regression: {problem}", file=sys.stderr)
+        return 1 if problems else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
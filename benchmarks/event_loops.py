@@ -0,0 +1,146 @@
+"""Compare discovery ingest and API latency across event loops.
+
+Run with ``python -m benchmarks.event_loops``. For each backend (the
+standard asyncio loop and, when installed, ``uvloop``) two workloads are
+measured in-process:
+
+``ingest``
+    The :mod:`benchmarks.discovery_suite` ingest benchmark: packets/sec and
+    CPU microseconds per packet for a :class:`~discovery.listener.Listener`
+    under a loopback flood.
+``api``
+    Latency of ``GET /health`` against the FastAPI app served by uvicorn on
+    loopback, from ``--connections`` keep-alive clients.
+
+Results are printed (or written with ``--output``) as JSON keyed by backend.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import importlib.util
+import json
+import socket
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import uvicorn
+
+from audiomesh.api import app
+from discovery.eventloop import install_event_loop
+
+from .discovery_suite import _percentile, bench_ingest
+
+REQUEST = b"GET /health HTTP/1.1\r\nHost: bench\r\n\r\n"
+
+
+def available_loops() -> List[str]:
+    loops = ["asyncio"]
+    if importlib.util.find_spec("uvloop") is not None:
+        loops.append("uvloop")
+    return loops
+
+
+def _free_tcp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as sock:
+        sock.bind(("127.0.0.1", 0))
+        port: int = sock.getsockname()[1]
+    return port
+
+
+async def _client(port: int, requests: int) -> List[float]:
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    latencies = []
+    try:
+        for _ in range(requests):
+            start = time.perf_counter()
+            writer.write(REQUEST)
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - start)
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return latencies
+
+
+async def bench_api(requests: int, connections: int) -> Dict[str, Any]:
+    port = _free_tcp_port()
+    config = uvicorn.Config(
+        app, host="127.0.0.1", port=port, log_level="warning", lifespan="off"
+    )
+    server = uvicorn.Server(config)
+    task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+    per_client = max(requests // connections, 1)
+    start = time.perf_counter()
+    try:
+        results = await asyncio.gather(
+            *(_client(port, per_client) for _ in range(connections))
+        )
+    finally:
+        elapsed = time.perf_counter() - start
+        server.should_exit = True
+        await task
+    ms = [latency * 1000 for result in results for latency in result]
+    return {
+        "requests": len(ms),
+        "requests_per_sec": len(ms) / elapsed,
+        "mean_latency_ms": statistics.fmean(ms),
+        "p50_latency_ms": _percentile(ms, 50),
+        "p99_latency_ms": _percentile(ms, 99),
+    }
+
+
+async def run_loop(args: argparse.Namespace) -> Dict[str, Any]:
+    return {
+        "ingest": await bench_ingest(args.nodes, args.packets, args.batch),
+        "api": await bench_api(args.requests, args.connections),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Event loop comparison")
+    parser.add_argument(
+        "--loops",
+        nargs="+",
+        choices=["asyncio", "uvloop"],
+        default=available_loops(),
+        help="Backends to measure (default: all installed)",
+    )
+    parser.add_argument("--nodes", type=int, default=2000)
+    parser.add_argument("--packets", type=int, default=200_000)
+    parser.add_argument("--batch", action="store_true", help="Use batched ingest")
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--connections", type=int, default=8)
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    args = parser.parse_args(argv)
+
+    report = {}
+    for name in args.loops:
+        try:
+            install_event_loop(name)
+        except RuntimeError as exc:
+            print(f"skipping {name}: {exc}", file=sys.stderr)
+            continue
+        report[name] = asyncio.run(run_loop(args))
+    install_event_loop("asyncio")
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,111 @@
+"""Compare per-packet and batched discovery ingest throughput.
+
+Run with ``python -m benchmarks.ingest``. Announcements are sent over UDP
+loopback to a socket owned by a :class:`~discovery.listener.Listener`, which
+is fed either through :class:`~discovery.listener.ListenerProtocol` (one call
+chain per datagram) or :class:`~discovery.listener.BatchReader` (one drain
+per wakeup).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import socket
+import time
+from typing import Callable
+
+from discovery.listener import BatchReader, Listener, ListenerProtocol
+from discovery.protocol import pack_announcement
+
+RCVBUF = 8 * 1024 * 1024
+
+
+def _packets(count: int, nodes: int) -> list[bytes]:
+    ids = [i.to_bytes(16, "big") for i in range(nodes)]
+    return [pack_announcement(ids[i % nodes], 5000, i) for i in range(count)]
+
+
+def _receiver() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, RCVBUF)
+    sock.bind(("127.0.0.1", 0))
+    return sock
+
+
+async def _drive(
+    sock: socket.socket,
+    packets: list[bytes],
+    chunk: int,
+    processed: Callable[[], int],
+) -> float:
+    """Send ``packets`` in chunks and return seconds spent ingesting them."""
+    loop = asyncio.get_running_loop()
+    send = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    target = sock.getsockname()
+    elapsed = 0.0
+    try:
+        for start in range(0, len(packets), chunk):
+            before = processed()
+            for pkt in packets[start : start + chunk]:
+                send.sendto(pkt, target)
+            sent = min(chunk, len(packets) - start)
+            t0 = time.perf_counter()
+            deadline = loop.time() + 2.0
+            while processed() - before < sent and loop.time() < deadline:
+                await asyncio.sleep(0)
+            elapsed += time.perf_counter() - t0
+    finally:
+        send.close()
+    return elapsed
+
+
+async def bench_per_packet(packets: list[bytes], chunk: int) -> float:
+    count = 0
+
+    def on_heartbeat(node_id: bytes, ip: str, port: int, ts: int) -> None:
+        nonlocal count
+        count += 1
+
+    listener = Listener(lambda *_: None, on_heartbeat=on_heartbeat)
+    listener._loop = asyncio.get_running_loop()
+    sock = _receiver()
+    transport, _ = await listener._loop.create_datagram_endpoint(
+        lambda: ListenerProtocol(listener._handle_announcement), sock=sock
+    )
+    try:
+        elapsed = await _drive(sock, packets, chunk, lambda: count)
+    finally:
+        transport.close()
+    return count / elapsed
+
+
+async def bench_batched(packets: list[bytes], chunk: int) -> float:
+    listener = Listener(lambda *_: None, on_batch=lambda batch: None)
+    listener._loop = asyncio.get_running_loop()
+    sock = _receiver()
+    # Batches collapse duplicates per node, so count raw datagrams drained.
+    reader = BatchReader(sock, listener._handle_batch)
+    reader.start(listener._loop)
+    try:
+        elapsed = await _drive(sock, packets, chunk, lambda: reader.received)
+    finally:
+        reader.close()
+    return reader.received / elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--packets", type=int, default=200_000)
+    parser.add_argument("--nodes", type=int, default=500)
+    parser.add_argument("--chunk", type=int, default=2_000)
+    args = parser.parse_args()
+    packets = _packets(args.packets, args.nodes)
+    per_packet = asyncio.run(bench_per_packet(packets, args.chunk))
+    batched = asyncio.run(bench_batched(packets, args.chunk))
+    print(f"per-packet: {per_packet:,.0f} pkt/s")
+    print(f"batched:    {batched:,.0f} pkt/s ({batched / per_packet:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
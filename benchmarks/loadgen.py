@@ -0,0 +1,148 @@
+"""Simulate many discovery announcers from a single process.
+
+Each virtual node has a distinct node id and announces every ``interval``
+seconds at its own random phase, mimicking a mesh of independent
+:class:`~discovery.announcer.Announcer` instances. Packets are sent unicast
+to the target so the generator also works on hosts without multicast
+loopback.
+"""
+
+from __future__ import annotations
+
+import multiprocessing
+import random
+import socket
+import time
+from typing import Callable, Optional, Sequence
+
+from discovery.protocol import PACKET_STRUCT
+
+# Granularity of the pacing loop; sends due within one tick go out together.
+TICK = 0.002
+
+
+def node_ids(count: int, seed: int = 0) -> list[bytes]:
+    """Return ``count`` distinct, reproducible 16-byte node ids."""
+    rng = random.Random(seed)
+    ids = {rng.getrandbits(128).to_bytes(16, "big") for _ in range(count)}
+    while len(ids) < count:  # pragma: no cover - 128-bit collision
+        ids.add(rng.getrandbits(128).to_bytes(16, "big"))
+    return sorted(ids)
+
+
+def announce(
+    target: tuple[str, int],
+    ids: Sequence[bytes],
+    interval: float,
+    duration: float,
+    *,
+    port: int = 5000,
+    seed: int = 0,
+) -> int:
+    """Announce every node in ``ids`` every ``interval`` for ``duration``.
+
+    Returns the number of packets sent.
+    """
+    rng = random.Random(seed)
+    phases = sorted((rng.random() * interval, nid) for nid in ids)
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    pack = PACKET_STRUCT.pack
+    sent = 0
+    start = time.monotonic()
+    rounds = 0
+    index = 0
+    try:
+        while True:
+            now = time.monotonic() - start
+            if now >= duration:
+                break
+            while True:
+                offset, nid = phases[index]
+                due = rounds * interval + offset
+                if due > now or due >= duration:
+                    break
+                ts = int((start + due) * 1000)
+                try:
+                    sock.sendto(pack(nid, port, ts), target)
+                    sent += 1
+                except OSError:  # pragma: no cover - transient ENOBUFS
+                    pass
+                index += 1
+                if index == len(phases):
+                    index = 0
+                    rounds += 1
+            time.sleep(TICK)
+    finally:
+        sock.close()
+    return sent
+
+
+def blast(
+    target: tuple[str, int], ids: Sequence[bytes], count: int, sources: int = 1
+) -> int:
+    """Send ``count`` announcements round-robin over ``ids`` as fast as possible.
+
+    Packets rotate over ``sources`` sockets so that ``SO_REUSEPORT`` receivers,
+    which balance unicast by source address, see several flows.
+    """
+    socks = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(sources)]
+    packets = [PACKET_STRUCT.pack(nid, 5000, 0) for nid in ids]
+    sent = 0
+    try:
+        for i in range(count):
+            try:
+                socks[i % sources].sendto(packets[i % len(packets)], target)
+                sent += 1
+            except OSError:  # pragma: no cover - transient ENOBUFS
+                pass
+    finally:
+        for sock in socks:
+            sock.close()
+    return sent
+
+
+class LoadGenerator:
+    """Run :func:`announce` or :func:`blast` in a child process.
+
+    Keeping the sender out of the measuring process means its CPU time does
+    not pollute per-packet cost figures.
+    """
+
+    def __init__(self) -> None:
+        self._proc: Optional[multiprocessing.Process] = None
+
+    def start_announce(
+        self,
+        target: tuple[str, int],
+        ids: Sequence[bytes],
+        interval: float,
+        duration: float,
+    ) -> None:
+        self._spawn(announce, (target, list(ids), interval, duration))
+
+    def start_blast(
+        self,
+        target: tuple[str, int],
+        ids: Sequence[bytes],
+        count: int,
+        sources: int = 1,
+    ) -> None:
+        self._spawn(blast, (target, list(ids), count, sources))
+
+    def _spawn(self, func: Callable[..., int], args: tuple[object, ...]) -> None:
+        if self._proc is not None:
+            raise RuntimeError("generator already running")
+        self._proc = multiprocessing.Process(target=func, args=args, daemon=True)
+        self._proc.start()
+
+    @property
+    def running(self) -> bool:
+        return self._proc is not None and self._proc.is_alive()
+
+    def stop(self) -> None:
+        if self._proc is None:
+            return
+        if self._proc.is_alive():
+            self._proc.terminate()
+        self._proc.join()
+        self._proc = None
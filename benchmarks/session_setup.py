@@ -0,0 +1,116 @@
+"""Time-to-ready of jacktrip sessions with and without a session pool.
+
+Run with ``python -m benchmarks.session_setup``. Two paths are timed from
+request until a session is ready to carry audio (jacktrip listening and
+registered with JACK, detected by :data:`audiomesh.pool.READY_PATTERN` on
+its output):
+
+``cold``
+    Resolve jacktrip and launch a fresh session, as an unpooled start does.
+``pooled``
+    :meth:`audiomesh.pool.SessionPool.acquire` on a warmed pool. The pool
+    is refilled between rounds, outside the timed section.
+
+The remaining handshake with the remote peer is the same on both paths and
+is not included. ``--jacktrip`` points at another binary, e.g. a stand-in
+script where JACK is not available.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+from audiomesh import resolve_jacktrip
+from audiomesh.pool import READY_PATTERN, SessionPool
+
+from .discovery_suite import _percentile
+
+
+def _summary(seconds: List[float]) -> Dict[str, Any]:
+    ms = [value * 1000 for value in seconds]
+    return {
+        "rounds": len(ms),
+        "mean_ms": statistics.fmean(ms),
+        "p50_ms": _percentile(ms, 50),
+        "max_ms": max(ms),
+    }
+
+
+async def bench_cold(rounds: int, port: int) -> List[float]:
+    times = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        path = resolve_jacktrip(refresh=True)
+        proc = await asyncio.create_subprocess_exec(
+            *[path, "-s", "--bindport", str(port), "--clientname", f"bench-{port}"],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+        )
+        assert proc.stdout is not None
+        while line := await proc.stdout.readline():
+            if READY_PATTERN.search(line):
+                break
+        times.append(time.perf_counter() - start)
+        proc.terminate()
+        await proc.wait()
+    return times
+
+
+async def bench_pooled(rounds: int, port: int, size: int) -> List[float]:
+    pool = SessionPool(size, base_port=port)
+    await pool.start()
+    times = []
+    try:
+        for _ in range(rounds):
+            start = time.perf_counter()
+            slot = await pool.acquire("127.0.0.1")
+            times.append(time.perf_counter() - start)
+            await pool.release(slot)
+            while pool.idle < pool.size:
+                await asyncio.sleep(0.005)
+            await pool.wait_ready()
+    finally:
+        await pool.close()
+    return times
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    cold = await bench_cold(args.rounds, args.port)
+    pooled = await bench_pooled(args.rounds, args.port, args.pool_size)
+    return {
+        "cold": _summary(cold),
+        "pooled": _summary(pooled),
+        "speedup": statistics.fmean(cold) / max(statistics.fmean(pooled), 1e-9),
+    }
+
+
+def main(argv: List[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Session setup latency")
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--port", type=int, default=14464, help="First port")
+    parser.add_argument("--jacktrip", type=Path, help="jacktrip binary to run")
+    parser.add_argument("--output", type=Path, help="Write JSON results here")
+    args = parser.parse_args(argv)
+    if args.jacktrip:
+        os.environ["AUDIOMESH_JACKTRIP"] = str(args.jacktrip)
+
+    text = json.dumps(asyncio.run(run(args)), indent=2)
+    if args.output:
+        args.output.write_text(text + "\n")
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,14 +3,27 @@
 from __future__ import annotations
 
 from .announcer import Announcer
+from .events import PeerEvent
 from .exceptions import PeerTimeoutError
 from .listener import Listener
-from .protocol import pack_announcement, unpack_announcement
+from .protocol import (
+    decode_announcement,
+    pack_announcement,
+    pack_announcement_v2,
+    pack_capabilities,
+    unpack_announcement,
+    unpack_capabilities,
+)
 
 __all__ = [
     "Announcer",
     "Listener",
+    "PeerEvent",
     "PeerTimeoutError",
+    "decode_announcement",
     "pack_announcement",
+    "pack_announcement_v2",
+    "pack_capabilities",
     "unpack_announcement",
+    "unpack_capabilities",
 ]
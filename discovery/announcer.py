@@ -4,17 +4,58 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import random
 import socket
-from typing import Optional
+from typing import Callable, List, Mapping, Optional
 
-from .protocol import pack_announcement
+from .interfaces import IP_MULTICAST_ALL, InterfaceSpec, resolve_interfaces
+from .protocol import (
+    pack_announcement,
+    pack_announcement_v2,
+    pack_capabilities,
+    unpack_query,
+)
 
 MULTICAST_GROUP = "239.255.0.1"
 MULTICAST_PORT = 50000
+# Queries use their own port so announcers never wake for peer heartbeats.
+QUERY_PORT = MULTICAST_PORT + 1
+
+SCHEDULES = ("fixed", "adaptive")
+
+
+class QueryProtocol(asyncio.DatagramProtocol):
+    """Protocol handler for discovery queries."""
+
+    def __init__(self, on_query: Callable[[bytes], None]) -> None:
+        self.on_query = on_query
+
+    def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
+        node_id = unpack_query(data)
+        if node_id is not None:
+            self.on_query(node_id)
 
 
 class Announcer:
-    """Periodically broadcast this node's presence."""
+    """Periodically broadcast this node's presence.
+
+    Nodes given ``capabilities`` send v2 packets carrying them; otherwise the
+    v1 format is used so older listeners keep seeing this node.
+
+    The ``"adaptive"`` schedule starts with announcements ``burst_interval``
+    apart and doubles the gap after each one until it reaches ``interval``.
+    Every delay is scaled by a random factor in ``1 ± jitter`` so nodes booted
+    together drift out of phase. Changing the advertised port or
+    capabilities sends an announcement immediately and restarts the burst.
+
+    With ``answer_queries`` enabled the announcer also joins the group on
+    ``QUERY_PORT`` and replies to listener queries after a random delay of up
+    to ``max_response_delay`` seconds, spreading replies from a large mesh.
+
+    ``interfaces`` (a list of addresses or names, a comma-separated string,
+    or ``"all"``) replaces ``interface_ip``: every announcement and query
+    reply is then sent on each interface from a single loop.
+    """
 
     def __init__(
         self,
@@ -22,15 +63,54 @@ class Announcer:
         port: int,
         interval: float = 5.0,
         interface_ip: str = "0.0.0.0",
+        capabilities: Optional[Mapping[str, int]] = None,
+        *,
+        schedule: str = "fixed",
+        burst_interval: float = 0.25,
+        jitter: Optional[float] = None,
+        answer_queries: bool = True,
+        max_response_delay: float = 0.1,
+        interfaces: Optional[InterfaceSpec] = None,
     ) -> None:
+        if schedule not in SCHEDULES:
+            raise ValueError(f"unknown schedule {schedule!r}")
         self.node_id = node_id
         self.port = port
         self.interval = interval
         self.interface_ip = interface_ip
+        self.interfaces: Optional[List[str]] = None
+        if interfaces is not None:
+            self.interfaces = resolve_interfaces(interfaces)
+        self.schedule = schedule
+        self.burst_interval = min(burst_interval, interval)
+        if jitter is None:
+            jitter = 0.2 if schedule == "adaptive" else 0.0
+        self.jitter = jitter
+        self.answer_queries = answer_queries
+        self.max_response_delay = max_response_delay
+        self._backoff = self.burst_interval
+        self._changed = asyncio.Event()
+        self._caps: Optional[bytes] = None
+        if capabilities is not None:
+            self._caps = pack_capabilities(capabilities)
         self.transport: Optional[asyncio.DatagramTransport] = None
+        self.query_transport: Optional[asyncio.DatagramTransport] = None
+        # Sockets for the second and later entries of ``interfaces``.
+        self._extra_transports: List[asyncio.DatagramTransport] = []
+        self._extra_query_transports: List[asyncio.DatagramTransport] = []
         self._task: Optional[asyncio.Task[None]] = None
+        self._reply: Optional[asyncio.TimerHandle] = None
 
     async def start(self) -> None:
+        for interface in self.interfaces or [self.interface_ip]:
+            await self._open(interface)
+        try:
+            await self._send_announcement()
+        except OSError as exc:  # pragma: no cover - depends on OS
+            logging.getLogger(__name__).warning("initial announcement failed: %s", exc)
+        self._task = asyncio.create_task(self._announce_loop())
+
+    async def _open(self, interface_ip: str) -> None:
         loop = asyncio.get_event_loop()
         sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
         sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
@@ -38,32 +118,120 @@ class Announcer:
         sock.setsockopt(
             socket.IPPROTO_IP,
             socket.IP_MULTICAST_IF,
-            socket.inet_aton(self.interface_ip),
+            socket.inet_aton(interface_ip),
         )
-        sock.bind((self.interface_ip, 0))
-        self.transport, _ = await loop.create_datagram_endpoint(
+        sock.bind((interface_ip, 0))
+        transport, _ = await loop.create_datagram_endpoint(
             lambda: asyncio.DatagramProtocol(),
             sock=sock,
         )
+        primary = self.transport is None
+        if primary:
+            self.transport = transport
+        else:
+            self._extra_transports.append(transport)
+        if not self.answer_queries:
+            return
         try:
-            await self._send_announcement()
+            query, _ = await loop.create_datagram_endpoint(
+                lambda: QueryProtocol(self._on_query),
+                sock=self._query_socket(interface_ip),
+            )
         except OSError as exc:  # pragma: no cover - depends on OS
-            logging.getLogger(__name__).warning("initial announcement failed: %s", exc)
-        self._task = asyncio.create_task(self._announce_loop())
+            logging.getLogger(__name__).warning("query responder unavailable: %s", exc)
+            return
+        if primary:
+            self.query_transport = query
+        else:
+            self._extra_query_transports.append(query)
+
+    def _query_socket(self, interface_ip: str) -> socket.socket:
+        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            bind_ip = interface_ip
+            if self.interfaces is not None:
+                # One socket per interface: bind the wildcard so multicast is
+                # received, and only take this socket's own membership.
+                sock.setsockopt(socket.IPPROTO_IP, IP_MULTICAST_ALL, 0)
+                bind_ip = ""
+            sock.bind((bind_ip, QUERY_PORT))
+            mreq = socket.inet_aton(MULTICAST_GROUP) + socket.inet_aton(interface_ip)
+            sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+        except OSError:
+            sock.close()
+            raise
+        return sock
+
+    def _on_query(self, node_id: bytes) -> None:
+        if self._reply is not None or node_id == self.node_id:
+            return
+        loop = asyncio.get_running_loop()
+        delay = random.uniform(0, self.max_response_delay)
+        self._reply = loop.call_later(delay, self._send_reply)
+
+    def _send_reply(self) -> None:
+        self._reply = None
+        asyncio.ensure_future(self._send_announcement())
+
+    def set_capabilities(self, capabilities: Mapping[str, int]) -> None:
+        """Replace the advertised capabilities and announce the change."""
+        caps = pack_capabilities(capabilities)
+        if caps != self._caps:
+            self._caps = caps
+            self._state_changed()
+
+    def set_port(self, port: int) -> None:
+        """Replace the advertised port and announce the change."""
+        if port != self.port:
+            self.port = port
+            self._state_changed()
+
+    def _state_changed(self) -> None:
+        self._backoff = self.burst_interval
+        self._changed.set()
+
+    def _next_delay(self) -> float:
+        if self.schedule == "adaptive":
+            delay = self._backoff
+            self._backoff = min(self._backoff * 2, self.interval)
+        else:
+            delay = self.interval
+        if self.jitter:
+            delay *= random.uniform(1 - self.jitter, 1 + self.jitter)
+        return delay
 
     async def _send_announcement(self) -> None:
         loop = asyncio.get_event_loop()
         ts = int(loop.time() * 1000)
-        packet = pack_announcement(self.node_id, self.port, ts)
+        if self._caps is None:
+            packet = pack_announcement(self.node_id, self.port, ts)
+        else:
+            packet = pack_announcement_v2(self.node_id, self.port, ts, self._caps)
+        dest = (MULTICAST_GROUP, MULTICAST_PORT)
         if self.transport is not None:
-            self.transport.sendto(packet, (MULTICAST_GROUP, MULTICAST_PORT))
+            self.transport.sendto(packet, dest)
+        for transport in self._extra_transports:
+            transport.sendto(packet, dest)
 
     async def _announce_loop(self) -> None:
         while True:
+            try:
+                await asyncio.wait_for(self._changed.wait(), self._next_delay())
+            except asyncio.TimeoutError:
+                pass
+            self._changed.clear()
             await self._send_announcement()
-            await asyncio.sleep(self.interval)
 
     async def stop(self) -> None:
+        if self._reply is not None:
+            self._reply.cancel()
+            self._reply = None
+        if self.query_transport:
+            self.query_transport.close()
+        for transport in self._extra_query_transports:
+            transport.close()
+        self._extra_query_transports = []
         if self._task:
             self._task.cancel()
             try:
@@ -72,3 +240,6 @@ class Announcer:
                 pass
         if self.transport:
             self.transport.close()
+        for transport in self._extra_transports:
+            transport.close()
+        self._extra_transports = []
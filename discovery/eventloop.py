@@ -0,0 +1,47 @@
+"""Select the asyncio event-loop implementation.
+
+``uvloop`` is an optional, faster drop-in loop. :func:`install_event_loop`
+sets the process-wide event-loop policy so that every later
+``asyncio.run()`` uses the chosen backend:
+
+``auto``
+    ``uvloop`` when it is installed, the standard loop otherwise.
+``uvloop``
+    ``uvloop``; :class:`RuntimeError` if it is not installed.
+``asyncio``
+    The standard library loop.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import importlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+LOOP_CHOICES = ("auto", "asyncio", "uvloop")
+
+
+def install_event_loop(name: str = "auto") -> str:
+    """Install the event-loop policy for ``name`` and return the backend used."""
+    if name not in LOOP_CHOICES:
+        raise ValueError(f"unknown event loop {name!r}")
+    if name != "asyncio":
+        try:
+            uvloop = importlib.import_module("uvloop")
+        except ImportError:
+            if name == "uvloop":
+                raise RuntimeError("uvloop is not installed") from None
+            logger.debug("uvloop not installed; using the asyncio event loop")
+        else:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            return "uvloop"
+    asyncio.set_event_loop_policy(None)
+    return "asyncio"
+
+
+def current_event_loop() -> str:
+    """Name of the backend the installed policy creates loops with."""
+    policy = asyncio.get_event_loop_policy()
+    return "uvloop" if type(policy).__module__.startswith("uvloop") else "asyncio"
@@ -0,0 +1,131 @@
+"""Asynchronous peer-change events for :class:`~discovery.listener.Listener`.
+
+``Listener.events()`` returns an :class:`EventStream`. Consumers iterate it
+with ``async for`` and may await freely per event: the listener only
+enqueues, so packet intake never waits for them. Each stream has its own
+queue holding at most one pending event per peer. A newer state replaces the
+queued one (an ``added`` followed by ``changed`` stays ``added``; ``added``
+followed by ``removed`` cancels out), so a consumer that falls behind skips
+straight to each peer's latest state.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+MAX_EVENTS = 4096
+
+
+class PeerEvent(NamedTuple):
+    """A change to the peer table."""
+
+    kind: str  # "added", "changed" or "removed"
+    node_id: bytes
+    ip: str
+    port: int
+    ts: int
+    caps: bytes = b""
+
+
+def merge_kind(queued: str, new: str) -> Optional[str]:
+    """Return the kind of event standing for ``queued`` followed by ``new``,
+    or ``None`` if the two cancel out."""
+    if queued == "added":
+        return None if new == "removed" else "added"
+    return new
+
+
+class EventQueue:
+    """Bounded queue with one pending :class:`PeerEvent` per node id.
+
+    Events for peers with nothing queued are dropped once ``maxsize`` peers
+    are pending; :attr:`dropped` counts them.
+    """
+
+    def __init__(self, maxsize: int = MAX_EVENTS) -> None:
+        self.maxsize = maxsize
+        self.dropped = 0
+        self.coalesced = 0
+        self.closed = False
+        self._pending: OrderedDict[bytes, PeerEvent] = OrderedDict()
+        self._waiter: Optional[asyncio.Future[None]] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    def put(self, event: PeerEvent) -> None:
+        if self.closed:
+            return
+        queued = self._pending.get(event.node_id)
+        if queued is not None:
+            self.coalesced += 1
+            kind = merge_kind(queued.kind, event.kind)
+            if kind is None:
+                del self._pending[event.node_id]
+                return
+            if kind != event.kind:
+                event = event._replace(kind=kind)
+            # Assigning an existing key keeps the peer's place in line.
+            self._pending[event.node_id] = event
+        elif len(self._pending) >= self.maxsize:
+            self.dropped += 1
+            return
+        else:
+            self._pending[event.node_id] = event
+        self._wake()
+
+    def close(self) -> None:
+        """Accept no more events; :meth:`get` ends once the queue drains."""
+        self.closed = True
+        self._wake()
+
+    def _wake(self) -> None:
+        if self._waiter is not None and not self._waiter.done():
+            self._waiter.set_result(None)
+
+    async def get(self) -> Optional[PeerEvent]:
+        """Return the oldest pending event, or ``None`` once closed."""
+        while not self._pending:
+            if self.closed:
+                return None
+            self._waiter = asyncio.get_running_loop().create_future()
+            try:
+                await self._waiter
+            finally:
+                self._waiter = None
+        return self._pending.popitem(last=False)[1]
+
+
+class EventStream:
+    """Async iterator over one subscriber's :class:`EventQueue`.
+
+    Events are queued from the moment the stream is created. Use
+    ``async with listener.events() as events`` (or call :meth:`close`) to
+    unsubscribe; iteration also ends when the listener stops.
+    """
+
+    def __init__(self, queue: EventQueue, on_close: Callable[[], None]) -> None:
+        self.queue = queue
+        self._on_close = on_close
+
+    def __aiter__(self) -> EventStream:
+        return self
+
+    async def __anext__(self) -> PeerEvent:
+        event = await self.queue.get()
+        if event is None:
+            raise StopAsyncIteration
+        return event
+
+    async def __aenter__(self) -> EventStream:
+        return self
+
+    async def __aexit__(self, *exc: object) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if not self.queue.closed:
+            self.queue.close()
+            self._on_close()
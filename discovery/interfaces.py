@@ -0,0 +1,69 @@
+"""Resolve which network interfaces discovery should run on."""
+
+from __future__ import annotations
+
+import ipaddress
+import socket
+import struct
+import sys
+from typing import Dict, Iterable, List, Union
+
+# Linux ioctl returning an interface's IPv4 address.
+SIOCGIFADDR = 0x8915
+# Linux socket option; 0 limits a socket to groups it joined itself.
+IP_MULTICAST_ALL = getattr(socket, "IP_MULTICAST_ALL", 49)
+
+InterfaceSpec = Union[str, Iterable[str]]
+
+
+def interface_addresses() -> Dict[str, str]:
+    """Map each interface name to its IPv4 address.
+
+    Interfaces without an IPv4 address are omitted. Only Linux is supported;
+    elsewhere the result is empty.
+    """
+    if not sys.platform.startswith("linux"):  # pragma: no cover - Linux only
+        return {}
+    import fcntl
+
+    addresses = {}
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        for _, name in socket.if_nameindex():
+            request = struct.pack("256s", name.encode()[:15])
+            try:
+                reply = fcntl.ioctl(sock.fileno(), SIOCGIFADDR, request)
+            except OSError:
+                continue
+            addresses[name] = socket.inet_ntoa(reply[20:24])
+    return addresses
+
+
+def resolve_interfaces(spec: InterfaceSpec) -> List[str]:
+    """Turn ``spec`` into a list of local IPv4 addresses.
+
+    ``spec`` is ``"all"`` (every non-loopback IPv4 interface), a
+    comma-separated string, or an iterable of addresses and interface names.
+    Raises :class:`ValueError` for unknown names or when nothing matches.
+    """
+    if isinstance(spec, str):
+        items = [item.strip() for item in spec.split(",") if item.strip()]
+    else:
+        items = list(spec)
+    known = None
+    result: List[str] = []
+    for item in items:
+        if item == "all":
+            known = known if known is not None else interface_addresses()
+            found = [ip for ip in known.values() if not ip.startswith("127.")]
+        else:
+            try:
+                found = [str(ipaddress.IPv4Address(item))]
+            except ValueError:
+                known = known if known is not None else interface_addresses()
+                if item not in known:
+                    raise ValueError(f"unknown interface {item!r}") from None
+                found = [known[item]]
+        result.extend(ip for ip in found if ip not in result)
+    if not result:
+        raise ValueError(f"no usable interfaces in {spec!r}")
+    return result
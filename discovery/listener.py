@@ -3,87 +3,579 @@
 from __future__ import annotations
 
 import asyncio
+import functools
+import heapq
+import logging
 import socket
-import struct
-from typing import Callable, Dict, Optional
+import time
+from types import MappingProxyType
+from typing import (
+    Callable,
+    Dict,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Set,
+    Tuple,
+)
 
+from .events import MAX_EVENTS, EventQueue, EventStream, PeerEvent
 from .exceptions import PeerTimeoutError
-from .protocol import PACKET_FMT, unpack_announcement
+from .interfaces import IP_MULTICAST_ALL, InterfaceSpec, resolve_interfaces
+from .linkstats import LinkStats
+from .protocol import (
+    PACKET_SIZE,
+    PACKET_STRUCT,
+    decode_announcement,
+    pack_query,
+    unpack_capabilities,
+)
+from .ratelimit import IngestGuard
 
 MULTICAST_GROUP = "239.255.0.1"
 MULTICAST_PORT = 50000
+QUERY_PORT = MULTICAST_PORT + 1
+
+# Upper bound on datagrams drained per wakeup so a flood cannot monopolise
+# the event loop.
+MAX_BATCH = 256
+RECV_BUFSIZE = 2048
+
+
+class Announcement(NamedTuple):
+    """A decoded announcement together with its source address."""
+
+    node_id: bytes
+    ip: str
+    port: int
+    ts: int
+    caps: bytes = b""
+
+    def capabilities(self) -> dict[str, int]:
+        """Decode the capability section carried by a v2 announcement."""
+        return unpack_capabilities(self.caps)
 
 
 class ListenerProtocol(asyncio.DatagramProtocol):
-    """Protocol handler for discovery announcements."""
+    """Protocol handler for discovery announcements.
+
+    With ``with_capabilities`` set, the raw capability section is passed to
+    ``on_announcement`` as a fifth argument, followed by ``interface`` when
+    one is given.
+    """
 
-    def __init__(self, on_announcement: Callable[[bytes, str, int, int], None]) -> None:
+    def __init__(
+        self,
+        on_announcement: Callable[..., None],
+        *,
+        with_capabilities: bool = False,
+        guard: Optional[IngestGuard] = None,
+        interface: Optional[str] = None,
+    ) -> None:
         self.on_announcement = on_announcement
+        self.with_capabilities = with_capabilities
+        self.guard = guard
+        self.interface = interface
 
     def datagram_received(self, data: bytes, addr: tuple[str, int]) -> None:
-        if len(data) != struct.calcsize(PACKET_FMT):
+        guard = self.guard
+        if guard is not None and not guard.admit(
+            data, len(data), addr[0], time.monotonic()
+        ):
+            return
+        decoded = decode_announcement(data)
+        if decoded is None:
             return
-        node_id, port, ts = unpack_announcement(data)
-        self.on_announcement(node_id, addr[0], port, ts)
+        node_id, port, ts, caps = decoded
+        if self.interface is not None:
+            self.on_announcement(node_id, addr[0], port, ts, caps, self.interface)
+        elif self.with_capabilities:
+            self.on_announcement(node_id, addr[0], port, ts, caps)
+        else:
+            self.on_announcement(node_id, addr[0], port, ts)
+
+
+class Peer:
+    """Last known state of a discovered peer.
+
+    ``provisional`` peers were restored from a snapshot and have not been
+    heard from since. ``link`` holds timing statistics for the peer's
+    announcements. On a multi-interface listener, ``interfaces`` maps each
+    local interface address the peer was heard on to the peer's address
+    there; ``ip`` is its address on the first of them.
+    """
+
+    __slots__ = (
+        "ip",
+        "port",
+        "caps",
+        "provisional",
+        "link",
+        "interfaces",
+        "_capabilities",
+    )
+
+    def __init__(
+        self, ip: str, port: int, caps: bytes = b"", provisional: bool = False
+    ) -> None:
+        self.ip = ip
+        self.port = port
+        self.caps = caps
+        self.provisional = provisional
+        self.link = LinkStats()
+        self.interfaces: Dict[str, str] = {}
+        self._capabilities: Optional[dict[str, int]] = None
+
+    @property
+    def capabilities(self) -> dict[str, int]:
+        """Advertised capabilities, decoded on first access."""
+        if self._capabilities is None:
+            try:
+                self._capabilities = unpack_capabilities(self.caps)
+            except ValueError:
+                self._capabilities = {}
+        return self._capabilities
+
+    def __repr__(self) -> str:
+        return f"Peer(ip={self.ip!r}, port={self.port!r})"
+
+
+def multicast_socket(
+    interface_ip: str, port: int, *, reuse_port: bool = False
+) -> socket.socket:
+    """Bind a UDP socket to ``port`` and join the discovery group on it."""
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 0)
+    sock.bind((interface_ip, port))
+    mreq = socket.inet_aton(MULTICAST_GROUP) + socket.inet_aton(interface_ip)
+    sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    return sock
+
+
+def interface_socket(interface_ip: str, port: int) -> socket.socket:
+    """Bind ``port`` for discovery traffic arriving on one interface only.
+
+    The socket is bound to the wildcard address so it can receive multicast,
+    and joins the group on ``interface_ip`` alone. ``IP_MULTICAST_ALL`` is
+    cleared so that memberships held by sibling sockets are not delivered to
+    it (Linux; elsewhere traffic is still merged, just not attributed).
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 0)
+        try:
+            sock.setsockopt(socket.IPPROTO_IP, IP_MULTICAST_ALL, 0)
+        except OSError:  # pragma: no cover - not Linux
+            pass
+        sock.setsockopt(
+            socket.IPPROTO_IP, socket.IP_MULTICAST_IF, socket.inet_aton(interface_ip)
+        )
+        sock.bind(("", port))
+        mreq = socket.inet_aton(MULTICAST_GROUP) + socket.inet_aton(interface_ip)
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
+    except OSError:
+        sock.close()
+        raise
+    return sock
+
+
+class BatchReader:
+    """Drain every queued datagram on a socket in a single loop wakeup.
+
+    Packets are decoded in place from a reusable buffer and collapsed so that
+    only the newest announcement per node survives. The resulting list is
+    handed to ``on_batch`` once per wakeup.
+    """
+
+    def __init__(
+        self,
+        sock: socket.socket,
+        on_batch: Callable[[List[Announcement]], None],
+        *,
+        max_batch: int = MAX_BATCH,
+        guard: Optional[IngestGuard] = None,
+    ) -> None:
+        self.sock = sock
+        self.on_batch = on_batch
+        self.max_batch = max_batch
+        self.guard = guard
+        self.received = 0
+        self._buf = bytearray(RECV_BUFSIZE)
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop) -> None:
+        self._loop = loop
+        self.sock.setblocking(False)
+        loop.add_reader(self.sock.fileno(), self.read_ready)
+
+    def read_ready(self) -> None:
+        latest: Dict[bytes, Announcement] = {}
+        buf = self._buf
+        recvfrom_into = self.sock.recvfrom_into
+        unpack_v1 = PACKET_STRUCT.unpack_from
+        admit = self.guard.admit if self.guard is not None else None
+        now = time.monotonic()
+        count = 0
+        while count < self.max_batch:
+            try:
+                nbytes, addr = recvfrom_into(buf)
+            except (BlockingIOError, InterruptedError):
+                break
+            except OSError as exc:  # pragma: no cover - depends on OS
+                logging.getLogger(__name__).warning("recv failed: %s", exc)
+                break
+            count += 1
+            if admit is not None and not admit(buf, nbytes, addr[0], now):
+                continue
+            if nbytes == PACKET_SIZE:
+                node_id, port, ts = unpack_v1(buf)
+                caps = b""
+            else:
+                decoded = decode_announcement(buf, nbytes)
+                if decoded is None:
+                    continue
+                node_id, port, ts, caps = decoded
+            prev = latest.get(node_id)
+            if prev is None or ts >= prev.ts:
+                latest[node_id] = Announcement(node_id, addr[0], port, ts, caps)
+        self.received += count
+        if latest:
+            self.on_batch(list(latest.values()))
+
+    def close(self) -> None:
+        if self._loop is not None:
+            self._loop.remove_reader(self.sock.fileno())
+            self._loop = None
+        self.sock.close()
 
 
 class Listener:
-    """Listen for discovery announcements."""
+    """Listen for discovery announcements.
+
+    ``on_announcement`` (or ``on_batch``) fires only when a peer is first seen
+    or its address changes; repeated heartbeats merely refresh the peer's
+    expiry. Pass ``on_heartbeat`` to receive every decoded announcement.
+
+    ``rate_limit`` and ``node_rate_limit`` cap the packets/s accepted from
+    each source IP and each node id. Excess datagrams are dropped before
+    decoding and counted in :attr:`drops`.
+
+    ``interfaces`` (a list of addresses or names, a comma-separated string,
+    or ``"all"``) replaces ``interface_ip`` with one socket per interface,
+    all served by the same loop and feeding one peer table.
+    """
 
     def __init__(
         self,
         on_announcement: Callable[[bytes, str, int, int], None],
         *,
         interface_ip: str = "0.0.0.0",
+        port: int = MULTICAST_PORT,
         timeout: float = 10.0,
         on_timeout: Optional[Callable[[PeerTimeoutError], None]] = None,
         on_removed: Optional[Callable[[bytes], None]] = None,
+        batch: bool = False,
+        on_batch: Optional[Callable[[List[Announcement]], None]] = None,
+        on_heartbeat: Optional[Callable[[bytes, str, int, int], None]] = None,
+        rate_limit: Optional[float] = None,
+        node_rate_limit: Optional[float] = None,
+        interfaces: Optional[InterfaceSpec] = None,
     ) -> None:
         self.on_announcement = on_announcement
         self.interface_ip = interface_ip
+        self.interfaces: Optional[List[str]] = None
+        if interfaces is not None:
+            self.interfaces = resolve_interfaces(interfaces)
+        self.port = port
         self.timeout = timeout
         self.on_timeout = on_timeout
         self.on_removed = on_removed
+        self.batch = batch or on_batch is not None
+        self.on_batch = on_batch
+        self.on_heartbeat = on_heartbeat
+        self.guard: Optional[IngestGuard] = None
+        if rate_limit is not None or node_rate_limit is not None:
+            self.guard = IngestGuard(rate_limit, node_rate_limit)
         self.transport: Optional[asyncio.DatagramTransport] = None
+        self._reader: Optional[BatchReader] = None
+        # Sockets for the second and later entries of ``interfaces``.
+        self._extra_transports: List[asyncio.DatagramTransport] = []
+        self._extra_readers: List[BatchReader] = []
         self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._peers: Dict[bytes, Peer] = {}
         self._last_seen: Dict[bytes, float] = {}
+        # Min-heap of (deadline, node_id); one entry per tracked peer.
+        self._deadlines: List[Tuple[float, bytes]] = []
+        self._wakeup = asyncio.Event()
         self._cleanup_task: Optional[asyncio.Task[None]] = None
+        self._subscribers: Set[EventQueue] = set()
 
     async def start(self) -> None:
         self._loop = asyncio.get_event_loop()
-        sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-        sock.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 0)
-        sock.bind((self.interface_ip, MULTICAST_PORT))
-        mreq = socket.inet_aton(MULTICAST_GROUP) + socket.inet_aton(self.interface_ip)
-        sock.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, mreq)
-        self.transport, _ = await self._loop.create_datagram_endpoint(
-            lambda: ListenerProtocol(self._handle_announcement),
+        if self.interfaces is None:
+            await self._open(multicast_socket(self.interface_ip, self.port))
+        else:
+            for interface in self.interfaces:
+                await self._open(interface_socket(interface, self.port), interface)
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def _open(self, sock: socket.socket, interface: Optional[str] = None) -> None:
+        assert self._loop is not None
+        if self.batch:
+            on_batch = self._handle_batch
+            if interface is not None:
+                on_batch = functools.partial(self._handle_batch, interface=interface)
+            reader = BatchReader(sock, on_batch, guard=self.guard)
+            reader.start(self._loop)
+            if self._reader is None:
+                self._reader = reader
+            else:
+                self._extra_readers.append(reader)
+            return
+        transport, _ = await self._loop.create_datagram_endpoint(
+            lambda: ListenerProtocol(
+                self._handle_announcement,
+                with_capabilities=True,
+                guard=self.guard,
+                interface=interface,
+            ),
             sock=sock,
         )
-        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+        if self.transport is None:
+            self.transport = transport
+        else:
+            self._extra_transports.append(transport)
+
+    def query(self) -> None:
+        """Ask every announcer on the segment(s) to announce itself now."""
+        packet = pack_query()
+        dest = (MULTICAST_GROUP, QUERY_PORT)
+        transports = [self.transport] if self.transport is not None else []
+        for transport in transports + self._extra_transports:
+            transport.sendto(packet, dest)
+        readers = [self._reader] if self._reader is not None else []
+        for reader in readers + self._extra_readers:
+            try:
+                reader.sock.sendto(packet, dest)
+            except OSError as exc:  # pragma: no cover - depends on OS
+                logging.getLogger(__name__).warning("query failed: %s", exc)
+
+    @property
+    def peers(self) -> Mapping[bytes, Peer]:
+        """Read-only view of the currently known peers."""
+        return MappingProxyType(self._peers)
+
+    @property
+    def drops(self) -> Dict[str, int]:
+        """Packets discarded by the per-source and per-node rate limits."""
+        if self.guard is None:
+            return {"source": 0, "node": 0}
+        return self.guard.drops
 
-    def _handle_announcement(self, node_id: bytes, ip: str, port: int, ts: int) -> None:
+    def age(self, node_id: bytes) -> Optional[float]:
+        """Seconds since ``node_id`` was last heard from, if known."""
+        last = self._last_seen.get(node_id)
+        if last is None or self._loop is None:
+            return None
+        return self._loop.time() - last
+
+    def events(self, maxsize: int = MAX_EVENTS) -> EventStream:
+        """Subscribe to peer changes as an async iterator of :class:`PeerEvent`.
+
+        Each subscriber gets its own bounded queue that keeps only the latest
+        pending state per peer, so slow consumers never hold up intake.
+        """
+        queue = EventQueue(maxsize)
+        self._subscribers.add(queue)
+        return EventStream(queue, lambda: self._subscribers.discard(queue))
+
+    def link_stats(self, node_id: bytes) -> Optional[Dict[str, float]]:
+        """Link statistics for ``node_id`` once two announcements arrived."""
+        peer = self._peers.get(node_id)
+        if peer is None or peer.link.samples < 2:
+            return None
+        return peer.link.as_dict()
+
+    def seed(
+        self, node_id: bytes, ip: str, port: int, age: float, caps: bytes = b""
+    ) -> None:
+        """Add a provisional peer last heard from ``age`` seconds ago.
+
+        Seeded peers expire like any other unless an announcement confirms
+        them first. No callbacks fire; known peers are left untouched.
+        """
+        assert self._loop is not None
+        if node_id in self._peers:
+            return
+        last = self._loop.time() - age
+        self._peers[node_id] = Peer(ip, port, caps, provisional=True)
+        self._last_seen[node_id] = last
+        self._schedule(node_id, last + self.timeout)
+
+    def _observe(
+        self,
+        node_id: bytes,
+        ip: str,
+        port: int,
+        ts: int,
+        caps: bytes,
+        now: float,
+        interface: Optional[str] = None,
+    ) -> Optional[str]:
+        """Record a sighting and return the kind of state change, if any.
+
+        ``"added"`` means a new peer or the confirmation of a provisional
+        one, ``"changed"`` a new address. Capability updates are stored
+        silently; they are read on demand. A multi-homed peer heard on a
+        second interface only has that address recorded in
+        ``Peer.interfaces``.
+        """
+        peer = self._peers.get(node_id)
+        if peer is None:
+            peer = self._peers[node_id] = Peer(ip, port, caps)
+            if interface is not None:
+                peer.interfaces[interface] = ip
+            peer.link.update(ts, now)
+            if node_id not in self._last_seen:
+                self._schedule(node_id, now + self.timeout)
+            self._last_seen[node_id] = now
+            return "added"
+        self._last_seen[node_id] = now
+        peer.link.update(ts, now)
+        if interface is not None:
+            if peer.interfaces.get(interface) != ip:
+                peer.interfaces[interface] = ip
+            if next(iter(peer.interfaces)) != interface:
+                ip = peer.ip
+        if peer.caps != caps:
+            peer.caps = caps
+            peer._capabilities = None
+        if peer.ip == ip and peer.port == port and not peer.provisional:
+            return None
+        kind = "added" if peer.provisional else "changed"
+        peer.ip = ip
+        peer.port = port
+        peer.provisional = False
+        return kind
+
+    def _publish(self, event: PeerEvent) -> None:
+        for queue in self._subscribers:
+            queue.put(event)
+
+    def _handle_announcement(
+        self,
+        node_id: bytes,
+        ip: str,
+        port: int,
+        ts: int,
+        caps: bytes = b"",
+        interface: Optional[str] = None,
+    ) -> None:
         assert self._loop is not None
-        self._last_seen[node_id] = self._loop.time()
+        if self.on_heartbeat is not None:
+            self.on_heartbeat(node_id, ip, port, ts)
+        kind = self._observe(node_id, ip, port, ts, caps, self._loop.time(), interface)
+        if kind is None:
+            return
+        if interface is not None:
+            # Report the peer's primary address, not a secondary interface's.
+            ip = self._peers[node_id].ip
+        if self._subscribers:
+            self._publish(PeerEvent(kind, node_id, ip, port, ts, caps))
         self.on_announcement(node_id, ip, port, ts)
 
+    def _handle_batch(
+        self,
+        batch: List[Announcement],
+        now: Optional[float] = None,
+        interface: Optional[str] = None,
+    ) -> None:
+        assert self._loop is not None
+        if now is None:
+            now = self._loop.time()
+        heartbeat = self.on_heartbeat
+        observe = self._observe
+        subscribers = self._subscribers
+        changed = []
+        for ann in batch:
+            if heartbeat is not None:
+                heartbeat(ann.node_id, ann.ip, ann.port, ann.ts)
+            kind = observe(
+                ann.node_id, ann.ip, ann.port, ann.ts, ann.caps, now, interface
+            )
+            if kind is not None:
+                if interface is not None:
+                    ann = ann._replace(ip=self._peers[ann.node_id].ip)
+                changed.append(ann)
+                if subscribers:
+                    self._publish(PeerEvent(kind, *ann))
+        if not changed:
+            return
+        if self.on_batch is not None:
+            self.on_batch(changed)
+        else:
+            for ann in changed:
+                self.on_announcement(ann.node_id, ann.ip, ann.port, ann.ts)
+
+    def _schedule(self, node_id: bytes, deadline: float) -> None:
+        heapq.heappush(self._deadlines, (deadline, node_id))
+        if self._deadlines[0][1] == node_id:
+            # Only an entry that becomes the new head can move the next
+            # wakeup earlier.
+            self._wakeup.set()
+
+    def _expire(self, nid: bytes) -> None:
+        self._last_seen.pop(nid, None)
+        peer = self._peers.pop(nid, None)
+        if peer is not None and self._subscribers:
+            self._publish(
+                PeerEvent(
+                    "removed", nid, peer.ip, peer.port, peer.link.last_ts, peer.caps
+                )
+            )
+        if self.on_timeout is not None:
+            self.on_timeout(PeerTimeoutError(f"peer {nid!r} timed out"))
+        if self.on_removed is not None:
+            self.on_removed(nid)
+
     async def _cleanup_loop(self) -> None:
+        """Expire peers as their deadlines fall due.
+
+        Refreshing a peer only updates ``_last_seen``; its heap entry is
+        re-armed lazily when it surfaces, so each peer costs at most one
+        heap operation per ``timeout`` regardless of heartbeat rate.
+        """
         assert self._loop is not None
+        tracked = {nid for _, nid in self._deadlines}
+        for nid, seen in self._last_seen.items():
+            if nid not in tracked:
+                heapq.heappush(self._deadlines, (seen + self.timeout, nid))
         while True:
             now = self._loop.time()
-            expired = [
-                nid
-                for nid, last in self._last_seen.items()
-                if now - last > self.timeout
-            ]
-            for nid in expired:
-                self._last_seen.pop(nid, None)
-                if self.on_timeout is not None:
-                    self.on_timeout(PeerTimeoutError(f"peer {nid!r} timed out"))
-                if self.on_removed is not None:
-                    self.on_removed(nid)
-            await asyncio.sleep(self.timeout)
+            while self._deadlines and self._deadlines[0][0] <= now:
+                _, nid = heapq.heappop(self._deadlines)
+                last = self._last_seen.get(nid)
+                if last is None:
+                    continue
+                deadline = last + self.timeout
+                if deadline > now:
+                    heapq.heappush(self._deadlines, (deadline, nid))
+                else:
+                    self._expire(nid)
+            self._wakeup.clear()
+            if self._deadlines:
+                delay = self._deadlines[0][0] - now
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+            else:
+                await self._wakeup.wait()
 
     async def stop(self) -> None:
         if self._cleanup_task:
@@ -92,5 +584,17 @@ class Listener:
                 await self._cleanup_task
             except asyncio.CancelledError:
                 pass
+        if self._reader:
+            self._reader.close()
+            self._reader = None
         if self.transport:
             self.transport.close()
+        for reader in self._extra_readers:
+            reader.close()
+        for transport in self._extra_transports:
+            transport.close()
+        self._extra_readers = []
+        self._extra_transports = []
+        for queue in self._subscribers:
+            queue.close()
+        self._subscribers.clear()
@@ -1,19 +1,171 @@
-"""Binary packet packing and unpacking for discovery announcements."""
+"""Binary packet packing and unpacking for discovery announcements.
+
+Two wire formats are understood:
+
+* **v1** – exactly ``PACKET_FMT``: node id, port and timestamp.
+* **v2** – a ``V2_MAGIC``/version/flags header followed by the v1 fields and
+  an optional capability section of ``type, length, value`` records.
+
+A listener can also multicast a ``QUERY_FMT`` packet to ``QUERY_PORT``; any
+announcer that hears it replies with an ordinary announcement.
+
+Capability records are kept as raw bytes until :func:`unpack_capabilities` is
+called, so heartbeats that nobody inspects never pay for parsing them.
+Unknown record types are skipped, letting newer nodes advertise fields older
+listeners do not understand.
+"""
 
 from __future__ import annotations
 
 import struct
+from typing import Dict, Mapping, Optional, Union
 
 # Packet format: 16-byte UUID (as bytes) + H: port + Q: timestamp
 PACKET_FMT = "!16sHQ"
+PACKET_STRUCT = struct.Struct(PACKET_FMT)
+PACKET_SIZE = PACKET_STRUCT.size
+
+# v2 header: 2-byte magic + B: version + B: flags, then the v1 fields.
+V2_MAGIC = b"AM"
+V2_VERSION = 2
+V2_HEADER_FMT = "!2sBB16sHQ"
+V2_HEADER_STRUCT = struct.Struct(V2_HEADER_FMT)
+V2_HEADER_SIZE = V2_HEADER_STRUCT.size
+
+# Query format: 3-byte magic + B: version + 16-byte id of the querying node
+QUERY_MAGIC = b"AMQ"
+QUERY_VERSION = 1
+QUERY_FMT = "!3sB16s"
+QUERY_STRUCT = struct.Struct(QUERY_FMT)
+QUERY_SIZE = QUERY_STRUCT.size
+
+# Capability record header: B: type + B: value length
+TLV_STRUCT = struct.Struct("!BB")
+
+CAP_CHANNELS = 0x01
+CAP_SAMPLE_RATE = 0x02
+CAP_LOAD = 0x03
+CAP_FREE_SLOTS = 0x04
+CAP_HUB = 0x05
+
+CAPABILITY_TYPES: Dict[str, int] = {
+    "channels": CAP_CHANNELS,
+    "sample_rate": CAP_SAMPLE_RATE,
+    "load": CAP_LOAD,
+    "free_slots": CAP_FREE_SLOTS,
+    "hub": CAP_HUB,
+}
+_CAPABILITY_NAMES = {code: name for name, code in CAPABILITY_TYPES.items()}
+_CAPABILITY_STRUCTS: Dict[int, struct.Struct] = {
+    CAP_CHANNELS: struct.Struct("!B"),
+    CAP_SAMPLE_RATE: struct.Struct("!I"),
+    CAP_LOAD: struct.Struct("!B"),  # percent busy
+    CAP_FREE_SLOTS: struct.Struct("!H"),
+    CAP_HUB: struct.Struct("!B"),  # 1 while running a jacktrip hub server
+}
+
+Buffer = Union[bytes, bytearray, memoryview]
 
 
 def pack_announcement(node_id: bytes, port: int, timestamp: int) -> bytes:
     """Pack announcement data into binary format."""
-    return struct.pack(PACKET_FMT, node_id, port, timestamp)
+    return PACKET_STRUCT.pack(node_id, port, timestamp)
 
 
 def unpack_announcement(data: bytes) -> tuple[bytes, int, int]:
     """Unpack binary announcement data."""
-    node_id, port, timestamp = struct.unpack(PACKET_FMT, data)
+    node_id, port, timestamp = PACKET_STRUCT.unpack(data)
     return node_id, port, timestamp
+
+
+def pack_capabilities(capabilities: Mapping[str, int]) -> bytes:
+    """Encode named capabilities as a TLV capability section."""
+    parts = []
+    for name, value in capabilities.items():
+        code = CAPABILITY_TYPES.get(name)
+        if code is None:
+            raise ValueError(f"unknown capability {name!r}")
+        try:
+            body = _CAPABILITY_STRUCTS[code].pack(value)
+        except struct.error as exc:
+            raise ValueError(f"capability {name!r} out of range: {value!r}") from exc
+        parts.append(TLV_STRUCT.pack(code, len(body)) + body)
+    return b"".join(parts)
+
+
+def unpack_capabilities(data: Buffer) -> dict[str, int]:
+    """Decode a TLV capability section, skipping unknown record types."""
+    caps: dict[str, int] = {}
+    offset = 0
+    end = len(data)
+    while offset < end:
+        if end - offset < TLV_STRUCT.size:
+            raise ValueError("truncated capability header")
+        code, length = TLV_STRUCT.unpack_from(data, offset)
+        offset += TLV_STRUCT.size
+        if end - offset < length:
+            raise ValueError("truncated capability value")
+        fmt = _CAPABILITY_STRUCTS.get(code)
+        if fmt is not None and fmt.size == length:
+            (caps[_CAPABILITY_NAMES[code]],) = fmt.unpack_from(data, offset)
+        offset += length
+    return caps
+
+
+def pack_announcement_v2(
+    node_id: bytes,
+    port: int,
+    timestamp: int,
+    capabilities: bytes = b"",
+) -> bytes:
+    """Pack a v2 announcement carrying an encoded capability section."""
+    header = V2_HEADER_STRUCT.pack(V2_MAGIC, V2_VERSION, 0, node_id, port, timestamp)
+    return header + capabilities
+
+
+def peek_node_id(data: Buffer, size: Optional[int] = None) -> Optional[bytes]:
+    """Return the node id of an announcement without decoding the rest."""
+    if size is None:
+        size = len(data)
+    if size == PACKET_SIZE:
+        return bytes(data[:16])
+    if size >= V2_HEADER_SIZE and bytes(data[:2]) == V2_MAGIC:
+        return bytes(data[4:20])
+    return None
+
+
+def decode_announcement(
+    data: Buffer, size: Optional[int] = None
+) -> Optional[tuple[bytes, int, int, bytes]]:
+    """Decode a v1 or v2 announcement from the first ``size`` bytes of ``data``.
+
+    Returns ``(node_id, port, timestamp, capabilities)`` where
+    ``capabilities`` is the raw capability section (empty for v1), or
+    ``None`` if the datagram is not a recognised announcement.
+    """
+    if size is None:
+        size = len(data)
+    if size == PACKET_SIZE:
+        node_id, port, timestamp = PACKET_STRUCT.unpack_from(data)
+        return node_id, port, timestamp, b""
+    if size < V2_HEADER_SIZE or bytes(data[:2]) != V2_MAGIC:
+        return None
+    _, version, _, node_id, port, timestamp = V2_HEADER_STRUCT.unpack_from(data)
+    if version != V2_VERSION:
+        return None
+    return node_id, port, timestamp, bytes(data[V2_HEADER_SIZE:size])
+
+
+def pack_query(node_id: bytes = bytes(16)) -> bytes:
+    """Pack a discovery query sent by ``node_id``."""
+    return QUERY_STRUCT.pack(QUERY_MAGIC, QUERY_VERSION, node_id)
+
+
+def unpack_query(data: Buffer) -> Optional[bytes]:
+    """Return the querying node id, or ``None`` if ``data`` is not a query."""
+    if len(data) != QUERY_SIZE:
+        return None
+    magic, version, node_id = QUERY_STRUCT.unpack(data)
+    if magic != QUERY_MAGIC or version != QUERY_VERSION:
+        return None
+    return bytes(node_id)
@@ -0,0 +1,121 @@
+"""Token-bucket rate limiting for the discovery ingest path."""
+
+from __future__ import annotations
+
+from typing import Dict, Generic, Hashable, TypeVar
+
+from .protocol import Buffer, peek_node_id
+
+K = TypeVar("K", bound=Hashable)
+
+MAX_KEYS = 4096
+
+
+class TokenBucket:
+    """Classic token bucket refilled at ``rate`` tokens/s up to ``burst``."""
+
+    __slots__ = ("rate", "burst", "tokens", "stamp", "dropped")
+
+    def __init__(self, rate: float, burst: float, now: float) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.stamp = now
+        self.dropped = 0
+
+    def allow(self, now: float) -> bool:
+        tokens = self.tokens + (now - self.stamp) * self.rate
+        if tokens > self.burst:
+            tokens = self.burst
+        self.stamp = now
+        if tokens < 1.0:
+            self.tokens = tokens
+            self.dropped += 1
+            return False
+        self.tokens = tokens - 1.0
+        return True
+
+    def idle(self, now: float) -> bool:
+        """Whether the bucket would be full again at ``now``."""
+        return self.tokens + (now - self.stamp) * self.rate >= self.burst
+
+
+class KeyedRateLimiter(Generic[K]):
+    """One :class:`TokenBucket` per key with a bounded number of keys.
+
+    When ``max_keys`` is reached, buckets that have refilled completely are
+    discarded first, since forgetting them loses no state. If every bucket is
+    still draining, the oldest keys are evicted to make room.
+    """
+
+    def __init__(
+        self, rate: float, burst: float | None = None, *, max_keys: int = MAX_KEYS
+    ) -> None:
+        self.rate = rate
+        self.burst = burst if burst is not None else max(1.0, rate * 2)
+        self.max_keys = max_keys
+        self.dropped = 0
+        self._buckets: Dict[K, TokenBucket] = {}
+
+    def allow(self, key: K, now: float) -> bool:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            if len(self._buckets) >= self.max_keys:
+                self._evict(now)
+            bucket = self._buckets[key] = TokenBucket(self.rate, self.burst, now)
+        if bucket.allow(now):
+            return True
+        self.dropped += 1
+        return False
+
+    def dropped_by_key(self) -> Dict[K, int]:
+        """Drop counts for keys that are currently tracked and have drops."""
+        return {k: b.dropped for k, b in self._buckets.items() if b.dropped}
+
+    def _evict(self, now: float) -> None:
+        buckets = self._buckets
+        for key in [k for k, b in buckets.items() if b.idle(now)]:
+            del buckets[key]
+        excess = len(buckets) - self.max_keys // 2
+        if len(buckets) >= self.max_keys and excess > 0:
+            for key in list(buckets)[:excess]:
+                del buckets[key]
+
+
+class IngestGuard:
+    """Drop flooding sources and node ids before a datagram is decoded.
+
+    ``source_rate`` limits packets/s per source IP and ``node_rate`` packets/s
+    per announced node id; either may be ``None`` to disable that check.
+    Bursts of up to twice the rate are allowed.
+    """
+
+    def __init__(
+        self,
+        source_rate: float | None = None,
+        node_rate: float | None = None,
+        *,
+        max_keys: int = MAX_KEYS,
+    ) -> None:
+        self.sources: KeyedRateLimiter[str] | None = None
+        self.nodes: KeyedRateLimiter[bytes] | None = None
+        if source_rate is not None:
+            self.sources = KeyedRateLimiter(source_rate, max_keys=max_keys)
+        if node_rate is not None:
+            self.nodes = KeyedRateLimiter(node_rate, max_keys=max_keys)
+
+    def admit(self, data: Buffer, size: int, ip: str, now: float) -> bool:
+        if self.sources is not None and not self.sources.allow(ip, now):
+            return False
+        if self.nodes is not None:
+            node_id = peek_node_id(data, size)
+            if node_id is not None and not self.nodes.allow(node_id, now):
+                return False
+        return True
+
+    @property
+    def drops(self) -> Dict[str, int]:
+        return {
+            "source": self.sources.dropped if self.sources is not None else 0,
+            "node": self.nodes.dropped if self.nodes is not None else 0,
+        }
@@ -0,0 +1,196 @@
+"""Share a listener's peer table with other local processes.
+
+:class:`PeerTableServer` publishes the table over a Unix-domain socket using
+newline-delimited JSON, so the API, ``audio-core`` and scripts can read the
+mesh without joining the multicast group themselves. A client sends one
+command line:
+
+``snapshot``
+    The server replies with ``{"version": N, "peers": {...}, "drops": {...}}``
+    and closes; ``drops`` holds the listener's rate-limit drop counters.
+``subscribe``
+    The server replies with a snapshot, then one delta per change:
+    ``{"version": N, "event": "added" | "changed" | "removed", "id": ...}``.
+
+``version`` increases by one per change, letting subscribers detect gaps.
+Subscribers that fall more than ``max_pending`` deltas behind are
+disconnected and should reconnect for a fresh snapshot.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import json
+import logging
+import socket
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+from .listener import Listener
+from .snapshot import export_peer, export_peers
+
+logger = logging.getLogger(__name__)
+
+MAX_PENDING = 1024
+# Longest line a subscriber accepts. A snapshot is a single line of roughly
+# 200 bytes per peer, far beyond asyncio's 64 KiB default.
+LINE_LIMIT = 64 * 1024 * 1024
+
+
+def _encode(message: Dict[str, Any]) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class _Subscriber:
+    def __init__(self, writer: asyncio.StreamWriter, max_pending: int) -> None:
+        self.writer = writer
+        self.queue: asyncio.Queue[Optional[bytes]] = asyncio.Queue(max_pending)
+
+
+class PeerTableServer:
+    """Serve ``listener``'s peer table on the Unix socket at ``path``."""
+
+    def __init__(
+        self, listener: Listener, path: Path, *, max_pending: int = MAX_PENDING
+    ) -> None:
+        self.listener = listener
+        self.path = path
+        self.max_pending = max_pending
+        self.version = 0
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._subscribers: Set[_Subscriber] = set()
+
+    async def start(self) -> None:
+        self.path.unlink(missing_ok=True)
+        self._server = await asyncio.start_unix_server(
+            self._handle_client, path=str(self.path)
+        )
+        self.path.chmod(0o600)
+
+    async def stop(self) -> None:
+        for sub in list(self._subscribers):
+            self._drop(sub)
+        if self._server is not None:
+            self._server.close()
+            await self._server.wait_closed()
+            self._server = None
+        self.path.unlink(missing_ok=True)
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "peers": export_peers(self.listener),
+            "drops": self.listener.drops,
+        }
+
+    def publish(self, node_id: bytes, event: str) -> None:
+        """Record a change to ``node_id`` and fan it out to subscribers."""
+        self.version += 1
+        if not self._subscribers:
+            return
+        message: Dict[str, Any] = {
+            "version": self.version,
+            "event": event,
+            "id": node_id.hex(),
+        }
+        if event != "removed":
+            entry = export_peer(self.listener, node_id)
+            if entry is not None:
+                message.update(entry)
+        data = _encode(message)
+        for sub in list(self._subscribers):
+            try:
+                sub.queue.put_nowait(data)
+            except asyncio.QueueFull:
+                logger.warning("dropping slow peer-table subscriber")
+                self._drop(sub)
+
+    def _drop(self, sub: _Subscriber) -> None:
+        self._subscribers.discard(sub)
+        while not sub.queue.empty():
+            sub.queue.get_nowait()
+        sub.queue.put_nowait(None)
+
+    async def _handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        try:
+            command = (await reader.readline()).strip()
+            if command == b"snapshot":
+                writer.write(_encode(self.snapshot()))
+                await writer.drain()
+            elif command == b"subscribe":
+                await self._stream(writer)
+            else:
+                writer.write(_encode({"error": "unknown command"}))
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+            with contextlib.suppress(ConnectionError):
+                await writer.wait_closed()
+
+    async def _stream(self, writer: asyncio.StreamWriter) -> None:
+        sub = _Subscriber(writer, self.max_pending)
+        self._subscribers.add(sub)
+        try:
+            writer.write(_encode(self.snapshot()))
+            await writer.drain()
+            while True:
+                data = await sub.queue.get()
+                if data is None:
+                    return
+                writer.write(data)
+                await writer.drain()
+        finally:
+            self._subscribers.discard(sub)
+
+
+async def fetch_peers(path: Path) -> Dict[str, Any]:
+    """Return the current ``{"version", "peers"}`` table from ``path``."""
+    reader, writer = await asyncio.open_unix_connection(str(path))
+    try:
+        writer.write(b"snapshot\n")
+        await writer.drain()
+        # The server closes after the snapshot, so no line limit applies.
+        result: Dict[str, Any] = json.loads(await reader.read())
+        return result
+    finally:
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+async def subscribe_peers(path: Path) -> AsyncIterator[Dict[str, Any]]:
+    """Yield the table from ``path`` followed by each subsequent delta."""
+    reader, writer = await asyncio.open_unix_connection(str(path), limit=LINE_LIMIT)
+    try:
+        writer.write(b"subscribe\n")
+        await writer.drain()
+        while True:
+            line = await reader.readline()
+            if not line:
+                return
+            yield json.loads(line)
+    finally:
+        writer.close()
+        with contextlib.suppress(ConnectionError):
+            await writer.wait_closed()
+
+
+def read_peers(path: Path, timeout: float = 2.0) -> Dict[str, Any]:
+    """Blocking variant of :func:`fetch_peers` for scripts."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(str(path))
+        sock.sendall(b"snapshot\n")
+        chunks = []
+        while True:
+            chunk = sock.recv(65536)
+            if not chunk:
+                break
+            chunks.append(chunk)
+    result: Dict[str, Any] = json.loads(b"".join(chunks))
+    return result
@@ -0,0 +1,343 @@
+"""Spread discovery ingest over several worker processes.
+
+:class:`ShardedListener` behaves like :class:`~discovery.listener.Listener`,
+with the same callbacks, peer table and expiry, but receives packets in
+``workers`` child processes. Each worker binds the discovery port with
+``SO_REUSEPORT``, drains and decodes datagrams with a
+:class:`~discovery.listener.BatchReader` and keeps only the newest
+announcement per node. It then forwards the batch to the parent over a pipe.
+The parent merges the batches into its single table. Each batch header
+also carries the worker's rate-limit drop counters, which the parent sums
+into :attr:`ShardedListener.drops`.
+
+How packets reach the workers depends on the traffic:
+
+* Multicast datagrams are copied to *every* socket joined to the group;
+  ``SO_REUSEPORT`` load-balancing only applies to unicast. With
+  ``fanout=True`` (the default) each worker therefore peeks at the node id
+  and keeps only the nodes that hash to its shard. Decoding, rate limiting
+  and deduplication are split across cores; the kernel copy is not.
+* Unicast datagrams (e.g. from :mod:`benchmarks.loadgen`) are spread by the
+  kernel across the sockets by source address. Pass ``fanout=False`` so that
+  workers keep everything they receive.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing
+import socket
+import struct
+import time
+import zlib
+from multiprocessing.connection import Connection
+from multiprocessing.process import BaseProcess
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from .eventloop import current_event_loop, install_event_loop
+from .listener import (
+    MULTICAST_GROUP,
+    QUERY_PORT,
+    Announcement,
+    BatchReader,
+    Listener,
+    multicast_socket,
+)
+from .protocol import Buffer, pack_query, peek_node_id
+from .ratelimit import IngestGuard
+
+logger = logging.getLogger(__name__)
+
+# Batch header: worker receive time (monotonic), record count, and the
+# worker's running per-source and per-node drop counts.
+BATCH_HEADER = struct.Struct("!dHQQ")
+# Record: node id, IPv4 address, port, ts, capability length.
+RECORD = struct.Struct("!16s4sHQH")
+# Seconds between drop reports from a worker whose packets were all dropped.
+DROP_REPORT = 1.0
+# Seconds before a worker that exited is started again.
+RESPAWN_DELAY = 1.0
+
+
+def shard_of(node_id: bytes, shards: int) -> int:
+    """Index of the worker responsible for ``node_id``."""
+    return zlib.crc32(node_id) % shards
+
+
+class ShardGuard(IngestGuard):
+    """Admit only node ids in shard ``index``, then apply the rate limits."""
+
+    def __init__(
+        self,
+        index: int,
+        shards: int,
+        source_rate: Optional[float] = None,
+        node_rate: Optional[float] = None,
+    ) -> None:
+        super().__init__(source_rate, node_rate)
+        self.index = index
+        self.shards = shards
+
+    def admit(self, data: Buffer, size: int, ip: str, now: float) -> bool:
+        node_id = peek_node_id(data, size)
+        if node_id is None or zlib.crc32(node_id) % self.shards != self.index:
+            return False
+        return super().admit(data, size, ip, now)
+
+
+def encode_batch(
+    batch: List[Announcement], received: float, drops: Tuple[int, int] = (0, 0)
+) -> bytes:
+    parts = [BATCH_HEADER.pack(received, len(batch), *drops)]
+    pack = RECORD.pack
+    for ann in batch:
+        parts.append(
+            pack(ann.node_id, socket.inet_aton(ann.ip), ann.port, ann.ts, len(ann.caps))
+        )
+        parts.append(ann.caps)
+    return b"".join(parts)
+
+
+def decode_batch(
+    data: bytes,
+) -> Tuple[float, List[Announcement], Tuple[int, int]]:
+    received, count, source_drops, node_drops = BATCH_HEADER.unpack_from(data)
+    offset = BATCH_HEADER.size
+    unpack = RECORD.unpack_from
+    inet_ntoa = socket.inet_ntoa
+    batch = []
+    for _ in range(count):
+        node_id, ip, port, ts, size = unpack(data, offset)
+        offset += RECORD.size
+        caps = data[offset : offset + size]
+        offset += size
+        batch.append(Announcement(node_id, inet_ntoa(ip), port, ts, caps))
+    return received, batch, (source_drops, node_drops)
+
+
+class _BatchSender:
+    """Forward a worker's batches, with its drop counts, to the parent."""
+
+    def __init__(self, conn: Connection, guard: Optional[IngestGuard]) -> None:
+        self.conn = conn
+        self.guard = guard
+        self.sent = (0, 0)
+
+    def _drops(self) -> Tuple[int, int]:
+        if self.guard is None:
+            return (0, 0)
+        drops = self.guard.drops
+        return (drops["source"], drops["node"])
+
+    def __call__(self, batch: List[Announcement]) -> None:
+        self.sent = self._drops()
+        self.conn.send_bytes(encode_batch(batch, time.monotonic(), self.sent))
+
+    async def report_drops(self) -> None:
+        """Send new drop counts every :data:`DROP_REPORT` seconds.
+
+        A flood that is dropped whole forwards no batches to carry them.
+        """
+        while True:
+            await asyncio.sleep(DROP_REPORT)
+            if self._drops() != self.sent:
+                self([])
+
+
+async def _worker_main(
+    conn: Connection,
+    index: int,
+    shards: int,
+    fanout: bool,
+    interface_ip: str,
+    port: int,
+    limits: Tuple[Optional[float], Optional[float]],
+    recv_buffer: Optional[int],
+) -> None:
+    loop = asyncio.get_running_loop()
+    sock = multicast_socket(interface_ip, port, reuse_port=True)
+    if recv_buffer:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, recv_buffer)
+    guard: Optional[IngestGuard] = None
+    if fanout:
+        guard = ShardGuard(index, shards, *limits)
+    elif limits != (None, None):
+        guard = IngestGuard(*limits)
+
+    sender = _BatchSender(conn, guard)
+    reader = BatchReader(sock, sender, guard=guard)
+    reader.start(loop)
+    conn.send_bytes(b"")  # bound and ready
+    reporter = asyncio.create_task(sender.report_drops())
+    done = loop.create_future()
+    # The parent closing its end of the pipe is the shutdown signal.
+    loop.add_reader(conn.fileno(), done.set_result, None)
+    try:
+        await done
+    finally:
+        reporter.cancel()
+        loop.remove_reader(conn.fileno())
+        reader.close()
+
+
+def _run_worker(loop: str, *args: Any) -> None:
+    # Spawned children start with the default policy; match the parent's.
+    install_event_loop(loop)
+    try:
+        asyncio.run(_worker_main(*args))
+    except (BrokenPipeError, KeyboardInterrupt):  # pragma: no cover - shutdown
+        pass
+
+
+class ShardedListener(Listener):
+    """A :class:`Listener` whose ingest runs in ``workers`` processes.
+
+    Every other keyword argument has the same meaning as for
+    :class:`Listener`. ``recv_buffer`` sets each worker's ``SO_RCVBUF``.
+    """
+
+    def __init__(
+        self,
+        on_announcement: Callable[[bytes, str, int, int], None],
+        *,
+        workers: int = 2,
+        fanout: bool = True,
+        recv_buffer: Optional[int] = None,
+        rate_limit: Optional[float] = None,
+        node_rate_limit: Optional[float] = None,
+        **kwargs: Any,
+    ) -> None:
+        if workers < 1:
+            raise ValueError("workers must be at least 1")
+        super().__init__(on_announcement, **kwargs)
+        if self.interfaces is not None:
+            raise ValueError("ShardedListener supports a single interface_ip")
+        self.workers = workers
+        self.fanout = fanout
+        self.recv_buffer = recv_buffer
+        # Limits are enforced in the workers, never in this process.
+        self._limits = (rate_limit, node_rate_limit)
+        self._procs: List[BaseProcess] = []
+        self._conns: List[Connection] = []
+        # Last drop counts reported by each worker, and those of dead ones.
+        self._drops: List[Tuple[int, int]] = [(0, 0)] * workers
+        self._lost_drops = (0, 0)
+        self._respawns: Set[asyncio.Task[None]] = set()
+
+    @property
+    def drops(self) -> Dict[str, int]:
+        """Packets discarded by the workers' rate limits, summed."""
+        drops = [*self._drops, self._lost_drops]
+        return {
+            "source": sum(source for source, _ in drops),
+            "node": sum(node for _, node in drops),
+        }
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_event_loop()
+        for index in range(self.workers):
+            self._procs.append(self._spawn(index))
+        try:
+            for conn in self._conns:
+                await self._ready(conn)
+        except EOFError:
+            await self.stop()
+            raise OSError("discovery worker failed to start") from None
+        for index, conn in enumerate(self._conns):
+            self._loop.add_reader(conn.fileno(), self._read_worker, index, conn)
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    def _spawn(self, index: int) -> BaseProcess:
+        """Start worker ``index``; its pipe goes to ``_conns[index]``."""
+        ctx = multiprocessing.get_context("spawn")
+        parent, child = ctx.Pipe()
+        proc = ctx.Process(
+            target=_run_worker,
+            args=(
+                current_event_loop(),
+                child,
+                index,
+                self.workers,
+                self.fanout,
+                self.interface_ip,
+                self.port,
+                self._limits,
+                self.recv_buffer,
+            ),
+            daemon=True,
+        )
+        proc.start()
+        child.close()
+        if index < len(self._conns):
+            self._conns[index] = parent
+        else:
+            self._conns.append(parent)
+        return proc
+
+    async def _ready(self, conn: Connection) -> None:
+        # Wait for the ready message so no early packet is missed.
+        assert self._loop is not None
+        await self._loop.run_in_executor(None, conn.recv_bytes)
+
+    def _read_worker(self, index: int, conn: Connection) -> None:
+        try:
+            while conn.poll():
+                received, batch, self._drops[index] = decode_batch(conn.recv_bytes())
+                if batch:
+                    self._handle_batch(batch, received)
+        except (EOFError, OSError):
+            assert self._loop is not None
+            self._loop.remove_reader(conn.fileno())
+            conn.close()
+            # Its shard of node ids goes unheard until a new worker runs.
+            logger.warning("discovery worker %d exited; restarting it", index)
+            lost, last = self._lost_drops, self._drops[index]
+            self._lost_drops = (lost[0] + last[0], lost[1] + last[1])
+            self._drops[index] = (0, 0)
+            task = asyncio.create_task(self._respawn(index))
+            self._respawns.add(task)
+            task.add_done_callback(self._respawns.discard)
+
+    async def _respawn(self, index: int) -> None:
+        assert self._loop is not None
+        while True:
+            await self._loop.run_in_executor(None, self._procs[index].join)
+            await asyncio.sleep(RESPAWN_DELAY)
+            self._procs[index] = self._spawn(index)
+            conn = self._conns[index]
+            try:
+                await self._ready(conn)
+            except EOFError:
+                conn.close()
+                logger.warning("discovery worker %d failed to restart", index)
+                continue
+            self._loop.add_reader(conn.fileno(), self._read_worker, index, conn)
+            return
+
+    def query(self) -> None:
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+            try:
+                sock.sendto(pack_query(), (MULTICAST_GROUP, QUERY_PORT))
+            except OSError as exc:  # pragma: no cover - depends on OS
+                logger.warning("query failed: %s", exc)
+
+    async def stop(self) -> None:
+        for task in list(self._respawns):
+            task.cancel()
+        await asyncio.gather(*self._respawns, return_exceptions=True)
+        for conn in self._conns:
+            if conn.closed:
+                continue  # a dead worker's
+            if self._loop is not None:
+                self._loop.remove_reader(conn.fileno())
+            conn.close()
+        self._conns = []
+        loop = asyncio.get_running_loop()
+        for proc in self._procs:
+            await loop.run_in_executor(None, proc.join, 2.0)
+            if proc.is_alive():  # pragma: no cover - stuck worker
+                proc.terminate()
+                proc.join()
+        self._procs = []
+        await super().stop()
@@ -0,0 +1,127 @@
+"""Persist the peer table so a restarted listener can warm-start."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from .listener import Listener
+
+SNAPSHOT_VERSION = 1
+
+
+def export_peer(
+    listener: Listener, node_id: bytes, now: Optional[float] = None
+) -> Optional[Dict[str, Any]]:
+    """Return one serialisable peer-table entry, or ``None`` if unknown.
+
+    ``seen`` is the wall-clock time the peer was last heard from and
+    ``link`` holds its link statistics once they are available.
+    ``interfaces`` maps each local interface to the peer's address on it
+    when the peer is heard on more than one.
+    """
+    peer = listener.peers.get(node_id)
+    if peer is None:
+        return None
+    if now is None:
+        now = time.time()
+    age = listener.age(node_id)
+    entry: Dict[str, Any] = {
+        "ip": peer.ip,
+        "port": peer.port,
+        "seen": now - (age or 0.0),
+    }
+    if peer.caps:
+        entry["caps"] = peer.caps.hex()
+    if peer.provisional:
+        entry["provisional"] = True
+    link = listener.link_stats(node_id)
+    if link is not None:
+        entry["link"] = link
+    if len(peer.interfaces) > 1:
+        entry["interfaces"] = dict(peer.interfaces)
+    return entry
+
+
+def export_peers(
+    listener: Listener, now: Optional[float] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Return the listener's peer table keyed by hex node id."""
+    if now is None:
+        now = time.time()
+    table: Dict[str, Dict[str, Any]] = {}
+    for node_id in listener.peers:
+        entry = export_peer(listener, node_id, now)
+        if entry is not None:
+            table[node_id.hex()] = entry
+    return table
+
+
+def write_snapshot(path: Path, peers: Dict[str, Dict[str, Any]]) -> None:
+    """Atomically replace ``path`` with a snapshot of ``peers``."""
+    payload = {"version": SNAPSHOT_VERSION, "peers": peers}
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.")
+    try:
+        with os.fdopen(fd, "w") as fh:
+            json.dump(payload, fh, separators=(",", ":"))
+        os.replace(tmp, path)
+    except BaseException:
+        Path(tmp).unlink(missing_ok=True)
+        raise
+
+
+def read_snapshot(
+    path: Path, max_age: float, now: Optional[float] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Load peers from ``path`` that were seen within ``max_age`` seconds.
+
+    Each returned entry carries its ``age`` in seconds. Missing, corrupt or
+    incompatible snapshots yield an empty table.
+    """
+    if now is None:
+        now = time.time()
+    try:
+        payload = json.loads(path.read_text())
+        if payload.get("version") != SNAPSHOT_VERSION:
+            return {}
+        entries = payload["peers"].items()
+    except (OSError, ValueError, KeyError, AttributeError):
+        return {}
+    peers: Dict[str, Dict[str, Any]] = {}
+    for nid, entry in entries:
+        try:
+            age = max(0.0, now - float(entry["seen"]))
+            if age >= max_age:
+                continue
+            peers[nid] = {
+                "ip": str(entry["ip"]),
+                "port": int(entry["port"]),
+                "caps": str(entry.get("caps", "")),
+                "age": age,
+            }
+        except (KeyError, TypeError, ValueError):
+            continue
+    return peers
+
+
+def restore_snapshot(
+    listener: Listener, path: Path, now: Optional[float] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Seed ``listener`` from the snapshot at ``path``.
+
+    Returns the restored entries keyed by hex node id.
+    """
+    restored = {}
+    for nid, entry in read_snapshot(path, listener.timeout, now).items():
+        try:
+            node_id = bytes.fromhex(nid)
+            caps = bytes.fromhex(entry["caps"])
+        except ValueError:
+            continue
+        listener.seed(node_id, entry["ip"], entry["port"], entry["age"], caps)
+        restored[nid] = entry
+    return restored
@@ -0,0 +1,146 @@
+import asyncio
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any, Callable, Iterator, Union
+
+import pytest  # type: ignore[import-not-found]
+
+import audiomesh
+
+# Stand-ins for jacktrip, by name. Long-running ones print a line once set up.
+SCRIPTS = {
+    "sleeper": "import time\nprint('ready', flush=True)\ntime.sleep(30)\n",
+    # Ignores SIGTERM, announcing when the handler is installed.
+    "stubborn": (
+        "import signal, time\n"
+        "signal.signal(signal.SIGTERM, signal.SIG_IGN)\n"
+        "print('ready', flush=True)\n"
+        "time.sleep(30)\n"
+    ),
+    "crasher": "import sys\nprint('Ring buffer underrun')\nsys.exit(3)\n",
+    # A jacktrip server waiting for its peer; FAKE_JACKTRIP_FAIL fails it.
+    "waiter": (
+        "import os, sys, time\n"
+        "if os.environ.get('FAKE_JACKTRIP_FAIL'):\n"
+        "    sys.exit(1)\n"
+        "print('Waiting for Peer...', flush=True)\n"
+        "time.sleep(30)\n"
+    ),
+}
+
+
+@pytest.fixture(autouse=True)
+def stream_registry(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> Path:
+    """Keep each test's stream registry out of the user's home directory."""
+    path = tmp_path / "streams.db"
+    monkeypatch.setenv("AUDIOMESH_STREAM_DB", str(path))
+    return path
+
+
+@pytest.fixture(autouse=True)
+def jacktrip_cache(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Forget the cached jacktrip path so each test resolves it afresh."""
+    monkeypatch.setattr(audiomesh, "_JACKTRIP", None)
+    monkeypatch.delenv("AUDIOMESH_JACKTRIP", raising=False)
+
+
+@pytest.fixture
+def jacktrip_script(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Callable[[Union[str, Callable[[str], str]]], list[tuple[str, str]]]:
+    """Make ``_jacktrip_command`` run one of :data:`SCRIPTS`.
+
+    Call the fixture with a script name, or with a function from peer IP to
+    script name. It returns the ``(peer_ip, client_name)`` of each launch.
+    """
+    calls: list[tuple[str, str]] = []
+
+    def install(script: Union[str, Callable[[str], str]]) -> list[tuple[str, str]]:
+        def command(peer_ip: str, name: str, *options: str) -> list[str]:
+            calls.append((peer_ip, name))
+            chosen = script(peer_ip) if callable(script) else script
+            return [sys.executable, "-c", SCRIPTS[chosen]]
+
+        monkeypatch.setattr(audiomesh, "_jacktrip_command", command)
+        monkeypatch.setattr(audiomesh, "_ASYNC_PROCESSES", {})
+        return calls
+
+    return install
+
+
+@pytest.fixture
+def fake_jacktrip(
+    monkeypatch: pytest.MonkeyPatch,
+) -> Callable[[str], list[tuple[str, ...]]]:
+    """Run one of :data:`SCRIPTS` for every async launch, after its first line.
+
+    Unlike :func:`jacktrip_script` the real command is built, so the calls
+    returned are full jacktrip command lines.
+    """
+    calls: list[tuple[str, ...]] = []
+    real_exec = asyncio.create_subprocess_exec
+
+    def install(script: str) -> list[tuple[str, ...]]:
+        async def fake_exec(*cmd: str, **kwargs: Any) -> asyncio.subprocess.Process:
+            calls.append(cmd)
+            proc = await real_exec(
+                sys.executable, "-c", SCRIPTS[script], stdout=asyncio.subprocess.PIPE
+            )
+            assert proc.stdout is not None
+            await proc.stdout.readline()
+            return proc
+
+        monkeypatch.setattr(shutil, "which", lambda name: "/usr/bin/jacktrip")
+        monkeypatch.setattr(asyncio, "create_subprocess_exec", fake_exec)
+        monkeypatch.setattr(audiomesh, "_ASYNC_PROCESSES", {})
+        return calls
+
+    return install
+
+
+@pytest.fixture
+def jacktrip_executable(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> Callable[[str], Path]:
+    """Install one of :data:`SCRIPTS` as the ``jacktrip`` binary.
+
+    Call the fixture with a script name; it returns the executable's path,
+    also set as ``AUDIOMESH_JACKTRIP``.
+    """
+
+    def install(script: str) -> Path:
+        path = tmp_path / "jacktrip"
+        path.write_text(f"#!{sys.executable}\n{SCRIPTS[script]}")
+        path.chmod(0o755)
+        monkeypatch.setenv("AUDIOMESH_JACKTRIP", str(path))
+        monkeypatch.setattr(audiomesh, "_ASYNC_PROCESSES", {})
+        return path
+
+    return install
+
+
+@pytest.fixture
+def spawn_script() -> Iterator[Callable[[str], subprocess.Popen[bytes]]]:
+    """Start one of :data:`SCRIPTS` as a plain child, once it is set up.
+
+    The children are killed when the test ends.
+    """
+    procs: list[subprocess.Popen[bytes]] = []
+
+    def spawn(script: str) -> subprocess.Popen[bytes]:
+        proc = subprocess.Popen(
+            [sys.executable, "-c", SCRIPTS[script]], stdout=subprocess.PIPE
+        )
+        procs.append(proc)
+        assert proc.stdout is not None
+        proc.stdout.readline()
+        return proc
+
+    yield spawn
+    for proc in procs:
+        proc.kill()
+        proc.wait()
+        if proc.stdout is not None:
+            proc.stdout.close()
@@ -5,10 +5,16 @@ from typing import Any, List
 import pytest  # type: ignore
 
 from discovery import listener as discovery_listener
-from discovery.announcer import MULTICAST_GROUP, Announcer
+from discovery.announcer import MULTICAST_GROUP, QUERY_PORT, Announcer, QueryProtocol
 from discovery.exceptions import PeerTimeoutError
-from discovery.listener import Listener, ListenerProtocol
-from discovery.protocol import pack_announcement
+from discovery.listener import Announcement, BatchReader, Listener, ListenerProtocol
+from discovery.protocol import (
+    decode_announcement,
+    pack_announcement,
+    pack_announcement_v2,
+    pack_capabilities,
+    pack_query,
+)
 
 
 class DummyTransport:
@@ -239,3 +245,277 @@ def test_listener_stop(monkeypatch: pytest.MonkeyPatch) -> None:
         await listener.stop()
 
     asyncio.run(runner())
+
+
+def test_listener_expiry_latency() -> None:
+    removed: List[float] = []
+    timeout = 0.05
+
+    async def runner() -> None:
+        loop = asyncio.get_running_loop()
+        listener = Listener(
+            lambda *_: None,
+            timeout=timeout,
+            on_removed=lambda nid: removed.append(loop.time()),
+        )
+        listener._loop = loop
+        task = asyncio.create_task(listener._cleanup_loop())
+        await asyncio.sleep(0.01)
+        listener._handle_announcement(b"q" * 16, "1.2.3.4", 0, 0)
+        seen = listener._last_seen[b"q" * 16]
+        await asyncio.sleep(timeout * 3)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert len(removed) == 1
+        latency = removed[0] - (seen + timeout)
+        assert 0 <= latency < 0.02
+
+    asyncio.run(runner())
+
+
+def test_listener_refresh_defers_expiry() -> None:
+    removed: List[bytes] = []
+
+    async def runner() -> None:
+        loop = asyncio.get_running_loop()
+        listener = Listener(
+            lambda *_: None,
+            timeout=0.05,
+            on_removed=lambda nid: removed.append(nid),
+        )
+        listener._loop = loop
+        task = asyncio.create_task(listener._cleanup_loop())
+        for _ in range(4):
+            listener._handle_announcement(b"r" * 16, "1.2.3.4", 0, 0)
+            await asyncio.sleep(0.03)
+        assert removed == []
+        assert len(listener._deadlines) == 1
+        await asyncio.sleep(0.08)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+        assert removed == [b"r" * 16]
+
+    asyncio.run(runner())
+
+
+def test_batch_reader_keeps_newest_per_node() -> None:
+    batches: List[List[Announcement]] = []
+    recv = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    recv.bind(("127.0.0.1", 0))
+    send = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    try:
+        target = recv.getsockname()
+        for node, ts in ((b"a", 5), (b"b", 1), (b"a", 9), (b"a", 7)):
+            send.sendto(pack_announcement(node * 16, 4000, ts), target)
+        send.sendto(b"bad", target)
+        recv.setblocking(False)
+        reader = BatchReader(recv, batches.append)
+        reader.read_ready()
+        reader.read_ready()
+    finally:
+        send.close()
+        recv.close()
+    assert len(batches) == 1
+    assert sorted((a.node_id[:1], a.ts) for a in batches[0]) == [(b"a", 9), (b"b", 1)]
+    assert all(a.ip == "127.0.0.1" and a.port == 4000 for a in batches[0])
+
+
+def test_listener_handle_batch() -> None:
+    batches: List[List[Announcement]] = []
+    loop = asyncio.new_event_loop()
+    listener = Listener(lambda *_: None, on_batch=batches.append)
+    listener._loop = loop
+    batch = [
+        Announcement(b"a" * 16, "1.1.1.1", 1, 1),
+        Announcement(b"b" * 16, "2.2.2.2", 2, 2),
+    ]
+    listener._handle_batch(batch)
+    loop.close()
+    assert listener.batch
+    assert batches == [batch]
+    assert set(listener._last_seen) == {b"a" * 16, b"b" * 16}
+    assert len(listener._deadlines) == 2
+
+
+def test_listener_callbacks_only_on_change() -> None:
+    events: List[tuple[bytes, str, int, int]] = []
+    heartbeats: List[int] = []
+    loop = asyncio.new_event_loop()
+    listener = Listener(
+        lambda *args: events.append(args),
+        on_heartbeat=lambda nid, ip, port, ts: heartbeats.append(ts),
+    )
+    listener._loop = loop
+    nid = b"c" * 16
+    listener._handle_announcement(nid, "1.1.1.1", 10, 1)
+    for ts in range(2, 100):
+        listener._handle_announcement(nid, "1.1.1.1", 10, ts)
+    listener._handle_announcement(nid, "1.1.1.2", 10, 100)
+    listener._handle_announcement(nid, "1.1.1.2", 11, 101)
+    loop.close()
+    assert [e[3] for e in events] == [1, 100, 101]
+    assert len(heartbeats) == 101
+    assert listener.peers[nid].ip == "1.1.1.2"
+    assert listener.peers[nid].port == 11
+    assert len(listener._deadlines) == 1
+
+
+def test_listener_batch_delivers_only_changes() -> None:
+    batches: List[List[Announcement]] = []
+    loop = asyncio.new_event_loop()
+    listener = Listener(lambda *_: None, on_batch=batches.append)
+    listener._loop = loop
+    a = Announcement(b"a" * 16, "1.1.1.1", 1, 1)
+    b = Announcement(b"b" * 16, "2.2.2.2", 2, 1)
+    listener._handle_batch([a, b])
+    listener._handle_batch([a._replace(ts=2), b._replace(ts=2)])
+    moved = b._replace(ip="3.3.3.3", ts=3)
+    listener._handle_batch([a._replace(ts=3), moved])
+    loop.close()
+    assert batches == [[a, b], [moved]]
+
+
+def test_listener_stores_v2_capabilities_lazily() -> None:
+    events: List[tuple[bytes, str, int, int]] = []
+    loop = asyncio.new_event_loop()
+    listener = Listener(lambda *args: events.append(args))
+    listener._loop = loop
+    proto = ListenerProtocol(listener._handle_announcement, with_capabilities=True)
+    caps = pack_capabilities({"channels": 8, "free_slots": 3})
+    nid = b"d" * 16
+    proto.datagram_received(pack_announcement_v2(nid, 10, 1, caps), ("1.2.3.4", 0))
+    proto.datagram_received(pack_announcement(b"e" * 16, 11, 1), ("1.2.3.5", 0))
+    loop.close()
+    assert events == [(nid, "1.2.3.4", 10, 1), (b"e" * 16, "1.2.3.5", 11, 1)]
+    peer = listener.peers[nid]
+    assert peer._capabilities is None
+    assert peer.capabilities == {"channels": 8, "free_slots": 3}
+    assert listener.peers[b"e" * 16].capabilities == {}
+
+
+def test_announcer_sends_v2_with_capabilities(monkeypatch: pytest.MonkeyPatch) -> None:
+    async def runner() -> None:
+        loop = DummyLoop()
+        monkeypatch.setattr(asyncio, "get_event_loop", lambda: loop)
+        monkeypatch.setattr(socket, "socket", lambda *a, **k: DummySocket())
+
+        ann = Announcer(b"a" * 16, 5001, capabilities={"channels": 2})
+        await ann.start()
+        await ann.stop()
+        decoded = decode_announcement(loop.transport.sent[0][0])
+        assert decoded is not None
+        assert decoded[:3] == (b"a" * 16, 5001, 1000)
+        assert decoded[3] == pack_capabilities({"channels": 2})
+
+    asyncio.run(runner())
+
+
+def test_announcer_adaptive_backoff() -> None:
+    ann = Announcer(b"a" * 16, 5001, interval=2.0, schedule="adaptive", jitter=0.0)
+    delays = [ann._next_delay() for _ in range(6)]
+    assert delays == [0.25, 0.5, 1.0, 2.0, 2.0, 2.0]
+    ann.set_port(5002)
+    assert ann._next_delay() == 0.25
+
+    jittered = Announcer(b"a" * 16, 5001, interval=1.0, schedule="adaptive")
+    for _ in range(20):
+        jittered._next_delay()
+    samples = [jittered._next_delay() for _ in range(50)]
+    assert all(0.8 <= d <= 1.2 for d in samples)
+    assert len(set(samples)) > 1
+
+
+def test_announcer_sends_immediately_on_change(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def runner() -> None:
+        loop = DummyLoop()
+        monkeypatch.setattr(asyncio, "get_event_loop", lambda: loop)
+        monkeypatch.setattr(socket, "socket", lambda *a, **k: DummySocket())
+
+        ann = Announcer(b"a" * 16, 5001, interval=10.0)
+        await ann.start()
+        await asyncio.sleep(0.01)
+        assert len(loop.transport.sent) == 1
+        ann.set_capabilities({"load": 50})
+        await asyncio.sleep(0.01)
+        await ann.stop()
+        assert len(loop.transport.sent) == 2
+        decoded = decode_announcement(loop.transport.sent[1][0])
+        assert decoded is not None
+        assert decoded[3] == pack_capabilities({"load": 50})
+
+    asyncio.run(runner())
+
+
+def test_announcer_answers_query_once() -> None:
+    async def runner() -> None:
+        ann = Announcer(b"a" * 16, 5001, max_response_delay=0.01)
+        sent: List[int] = []
+
+        async def fake_send() -> None:
+            sent.append(1)
+
+        ann._send_announcement = fake_send  # type: ignore[method-assign]
+        proto = QueryProtocol(ann._on_query)
+        proto.datagram_received(pack_query(b"q" * 16), ("1.2.3.4", 0))
+        proto.datagram_received(pack_query(b"r" * 16), ("1.2.3.5", 0))
+        proto.datagram_received(pack_query(b"a" * 16), ("1.2.3.6", 0))
+        proto.datagram_received(b"junk", ("1.2.3.7", 0))
+        await asyncio.sleep(0.05)
+        assert sent == [1]
+
+    asyncio.run(runner())
+
+
+def test_listener_query_sends_to_query_port() -> None:
+    listener = Listener(lambda *_: None)
+    transport = DummyTransport()
+    listener.transport = transport  # type: ignore[assignment]
+    listener.query()
+    assert transport.sent == [(pack_query(), (MULTICAST_GROUP, QUERY_PORT))]
+
+
+def test_listener_rate_limits_before_decode(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(discovery_listener.time, "monotonic", lambda: 100.0)
+    listener = Listener(lambda *a: None, rate_limit=2.0, node_rate_limit=1.0)
+    assert listener.guard is not None
+    events: List[Any] = []
+    proto = ListenerProtocol(
+        lambda *a: events.append(a), with_capabilities=True, guard=listener.guard
+    )
+    pkt = pack_announcement(b"a" * 16, 10, 1)
+    for _ in range(3):
+        proto.datagram_received(pkt, ("1.2.3.4", 0))
+    proto.datagram_received(b"bad" * 20, ("1.2.3.4", 0))
+    proto.datagram_received(b"bad" * 20, ("1.2.3.4", 0))
+    assert len(events) == 2
+    # Source burst is 4: three announcements and one junk packet get through.
+    assert listener.drops == {"source": 1, "node": 1}
+    assert Listener(lambda *a: None).drops == {"source": 0, "node": 0}
+
+
+def test_listener_tracks_link_stats() -> None:
+    class Clock(DummyLoop):
+        now = 50.0
+
+        def time(self) -> float:
+            return self.now
+
+    clock = Clock()
+    listener = Listener(lambda *a: None)
+    listener._loop = clock  # type: ignore[assignment]
+    nid = b"a" * 16
+    for i in range(5):
+        clock.now = 50.0 + i
+        listener._handle_announcement(nid, "1.1.1.1", 1, i * 1000)
+    stats = listener.link_stats(nid)
+    assert stats is not None
+    assert stats["samples"] == 5 and stats["loss"] == 0.0
+    assert listener.link_stats(b"b" * 16) is None
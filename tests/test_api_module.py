@@ -1,5 +1,10 @@
+from pathlib import Path
+from typing import Any
+
+import pytest  # type: ignore[import-not-found]
 from fastapi.testclient import TestClient  # type: ignore[import-not-found]
 
+from audiomesh import api
 from audiomesh.api import app
 
 
@@ -8,3 +13,25 @@ def test_health_endpoint() -> None:
     response = client.get("/health")
     assert response.status_code == 200
     assert response.json() == {"status": "ok"}
+
+
+def test_nodes_endpoint(monkeypatch: pytest.MonkeyPatch) -> None:
+    table = {"version": 3, "peers": {"ab": {"ip": "1.1.1.1", "port": 1}}}
+
+    async def fake_fetch(path: Path) -> dict[str, Any]:
+        return table
+
+    monkeypatch.setattr(api, "fetch_peers", fake_fetch)
+    client = TestClient(app)
+    response = client.get("/api/nodes")
+    assert response.status_code == 200
+    assert response.json() == table
+
+
+def test_nodes_endpoint_without_daemon(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    monkeypatch.setattr(api, "PEER_SOCKET", tmp_path / "missing.sock")
+    client = TestClient(app)
+    response = client.get("/api/nodes")
+    assert response.status_code == 503
@@ -0,0 +1,28 @@
+from typing import Any
+
+from benchmarks.discovery_suite import compare
+from benchmarks.loadgen import node_ids
+
+
+def _report(pps: float, latency: float) -> dict[str, Any]:
+    return {
+        "results": {
+            "ingest": {"packets_per_sec": pps},
+            "expiry": {"p99_latency_ms": latency},
+        }
+    }
+
+
+def test_node_ids_are_distinct_and_reproducible() -> None:
+    ids = node_ids(1000)
+    assert len(set(ids)) == 1000
+    assert all(len(nid) == 16 for nid in ids)
+    assert ids == node_ids(1000)
+
+
+def test_compare_flags_regressions() -> None:
+    baseline = _report(100_000, 2.0)
+    assert compare(_report(95_000, 2.2), baseline, 0.2) == []
+    problems = compare(_report(50_000, 5.0), baseline, 0.2)
+    assert len(problems) == 2
+    assert problems[0].startswith("ingest.packets_per_sec")
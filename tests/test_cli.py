@@ -1,6 +1,8 @@
+import asyncio
 import json
 import os
 import signal
+import time
 from pathlib import Path
 from typing import Any
 
@@ -29,11 +31,16 @@ def test_start_invokes_listener(monkeypatch: pytest.MonkeyPatch) -> None:
             interface_ip: str,
             timeout: float,
             on_removed: Any | None = None,
+            rate_limit: float | None = None,
+            node_rate_limit: float | None = None,
         ) -> None:
             calls["args"] = (interface_ip, timeout)
             self.handler = handler
             self.on_removed = on_removed
 
+        def link_stats(self, node_id: bytes) -> None:
+            return None
+
         async def start(self) -> None:
             calls["started"] = True
             self.handler(b"a" * 16, "1.1.1.1", 5000, 1)
@@ -72,14 +79,17 @@ def test_start_invokes_listener(monkeypatch: pytest.MonkeyPatch) -> None:
     assert result.exit_code == 0
     assert calls["args"] == ("1.2.3.4", 5.0)
     assert calls.get("started")
-    assert '"event": "added"' in result.output
-    assert '"event": "removed"' in result.output
+    events = [json.loads(line)["event"] for line in result.output.splitlines()]
+    assert events == ["added", "removed"]
 
 
-def test_start_daemon_json(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_start_daemon_json(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
     calls: dict[str, Any] = {}
 
     class DummyListener:
+        timeout = 5.0
+        peers: dict[bytes, Any] = {}
+
         def __init__(
             self,
             handler: Any,
@@ -87,10 +97,15 @@ def test_start_daemon_json(monkeypatch: pytest.MonkeyPatch) -> None:
             interface_ip: str,
             timeout: float,
             on_removed: Any | None = None,
+            rate_limit: float | None = None,
+            node_rate_limit: float | None = None,
         ) -> None:
             self.handler = handler
             self.on_removed = on_removed
 
+        def link_stats(self, node_id: bytes) -> None:
+            return None
+
         async def start(self) -> None:
             self.handler(b"x" * 16, "2.2.2.2", 6000, 1)
             if self.on_removed:
@@ -113,10 +128,11 @@ def test_start_daemon_json(monkeypatch: pytest.MonkeyPatch) -> None:
     monkeypatch.setattr(signal, "signal", lambda *a, **k: None)
     monkeypatch.setattr(cli, "_fork_daemon", lambda p: False)
 
+    pid_file = tmp_path / "d.pid"
     runner = CliRunner()
     result = runner.invoke(
         cli.discovery,
-        ["start", "--daemon", "--format", "json"],
+        ["start", "--daemon", "--format", "json", "--pid-file", str(pid_file)],
     )
     assert result.exit_code == 0
     data = [json.loads(line) for line in result.output.strip().splitlines()]
@@ -188,3 +204,172 @@ def test_audio_core_stop_error(monkeypatch: pytest.MonkeyPatch) -> None:
     result = runner.invoke(cli.audio_core, ["stop", "7"])
     assert result.exit_code == 1
     assert "bad pid" in result.output
+
+
+def test_announcement_handler_reports_changes(
+    capsys: pytest.CaptureFixture[str],
+) -> None:
+    peers: dict[str, dict[str, Any]] = {}
+    handler = cli._announcement_handler(peers, "json")
+    handler(b"a" * 16, "1.1.1.1", 5000, 1)
+    handler(b"a" * 16, "1.1.1.2", 5000, 2)
+    lines = [json.loads(line) for line in capsys.readouterr().out.splitlines()]
+    assert [line["event"] for line in lines] == ["added", "changed"]
+    assert peers[(b"a" * 16).hex()]["ip"] == "1.1.1.2"
+
+
+def test_start_query_option(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[str] = []
+
+    class DummyListener:
+        def __init__(self, handler: Any, **kwargs: Any) -> None:
+            pass
+
+        async def start(self) -> None:
+            calls.append("start")
+
+        def query(self) -> None:
+            calls.append("query")
+
+        async def stop(self) -> None:
+            calls.append("stop")
+
+    monkeypatch.setattr(cli, "Listener", DummyListener)
+    asyncio_mod: Any = cli.asyncio  # type: ignore[attr-defined]
+    monkeypatch.setattr(asyncio_mod, "Event", lambda: DummyEvent())
+
+    def fake_run(coro: Any) -> None:
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(coro)
+
+    monkeypatch.setattr(asyncio_mod, "run", fake_run)
+    monkeypatch.setattr(signal, "signal", lambda *a, **k: None)
+
+    runner = CliRunner()
+    result = runner.invoke(cli.discovery, ["start", "--query", "--format", "json"])
+    assert result.exit_code == 0
+    assert calls == ["start", "query", "stop"]
+
+
+def test_daemon_restores_and_saves_snapshot(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    from discovery.listener import Listener
+    from discovery.snapshot import write_snapshot
+
+    pid_file = tmp_path / "d.pid"
+    snapshot = tmp_path / "d.peers.json"
+    nid = (b"s" * 16).hex()
+    write_snapshot(
+        snapshot, {nid: {"ip": "3.3.3.3", "port": 7000, "seen": time.time() - 1}}
+    )
+
+    class DummyListener(Listener):
+        async def start(self) -> None:
+            import asyncio
+
+            self._loop = asyncio.get_running_loop()
+
+        async def stop(self) -> None:
+            pass
+
+    monkeypatch.setattr(cli, "Listener", DummyListener)
+    asyncio_mod: Any = cli.asyncio  # type: ignore[attr-defined]
+    monkeypatch.setattr(asyncio_mod, "Event", lambda: DummyEvent())
+
+    def fake_run(coro: Any) -> None:
+        import asyncio
+
+        loop = asyncio.new_event_loop()
+        loop.run_until_complete(coro)
+
+    monkeypatch.setattr(asyncio_mod, "run", fake_run)
+    monkeypatch.setattr(signal, "signal", lambda *a, **k: None)
+    monkeypatch.setattr(cli, "_fork_daemon", lambda p: False)
+
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.discovery,
+        ["start", "--daemon", "--format", "json", "--pid-file", str(pid_file)],
+    )
+    assert result.exit_code == 0
+    event = json.loads(result.output.strip().splitlines()[0])
+    assert event["id"] == nid
+    assert event["provisional"] is True
+    saved = json.loads(snapshot.read_text())["peers"]
+    assert saved[nid]["ip"] == "3.3.3.3"
+    assert saved[nid]["provisional"] is True
+
+
+def test_peers_command_reads_service(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    paths: list[Path] = []
+    table = {"version": 1, "peers": {"ab": {"ip": "4.4.4.4", "port": 9, "seen": 0}}}
+
+    def fake_read(path: Path) -> dict[str, Any]:
+        paths.append(path)
+        return table
+
+    monkeypatch.setattr(cli, "read_peers", fake_read)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.discovery,
+        ["peers", "--pid-file", str(tmp_path / "d.pid"), "--format", "json"],
+    )
+    assert result.exit_code == 0
+    assert json.loads(result.output) == table
+    assert paths == [tmp_path / "d.sock"]
+
+    result = runner.invoke(
+        cli.discovery, ["peers", "--pid-file", str(tmp_path / "d.pid")]
+    )
+    assert "4.4.4.4" in result.output
+
+
+def test_interface_option_accepts_lists() -> None:
+    assert cli._interface_kwargs("10.0.0.5") == {"interface_ip": "10.0.0.5"}
+    assert cli._interface_kwargs("all") == {"interfaces": "all"}
+    assert cli._interface_kwargs("eth0,eth1") == {"interfaces": "eth0,eth1"}
+
+
+@pytest.mark.parametrize(
+    "args, message",
+    [
+        (["--interface", "bogus0"], "unknown interface 'bogus0'"),
+        (
+            ["--workers", "2", "--interface", "10.0.0.1,10.0.0.2"],
+            "--workers > 1 needs a single --interface",
+        ),
+    ],
+)
+def test_start_rejects_bad_interfaces(args: list[str], message: str) -> None:
+    result = CliRunner().invoke(cli.discovery, ["start", *args])
+    assert result.exit_code == 2
+    assert message in result.output
+
+
+def test_link_events_report_steady_peers() -> None:
+    peers: dict[str, dict[str, Any]] = {"aa": {}, "bb": {}}
+    stats = {"aa": {"jitter_ms": 0.5, "loss": 0.0}}
+    events: list[dict[str, Any]] = []
+
+    async def scenario() -> None:
+        task = asyncio.create_task(
+            cli._link_loop(peers, stats.get, events.append, 0.01)
+        )
+        await asyncio.sleep(0.05)
+        # Too small a change to report.
+        stats["aa"] = {"jitter_ms": 0.9, "loss": 0.005}
+        await asyncio.sleep(0.05)
+        stats["aa"] = {"jitter_ms": 0.9, "loss": 0.05}
+        await asyncio.sleep(0.05)
+        await cli._cancel(task)
+
+    asyncio.run(scenario())
+    assert events == [
+        {"event": "link", "id": "aa", "link": {"jitter_ms": 0.5, "loss": 0.0}},
+        {"event": "link", "id": "aa", "link": {"jitter_ms": 0.9, "loss": 0.05}},
+    ]
@@ -33,6 +33,7 @@ def test_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
     call = server.calls[0]["kwargs"]
     assert call["host"] == cli.API_HOST  # type: ignore[attr-defined]
     assert call["port"] == cli.API_PORT  # type: ignore[attr-defined]
+    assert call["loop"] in ("asyncio", "uvloop")
 
 
 def test_override(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -44,3 +45,21 @@ def test_override(monkeypatch: pytest.MonkeyPatch) -> None:
     call = server.calls[0]["kwargs"]
     assert call["host"] == "0.0.0.0"
     assert call["port"] == 8000
+
+
+def test_loop_option(monkeypatch: pytest.MonkeyPatch) -> None:
+    server = DummyServer()
+    monkeypatch.setattr(cli, "uvicorn", type("U", (), {"run": server}))
+    monkeypatch.setattr(cli, "install_event_loop", lambda name: "asyncio")
+    runner = CliRunner()
+    result = runner.invoke(cli.cli, ["api", "--loop", "asyncio"])
+    assert result.exit_code == 0
+    assert server.calls[0]["kwargs"]["loop"] == "asyncio"
+
+    def missing(name: str) -> str:
+        raise RuntimeError("uvloop is not installed")
+
+    monkeypatch.setattr(cli, "install_event_loop", missing)
+    result = runner.invoke(cli.cli, ["api", "--loop", "uvloop"])
+    assert result.exit_code == 2
+    assert "uvloop is not installed" in result.output
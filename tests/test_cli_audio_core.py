@@ -1,6 +1,7 @@
 import pytest  # type: ignore[import-not-found]
 from click.testing import CliRunner
 
+import audiomesh
 from audiomesh import cli
 
 
@@ -20,6 +21,26 @@ def test_start_success(monkeypatch: pytest.MonkeyPatch) -> None:
     assert result.output.strip() == "222"
 
 
+def test_start_profile(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    def fake_start(ip: str, name: str, profile: str) -> int:
+        calls.append(profile)
+        return 222
+
+    monkeypatch.setattr(cli, "start_stream", fake_start)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.audio_core, ["start", "127.0.0.1", "foo", "--profile", "ultra-low"]
+    )
+    assert result.exit_code == 0
+    assert calls == ["ultra-low"]
+    result = runner.invoke(
+        cli.audio_core, ["start", "127.0.0.1", "foo", "--profile", "fast"]
+    )
+    assert result.exit_code == 2
+
+
 def test_stop_success(monkeypatch: pytest.MonkeyPatch) -> None:
     calls: list[int] = []
 
@@ -43,3 +64,40 @@ def test_start_error(monkeypatch: pytest.MonkeyPatch) -> None:
     result = runner.invoke(cli.audio_core, ["start", "1.2.3.4", "foo"])
     assert result.exit_code == 1
     assert "boom" in result.output
+
+
+def test_start_many(monkeypatch: pytest.MonkeyPatch) -> None:
+    def fake_start(peer_ip: str, name: str) -> int:
+        if name == "bad":
+            raise cli.JackError("boom")  # type: ignore[attr-defined]
+        return 300 + int(peer_ip.rsplit(".", 1)[1])
+
+    monkeypatch.setattr(audiomesh, "start_stream", fake_start)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.audio_core, ["start-many", "10.0.0.1:foo", "10.0.0.2:bad", "10.0.0.3:baz"]
+    )
+    assert result.exit_code == 1
+    assert "10.0.0.1:foo: started 301" in result.output
+    assert "10.0.0.3:baz: started 303" in result.output
+    assert "10.0.0.2:bad: boom" in result.output
+
+    result = runner.invoke(cli.audio_core, ["start-many", "no-name"])
+    assert result.exit_code == 2
+
+
+def test_stop_many(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[int, float]] = []
+
+    def fake_stop(pid: int, timeout: float) -> None:
+        calls.append((pid, timeout))
+
+    monkeypatch.setattr(audiomesh, "stop_stream", fake_stop)
+    runner = CliRunner()
+    result = runner.invoke(
+        cli.audio_core,
+        ["stop-many", "11", "12", "--timeout", "1", "--concurrency", "1"],
+    )
+    assert result.exit_code == 0
+    assert calls == [(11, 1.0), (12, 1.0)]
+    assert result.output.splitlines() == ["11: stopped 11", "12: stopped 12"]
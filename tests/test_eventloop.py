@@ -0,0 +1,52 @@
+import asyncio
+import importlib
+import sys
+import types
+from typing import Any
+
+import pytest  # type: ignore[import-not-found]
+
+from discovery import eventloop
+from discovery.eventloop import current_event_loop, install_event_loop
+
+
+class FakePolicy(asyncio.DefaultEventLoopPolicy):
+    pass
+
+
+FakePolicy.__module__ = "uvloop"
+
+
+@pytest.fixture(autouse=True)
+def reset_policy() -> Any:
+    yield
+    asyncio.set_event_loop_policy(None)
+
+
+def _without_uvloop(monkeypatch: pytest.MonkeyPatch) -> None:
+    def import_module(name: str) -> Any:
+        raise ImportError(name)
+
+    monkeypatch.setattr(eventloop.importlib, "import_module", import_module)
+
+
+def test_falls_back_without_uvloop(monkeypatch: pytest.MonkeyPatch) -> None:
+    _without_uvloop(monkeypatch)
+    assert install_event_loop("auto") == "asyncio"
+    assert current_event_loop() == "asyncio"
+    with pytest.raises(RuntimeError):
+        install_event_loop("uvloop")
+    with pytest.raises(ValueError):
+        install_event_loop("trio")
+
+
+def test_prefers_uvloop_when_installed(monkeypatch: pytest.MonkeyPatch) -> None:
+    fake = types.ModuleType("uvloop")
+    fake.EventLoopPolicy = FakePolicy  # type: ignore[attr-defined]
+    monkeypatch.setitem(sys.modules, "uvloop", fake)
+    assert importlib.import_module("uvloop") is fake
+    assert install_event_loop("auto") == "uvloop"
+    assert current_event_loop() == "uvloop"
+    assert asyncio.run(asyncio.sleep(0, "ran")) == "ran"
+    assert install_event_loop("asyncio") == "asyncio"
+    assert current_event_loop() == "asyncio"
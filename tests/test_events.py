@@ -0,0 +1,78 @@
+import asyncio
+
+from discovery.events import EventQueue, PeerEvent
+from discovery.listener import Announcement, Listener
+
+
+def _event(kind: str, nid: bytes, port: int = 1) -> PeerEvent:
+    return PeerEvent(kind, nid, "1.1.1.1", port, 0)
+
+
+def test_queue_coalesces_per_peer() -> None:
+    queue = EventQueue(maxsize=2)
+    a, b, c = b"a" * 16, b"b" * 16, b"c" * 16
+    queue.put(_event("added", a, 1))
+    queue.put(_event("changed", b))
+    queue.put(_event("changed", a, 2))
+    queue.put(_event("removed", b))
+    queue.put(_event("added", c))
+    assert queue.dropped == 1 and queue.coalesced == 2
+
+    async def drain() -> list[PeerEvent]:
+        queue.close()
+        events = []
+        while (event := await queue.get()) is not None:
+            events.append(event)
+        return events
+
+    events = asyncio.run(drain())
+    assert [(e.kind, e.node_id, e.port) for e in events] == [
+        ("added", a, 2),
+        ("removed", b, 1),
+    ]
+
+
+def test_queue_added_then_removed_cancels() -> None:
+    queue = EventQueue()
+    queue.put(_event("added", b"a" * 16))
+    queue.put(_event("removed", b"a" * 16))
+    assert len(queue) == 0
+
+
+def test_listener_events_stream() -> None:
+    a, b = b"a" * 16, b"b" * 16
+
+    async def scenario() -> list[PeerEvent]:
+        listener = Listener(lambda *_: None, timeout=0.05)
+        listener._loop = asyncio.get_running_loop()
+        cleanup = asyncio.create_task(listener._cleanup_loop())
+        seen = []
+        async with listener.events() as events:
+            listener._handle_announcement(a, "1.1.1.1", 1, 1)
+            listener._handle_announcement(a, "1.1.1.1", 1, 2)  # heartbeat only
+            listener._handle_batch(
+                [Announcement(a, "1.1.1.2", 1, 3), Announcement(b, "2.2.2.2", 2, 3)]
+            )
+            async for event in events:
+                seen.append(event)
+                if event.kind == "removed" and len(seen) == 4:
+                    break
+        assert not listener._subscribers
+        # Iteration ends when the listener stops.
+        stream = listener.events()
+        cleanup.cancel()
+        listener._cleanup_task = cleanup
+        await listener.stop()
+        assert [e async for e in stream] == []
+        return seen
+
+    seen = asyncio.run(scenario())
+    # a's "added" and "changed" were still queued together, so they coalesce.
+    assert [(e.kind, e.node_id, e.ip) for e in seen[:2]] == [
+        ("added", a, "1.1.1.2"),
+        ("added", b, "2.2.2.2"),
+    ]
+    assert sorted((e.kind, e.node_id, e.ts) for e in seen[2:]) == [
+        ("removed", a, 3),
+        ("removed", b, 3),
+    ]
@@ -0,0 +1,182 @@
+import asyncio
+import os
+import sys
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional
+
+import pytest  # type: ignore[import-not-found]
+from click.testing import CliRunner
+
+import audiomesh
+from audiomesh import cli
+from audiomesh.hub import HubPlanner, elect_hub
+from discovery.listener import Peer
+from discovery.protocol import pack_capabilities
+
+A, B, C = (bytes([n]) * 16 for n in (1, 2, 3))
+
+
+def test_hub_goes_to_the_node_with_most_capacity() -> None:
+    nodes = {
+        A: {"free_slots": 4, "load": 10},
+        B: {"free_slots": 8, "load": 50},
+        C: {"free_slots": 8, "load": 20},
+    }
+    assert elect_hub(nodes) == C
+    # Overloaded nodes are passed over.
+    assert elect_hub(nodes, max_load=15) == A
+    # Too few slots for the mesh: fall back to ranking everyone.
+    assert elect_hub({A: {"free_slots": 1}, B: {"free_slots": 1}, C: {}}) == A
+    assert elect_hub({}) is None
+
+
+def test_ties_and_serving_hubs() -> None:
+    assert elect_hub({B: {}, A: {}}) == A
+    # A serving hub keeps the role even if another node has more room.
+    assert elect_hub({A: {"free_slots": 9}, C: {"free_slots": 2, "hub": 1}}) == C
+    # Two serving hubs converge on the lower id.
+    assert elect_hub({B: {"hub": 1}, C: {"hub": 1}}) == B
+
+
+class FakeSupervisor:
+    def __init__(self) -> None:
+        self.sessions: Dict[str, tuple[str, Optional[bytes], str]] = {}
+        self.moves: List[tuple[bytes, str]] = []
+
+    def add(
+        self,
+        peer_ip: str,
+        client_name: str,
+        node_id: Optional[bytes] = None,
+        *,
+        mode: str = "client",
+    ) -> None:
+        self.sessions[client_name] = (peer_ip, node_id, mode)
+
+    async def remove(self, client_name: str) -> None:
+        del self.sessions[client_name]
+
+    def peer_seen(self, node_id: bytes, ip: str) -> None:
+        self.moves.append((node_id, ip))
+
+    async def close(self) -> None:
+        self.sessions.clear()
+
+
+class FakeAnnouncer:
+    def __init__(self) -> None:
+        self.capabilities: Mapping[str, int] = {}
+
+    def set_capabilities(self, capabilities: Mapping[str, int]) -> None:
+        self.capabilities = capabilities
+
+
+def _peer(ip: str, **caps: int) -> Peer:
+    return Peer(ip, 4464, pack_capabilities(caps))
+
+
+def test_planner_joins_hub_and_fails_over() -> None:
+    supervisor = FakeSupervisor()
+    announcer = FakeAnnouncer()
+    planner = HubPlanner(
+        B,
+        capabilities={"free_slots": 4},
+        announcer=announcer,  # type: ignore[arg-type]
+        supervisor=supervisor,  # type: ignore[arg-type]
+    )
+
+    async def scenario() -> None:
+        peers = {A: _peer("10.0.0.1", free_slots=8), C: _peer("10.0.0.3")}
+        assert await planner.replan(peers) == A
+        assert planner.role == "client"
+        assert supervisor.sessions == {"audiomesh-hub": ("10.0.0.1", A, "client")}
+
+        # The hub moves to a new address: the client follows it.
+        peers[A] = _peer("10.0.0.9", free_slots=8)
+        await planner.replan(peers)
+        assert supervisor.moves == [(A, "10.0.0.9")]
+
+        # The hub is gone: this node has the most room left and takes over.
+        del peers[A]
+        assert await planner.replan(peers) == B
+        assert planner.role == "hub"
+        # The hub node joins its own mix through a loopback client.
+        assert supervisor.sessions == {
+            "audiomesh-hub-server": ("", B, "hub"),
+            "audiomesh-hub": ("127.0.0.1", None, "client"),
+        }
+        assert announcer.capabilities == {"free_slots": 4, "hub": 1}
+
+        # A serving hub with a lower id appears: step down and join it.
+        peers[A] = _peer("10.0.0.1", hub=1)
+        assert await planner.replan(peers) == A
+        assert supervisor.sessions == {"audiomesh-hub": ("10.0.0.1", A, "client")}
+        assert announcer.capabilities == {"free_slots": 4}
+
+        await planner.close()
+        assert planner.role == "idle" and not supervisor.sessions
+
+    asyncio.run(scenario())
+
+
+def test_planner_ignores_provisional_peers() -> None:
+    planner = HubPlanner(B, supervisor=FakeSupervisor())  # type: ignore[arg-type]
+    stale = _peer("10.0.0.1", hub=1)
+    stale.provisional = True
+    assert asyncio.run(planner.replan({A: stale})) == B
+
+
+def test_start_hub_async_runs_hub_server(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    script = tmp_path / "jacktrip"
+    script.write_text(f"#!{sys.executable}\nimport sys\nprint(*sys.argv[1:])\n")
+    os.chmod(script, 0o755)
+    monkeypatch.setenv("AUDIOMESH_JACKTRIP", str(script))
+    monkeypatch.setattr(audiomesh, "_ASYNC_PROCESSES", {})
+
+    async def scenario() -> int:
+        pid = await audiomesh.start_hub_async("ultra-low", capture=True)
+        await audiomesh.wait_stream(pid)
+        return pid
+
+    pid = asyncio.run(scenario())
+    assert audiomesh.stream_output(pid) == ["-S -p 2 -q 2 -r 1"]
+
+
+def test_cli_hub(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: List[tuple[Any, ...]] = []
+
+    async def fake_run(*args: Any) -> None:
+        calls.append(args)
+
+    loops: List[str] = []
+    monkeypatch.setattr(cli, "_run_hub", fake_run)
+    monkeypatch.setattr(cli, "install_event_loop", lambda name: loops.append(name))
+    runner = CliRunner()
+    node = "01" * 16
+    result = runner.invoke(
+        cli.audio_core,
+        ["hub", "--node-id", node, "--free-slots", "12", "--loop", "asyncio"],
+    )
+    assert result.exit_code == 0, result.output
+    assert calls == [(A, "audiomesh-hub", "0.0.0.0", {"free_slots": 12}, 80, None)]
+    assert loops == ["asyncio"]
+    result = runner.invoke(cli.audio_core, ["hub", "--node-id", "abc"])
+    assert result.exit_code == 2
+
+
+def test_hub_node_joins_its_own_mix() -> None:
+    supervisor = FakeSupervisor()
+    planner = HubPlanner(A, supervisor=supervisor)  # type: ignore[arg-type]
+
+    async def scenario() -> None:
+        assert await planner.replan({}) == A
+        # Patch mode 2 leaves the server's ports out: without a client of
+        # its own, the hub node would neither hear nor be heard.
+        assert supervisor.sessions["audiomesh-hub"] == ("127.0.0.1", None, "client")
+        assert supervisor.sessions["audiomesh-hub-server"][2] == "hub"
+        await planner.close()
+        assert not supervisor.sessions
+
+    asyncio.run(scenario())
@@ -0,0 +1,122 @@
+import asyncio
+import socket
+from typing import Any
+
+import pytest  # type: ignore
+
+from discovery import interfaces
+from discovery.announcer import Announcer
+from discovery.interfaces import resolve_interfaces
+from discovery.listener import Listener
+from discovery.protocol import pack_announcement
+from discovery.sharded import ShardedListener
+from discovery.snapshot import export_peer
+
+
+@pytest.fixture
+def fake_nics(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        interfaces,
+        "interface_addresses",
+        lambda: {"lo": "127.0.0.1", "eth0": "10.0.0.5", "eth1": "10.1.0.5"},
+    )
+
+
+def test_resolve_interfaces(fake_nics: None) -> None:
+    assert resolve_interfaces("all") == ["10.0.0.5", "10.1.0.5"]
+    assert resolve_interfaces("eth1, 192.168.1.2,eth1") == ["10.1.0.5", "192.168.1.2"]
+    assert resolve_interfaces(["lo", "all"]) == ["127.0.0.1", "10.0.0.5", "10.1.0.5"]
+    with pytest.raises(ValueError):
+        resolve_interfaces("wlan9")
+    with pytest.raises(ValueError):
+        resolve_interfaces([])
+
+
+def test_listener_merges_peer_across_interfaces() -> None:
+    events: list[tuple[Any, ...]] = []
+
+    class Loop:
+        def time(self) -> float:
+            return 1.0
+
+    listener = Listener(
+        lambda *a: events.append(a), interfaces=["10.0.0.5", "10.1.0.5"]
+    )
+    listener._loop = Loop()  # type: ignore[assignment]
+    nid = b"m" * 16
+    listener._handle_announcement(nid, "10.0.0.9", 7000, 1, b"", "10.0.0.5")
+    listener._handle_announcement(nid, "10.1.0.9", 7000, 1, b"", "10.1.0.5")
+    listener._handle_announcement(nid, "10.0.0.9", 7000, 2, b"", "10.0.0.5")
+    listener._handle_announcement(nid, "10.1.0.9", 7001, 2, b"", "10.1.0.5")
+    peer = listener.peers[nid]
+    assert peer.interfaces == {"10.0.0.5": "10.0.0.9", "10.1.0.5": "10.1.0.9"}
+    # The secondary address never flaps the peer; a port change still counts.
+    assert events == [(nid, "10.0.0.9", 7000, 1), (nid, "10.0.0.9", 7001, 2)]
+    entry = export_peer(listener, nid, now=10.0)
+    assert entry is not None and entry["interfaces"] == peer.interfaces
+
+
+def test_sharded_listener_rejects_interfaces() -> None:
+    with pytest.raises(ValueError):
+        ShardedListener(lambda *a: None, interfaces=["127.0.0.1"])
+
+
+def test_listener_opens_socket_per_interface() -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    async def scenario() -> dict[str, str]:
+        listener = Listener(lambda *a: None, interfaces=["127.0.0.1"], port=port)
+        await listener.start()
+        with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as send:
+            send.sendto(pack_announcement(b"a" * 16, 1, 1), ("127.0.0.1", port))
+        for _ in range(50):
+            if listener.peers:
+                break
+            await asyncio.sleep(0.01)
+        await listener.stop()
+        return listener.peers[b"a" * 16].interfaces
+
+    assert asyncio.run(scenario()) == {"127.0.0.1": "127.0.0.1"}
+
+
+def test_announcer_sends_on_every_interface(monkeypatch: pytest.MonkeyPatch) -> None:
+    sent: list[Any] = []
+    bound: list[Any] = []
+
+    class Transport:
+        def sendto(self, data: bytes, addr: Any) -> None:
+            sent.append(addr)
+
+        def close(self) -> None:
+            pass
+
+    class Sock:
+        def setsockopt(self, *args: Any) -> None:
+            pass
+
+        def bind(self, addr: Any) -> None:
+            bound.append(addr)
+
+    class Loop:
+        async def create_datagram_endpoint(self, *a: Any, **k: Any) -> Any:
+            return Transport(), None
+
+        def time(self) -> float:
+            return 1.0
+
+    async def scenario() -> None:
+        loop = Loop()
+        monkeypatch.setattr(asyncio, "get_event_loop", lambda: loop)
+        monkeypatch.setattr(socket, "socket", lambda *a, **k: Sock())
+        ann = Announcer(b"a" * 16, 5001, interfaces="10.0.0.5,10.1.0.5")
+        await ann.start()
+        sent.clear()
+        await ann._send_announcement()
+        assert len(sent) == 2
+        await ann.stop()
+
+    asyncio.run(scenario())
+    assert ("10.0.0.5", 0) in bound and ("10.1.0.5", 0) in bound
+    assert bound.count(("", 50001)) == 2
@@ -0,0 +1,102 @@
+import math
+import shutil
+import socket
+import subprocess
+from typing import Any
+
+import pytest  # type: ignore[import-not-found]
+
+import audiomesh
+from audiomesh import latency
+from audiomesh.latency import (
+    PROFILES,
+    LinkSample,
+    Profile,
+    choose_profile,
+    measure_link,
+    resolve_profile,
+)
+from audiomesh.pool import SessionPool
+from audiomesh.supervisor import Session, Supervisor
+
+
+def test_clean_lan_gets_the_smallest_buffer() -> None:
+    profile = choose_profile(LinkSample(rtt_ms=0.3, jitter_ms=0.05, loss=0.0))
+    assert (profile.queue, profile.redundancy) == (2, 1)
+    # Connect timings on loopback show this much scheduler noise.
+    assert choose_profile(LinkSample(0.1, 0.59, 0.0)).queue == 2
+    assert profile.queue < PROFILES["balanced"].queue
+
+
+def test_lossy_jittery_link_gets_headroom() -> None:
+    profile = choose_profile(LinkSample(rtt_ms=30.0, jitter_ms=6.0, loss=0.2))
+    assert profile == Profile("auto", 8, 3)
+    assert choose_profile(LinkSample(1.0, 100.0, 0.05)) == Profile("auto", 16, 2)
+
+
+def test_unreachable_peer_gets_robust_profile(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    def unreachable(*args: Any, **kwargs: Any) -> socket.socket:
+        raise socket.timeout("timed out")
+
+    monkeypatch.setattr(socket, "create_connection", unreachable)
+    sample = measure_link("10.9.9.9", samples=3)
+    assert sample.loss == 1 and math.isinf(sample.rtt_ms)
+    assert choose_profile(sample).args() == ["-q", "8", "-r", "2"]
+
+
+def test_refused_probes_count_as_answers() -> None:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    sample = measure_link("127.0.0.1", port=port, samples=3)
+    assert sample.loss == 0
+    assert 0 <= sample.rtt_ms < 100
+
+
+def test_resolve_profile(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(
+        latency, "measure_link", lambda peer_ip: LinkSample(0.2, 0.0, 0.0)
+    )
+    assert resolve_profile(None, "10.0.0.2") is None
+    assert resolve_profile("robust", "10.0.0.2") == PROFILES["robust"]
+    assert resolve_profile("auto", "10.0.0.2") == Profile("auto", 2, 1)
+    with pytest.raises(ValueError):
+        resolve_profile("fastest", "10.0.0.2")
+    with pytest.raises(ValueError):
+        SessionPool(1, profile="auto")
+
+
+def test_start_stream_passes_profile(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+
+    class DummyProc:
+        pid = 42
+
+        def __init__(self, cmd: list[str], **kwargs: Any) -> None:
+            calls.append(cmd)
+
+    monkeypatch.setattr(shutil, "which", lambda name: "/usr/bin/jacktrip")
+    monkeypatch.setattr(subprocess, "Popen", DummyProc)
+    audiomesh.start_stream("10.0.0.2", "a", "ultra-low")
+    assert calls == [
+        ["/usr/bin/jacktrip", "-C", "10.0.0.2", "--clientname", "a", "-q", "2"]
+        + ["-r", "1"]
+    ]
+
+
+def test_supervisor_prefers_discovery_link_stats() -> None:
+    class FakeListener:
+        def link_stats(self, node_id: bytes) -> Any:
+            if node_id == b"a" * 16:
+                return {"jitter_ms": 3.0, "loss": 0.05}
+            return None
+
+    sup = Supervisor(profile="auto")
+    known = Session("10.0.0.1", "a", b"a" * 16)
+    unknown = Session("10.0.0.2", "b", b"b" * 16)
+    assert sup._profile_for(known) == "auto"  # not following discovery
+    sup._listener = FakeListener()  # type: ignore[assignment]
+    assert sup._profile_for(known) == Profile("auto", 4, 2)
+    assert sup._profile_for(unknown) == "auto"
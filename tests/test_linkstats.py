@@ -0,0 +1,73 @@
+import random
+
+import pytest  # type: ignore
+
+from discovery.linkstats import LinkStats
+
+
+def _feed(stats: LinkStats, stamps: list[int], delay: float = 0.0) -> None:
+    for ts in stamps:
+        stats.update(ts, ts / 1000 + 100.0 + delay)
+
+
+def test_clean_link_has_no_jitter_or_loss() -> None:
+    stats = LinkStats()
+    _feed(stats, [i * 1000 for i in range(20)])
+    assert stats.samples == 20
+    assert stats.jitter == pytest.approx(0.0)
+    assert stats.loss == 0.0
+    assert stats.interval == pytest.approx(1000.0)
+    assert stats.offset == pytest.approx(100_000.0)
+
+
+def test_jitter_tracks_arrival_variation() -> None:
+    stats = LinkStats()
+    for i in range(40):
+        stats.update(i * 1000, 100.0 + i + (0.01 if i % 2 else 0.0))
+    # Every interval is 10ms early or late; the estimator converges towards 10.
+    assert 6.0 < stats.jitter <= 10.0
+
+
+def test_missed_announcements_raise_loss() -> None:
+    stats = LinkStats()
+    stamps = [i * 1000 for i in range(10)]
+    stamps += [12_000, 13_000, 16_000, 17_000]
+    _feed(stats, stamps)
+    assert stats.loss > 0.05
+    assert stats.interval == pytest.approx(1000.0)
+    before = stats.loss
+    _feed(stats, [18_000 + i * 1000 for i in range(10)])
+    assert stats.loss < before
+
+
+@pytest.mark.parametrize(
+    "rate, low, high",
+    [(0.02, 0.015, 0.025), (0.1, 0.08, 0.11), (0.2, 0.16, 0.21), (0.3, 0.23, 0.31)],
+)
+def test_loss_is_calibrated(rate: float, low: float, high: float) -> None:
+    rng = random.Random(1)
+    stats = LinkStats()
+    readings = []
+    for i in range(20_000):
+        if i > 5 and rng.random() < rate:
+            continue
+        stats.update(i * 1000, i * 1.0)
+        if i > 2000:
+            readings.append(stats.loss)
+    assert low <= sum(readings) / len(readings) <= high
+
+
+def test_interval_follows_sender_backoff_and_burst() -> None:
+    stats = LinkStats()
+    _feed(stats, [0, 250, 500, 750])
+    _feed(stats, [1750, 2750, 3750, 4750])
+    assert stats.interval == pytest.approx(1000.0)
+    _feed(stats, [4850, 4950])
+    assert stats.interval == pytest.approx(100.0)
+
+
+def test_duplicates_are_ignored() -> None:
+    stats = LinkStats()
+    _feed(stats, [0, 1000, 1000, 500, 2000])
+    assert stats.samples == 3
+    assert stats.as_dict()["samples"] == 3
@@ -0,0 +1,128 @@
+import asyncio
+import io
+import json
+import threading
+from typing import Any
+
+import pytest  # type: ignore
+
+from audiomesh import ndjson
+from audiomesh.ndjson import NDJSONWriter
+
+
+def _lines(stream: io.BytesIO) -> list[dict[str, Any]]:
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_dumps_without_orjson(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(ndjson, "orjson", None)
+    assert ndjson.dumps({"event": "added", "id": "ab"}) == (
+        b'{"event":"added","id":"ab"}\n'
+    )
+
+
+def test_writer_batches_in_order() -> None:
+    out = io.BytesIO()
+    writer = NDJSONWriter(out)
+    writer.emit({"event": "added", "id": "a"})
+    writer.emit({"event": "added", "id": "b"})
+    writer.emit({"event": "removed", "id": "a"})
+    assert out.getvalue() == b""
+    asyncio.run(writer.flush())
+    assert [(m["event"], m["id"]) for m in _lines(out)] == [
+        ("added", "a"),
+        ("added", "b"),
+        ("removed", "a"),
+    ]
+    assert writer.written == 3 and writer.pending == 0
+
+
+def test_writer_coalesces_per_peer_when_full() -> None:
+    out = io.BytesIO()
+    writer = NDJSONWriter(out, max_pending=2)
+    writer.emit({"event": "added", "id": "a", "port": 1})
+    writer.emit({"event": "changed", "id": "b", "port": 1})
+    writer.emit({"event": "changed", "id": "a", "port": 2})
+    writer.emit({"event": "removed", "id": "b"})
+    writer.emit({"event": "added", "id": "c"})
+    asyncio.run(writer.flush())
+    assert _lines(out) == [
+        {"event": "added", "id": "a", "port": 2},
+        {"event": "removed", "id": "b"},
+    ]
+    assert writer.coalesced == 2 and writer.dropped == 1
+
+
+def test_writer_coalesce_cancels_unseen_peer() -> None:
+    out = io.BytesIO()
+    writer = NDJSONWriter(out, max_pending=1)
+    writer.emit({"event": "added", "id": "a"})
+    writer.emit({"event": "removed", "id": "a"})
+    assert writer.pending == 0
+    writer.emit({"event": "added", "id": "b"})
+    asyncio.run(writer.flush())
+    assert _lines(out) == [{"event": "added", "id": "b"}]
+
+
+def test_writer_coalesce_keeps_state_under_link_updates() -> None:
+    out = io.BytesIO()
+    writer = NDJSONWriter(out, max_pending=1)
+    writer.emit({"event": "changed", "id": "a", "port": 2})
+    writer.emit({"event": "link", "id": "a", "link": {"loss": 0.1}})
+    asyncio.run(writer.flush())
+    assert _lines(out) == [
+        {"event": "changed", "id": "a", "port": 2, "link": {"loss": 0.1}}
+    ]
+
+
+def test_writer_drop_policy() -> None:
+    out = io.BytesIO()
+    writer = NDJSONWriter(out, max_pending=1, overflow="drop")
+    writer.emit({"event": "added", "id": "a", "port": 1})
+    writer.emit({"event": "changed", "id": "a", "port": 2})
+    asyncio.run(writer.flush())
+    assert _lines(out) == [{"event": "added", "id": "a", "port": 1}]
+    assert writer.dropped == 1
+    with pytest.raises(ValueError):
+        NDJSONWriter(out, overflow="block")
+
+
+def test_writer_stops_on_closed_pipe() -> None:
+    class BrokenPipe(io.BytesIO):
+        def write(self, data: Any) -> int:
+            raise BrokenPipeError
+
+    writer = NDJSONWriter(BrokenPipe())
+
+    async def scenario() -> None:
+        writer.start()
+        writer.emit({"event": "added", "id": "a"})
+        await writer.stop()
+        writer.emit({"event": "added", "id": "b"})
+
+    asyncio.run(scenario())
+    assert writer.closed and writer.dropped == 2
+
+
+def test_writer_stop_gives_up_on_blocked_reader() -> None:
+    unblocked = threading.Event()
+
+    class Blocked(io.BytesIO):
+        def write(self, data: Any) -> int:
+            unblocked.wait(5)
+            return super().write(data)
+
+    out = Blocked()
+    writer = NDJSONWriter(out, flush_interval=0.01, stop_timeout=0.05)
+
+    async def scenario() -> None:
+        writer.start()
+        writer.emit({"event": "added", "id": "a"})
+        await asyncio.sleep(0.05)
+        writer.emit({"event": "added", "id": "b"})
+        await asyncio.wait_for(writer.stop(), 1)
+        assert writer.closed and writer.dropped == 2
+        unblocked.set()
+
+    asyncio.run(scenario())
+    assert writer.written == 0 and writer.dropped == 2
@@ -0,0 +1,48 @@
+import asyncio
+
+from audiomesh.output import StreamMetrics, StreamOutput
+
+JACKTRIP_LOG = [
+    b"JackTrip: Buffer Size = 128\n",
+    b"Received Connection from Peer!\n",
+    b"UDP WAITED MORE THAN 30ms.\n",
+    b"Ring buffer underrun\n",
+    b"Ring buffer under-run\n",
+    b"Ring buffer overflow\n",
+    b"Received Connection from Peer!\n",
+    b"Buffer size: 256\n",
+]
+
+
+def test_output_is_parsed_into_counters() -> None:
+    output = StreamOutput()
+    for line in JACKTRIP_LOG:
+        output.feed(line)
+    assert output.metrics() == StreamMetrics(
+        lines=8, underruns=2, overflows=1, reconnects=1, buffer_size=256
+    )
+
+
+def test_output_keeps_only_the_last_lines() -> None:
+    seen: list[bytes] = []
+    output = StreamOutput(maxlen=2, on_line=seen.append)
+    for line in JACKTRIP_LOG:
+        output.feed(line)
+    assert output.lines() == ["Received Connection from Peer!", "Buffer size: 256"]
+    assert output.metrics().lines == 8
+    assert seen == JACKTRIP_LOG
+
+
+def test_capture_reads_until_eof() -> None:
+    async def scenario() -> StreamOutput:
+        reader = asyncio.StreamReader(limit=64)
+        reader.feed_data(b"Ring buffer underrun\n" + b"x" * 100 + b"\nlast\n")
+        reader.feed_eof()
+        output = StreamOutput()
+        await output.capture(reader)
+        return output
+
+    output = asyncio.run(scenario())
+    # The over-long line is skipped.
+    assert output.lines() == ["Ring buffer underrun", "last"]
+    assert output.metrics().underruns == 1
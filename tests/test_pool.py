@@ -0,0 +1,102 @@
+import asyncio
+import os
+import re
+import signal
+from pathlib import Path
+from typing import Callable
+
+import pytest  # type: ignore[import-not-found]
+
+import audiomesh
+from audiomesh import pool as pool_module
+from audiomesh.pool import SessionPool
+
+
+@pytest.fixture
+def pool_jacktrip(jacktrip_executable: Callable[[str], Path]) -> Path:
+    """A ``jacktrip -s`` stand-in that waits for its peer."""
+    return jacktrip_executable("waiter")
+
+
+def test_pool_hands_out_ready_sessions(pool_jacktrip: Path) -> None:
+    async def scenario() -> None:
+        pool = SessionPool(2, base_port=5000)
+        await pool.start()
+        assert pool.idle == 2
+
+        slots = await asyncio.gather(*(pool.acquire("10.0.0.1") for _ in range(3)))
+        # Two from the pool, one spawned on demand, each on its own port.
+        assert len({slot.port for slot in slots}) == 3
+        assert all(slot.ready.is_set() and slot.alive for slot in slots)
+        streams = {r.pid: r for r in audiomesh.list_streams()}
+        assert streams[slots[0].pid].peer_ip == "10.0.0.1"
+        assert streams[slots[0].pid].client_name == slots[0].client_name
+
+        # The pool tops itself back up in the background.
+        while pool.idle < 2:
+            await asyncio.sleep(0.01)
+        await pool.wait_ready()
+
+        for slot in slots:
+            await pool.release(slot)
+        await pool.close()
+        assert audiomesh.list_streams() == []
+        for slot in slots:
+            with pytest.raises(ProcessLookupError):
+                os.kill(slot.pid, 0)
+
+    asyncio.run(scenario())
+
+
+def test_pool_replaces_sessions_that_die(
+    pool_jacktrip: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(pool_module, "RESPAWN_DELAY", 0.01)
+
+    async def scenario() -> None:
+        pool = SessionPool(1, base_port=6000)
+        await pool.start()
+        dead = pool._idle[0]
+        os.kill(dead.pid, signal.SIGKILL)
+        while not pool.idle or pool._idle[0] is dead:
+            await asyncio.sleep(0.01)
+        slot = await pool.acquire("10.0.0.2")
+        assert slot.pid != dead.pid and slot.alive
+        await pool.release(slot)
+        await pool.close()
+
+    asyncio.run(scenario())
+
+
+def test_pool_start_fails_for_broken_jacktrip(
+    pool_jacktrip: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setenv("FAKE_JACKTRIP_FAIL", "1")
+
+    async def scenario() -> None:
+        pool = SessionPool(2, base_port=6000)
+        with pytest.raises(audiomesh.JackError):
+            await pool.start()
+        assert pool.idle == 0
+
+    asyncio.run(scenario())
+
+
+def test_pool_stops_slots_that_never_get_ready(pool_jacktrip: Path) -> None:
+    async def scenario() -> None:
+        never = re.compile(b"never printed")
+        pool = SessionPool(2, base_port=6000, ready_pattern=never, ready_timeout=0.2)
+        with pytest.raises(audiomesh.JackError):
+            await pool.start()
+        assert pool.idle == 0 and audiomesh.list_streams() == []
+
+        pool = SessionPool(1, base_port=6000, ready_pattern=never, ready_timeout=0.2)
+        with pytest.raises(audiomesh.JackError):
+            await pool.acquire("10.0.0.2")
+        # The claimed slot was stopped; only the idle refill is left.
+        idle = {slot.pid for slot in pool._idle}
+        assert {r.pid for r in audiomesh.list_streams()} <= idle
+        await pool.close()
+        assert audiomesh.list_streams() == []
+
+    asyncio.run(scenario())
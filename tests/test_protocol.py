@@ -1,6 +1,17 @@
 import uuid
 
-from discovery.protocol import pack_announcement, unpack_announcement
+import pytest  # type: ignore[import-not-found]
+
+from discovery.protocol import (
+    decode_announcement,
+    pack_announcement,
+    pack_announcement_v2,
+    pack_capabilities,
+    pack_query,
+    unpack_announcement,
+    unpack_capabilities,
+    unpack_query,
+)
 
 
 def test_pack_unpack_roundtrip() -> None:
@@ -8,3 +19,53 @@ def test_pack_unpack_roundtrip() -> None:
     packet = pack_announcement(node_id, 1234, 42)
     res = unpack_announcement(packet)
     assert res == (node_id, 1234, 42)
+
+
+def test_v2_roundtrip_with_capabilities() -> None:
+    node_id = uuid.uuid4().bytes
+    caps = pack_capabilities({"channels": 2, "sample_rate": 48000, "load": 30})
+    packet = pack_announcement_v2(node_id, 1234, 42, caps)
+    decoded = decode_announcement(packet)
+    assert decoded is not None
+    assert decoded[:3] == (node_id, 1234, 42)
+    assert unpack_capabilities(decoded[3]) == {
+        "channels": 2,
+        "sample_rate": 48000,
+        "load": 30,
+    }
+
+
+def test_decode_accepts_v1_and_rejects_garbage() -> None:
+    node_id = uuid.uuid4().bytes
+    assert decode_announcement(pack_announcement(node_id, 1, 2)) == (
+        node_id,
+        1,
+        2,
+        b"",
+    )
+    assert decode_announcement(b"bad") is None
+    v3 = bytearray(pack_announcement_v2(node_id, 1, 2))
+    v3[2] = 3
+    assert decode_announcement(bytes(v3)) is None
+
+
+def test_unknown_capabilities_are_skipped() -> None:
+    caps = b"\x7f\x03abc" + pack_capabilities({"free_slots": 7})
+    assert unpack_capabilities(caps) == {"free_slots": 7}
+    with pytest.raises(ValueError):
+        unpack_capabilities(b"\x01\x05\x00")
+
+
+@pytest.mark.parametrize(
+    "caps", [{"free_slots": 70000}, {"load": -1}, {"channels": "2"}]
+)
+def test_pack_capabilities_rejects_out_of_range(caps: dict) -> None:
+    with pytest.raises(ValueError):
+        pack_capabilities(caps)
+
+
+def test_query_roundtrip() -> None:
+    node_id = uuid.uuid4().bytes
+    assert unpack_query(pack_query(node_id)) == node_id
+    assert unpack_query(pack_announcement(node_id, 1, 2)) is None
+    assert unpack_query(b"XYZ\x01" + node_id) is None
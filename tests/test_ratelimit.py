@@ -0,0 +1,48 @@
+from discovery.protocol import pack_announcement, pack_announcement_v2
+from discovery.ratelimit import IngestGuard, KeyedRateLimiter, TokenBucket
+
+
+def test_token_bucket_refills_at_rate() -> None:
+    bucket = TokenBucket(rate=10.0, burst=2.0, now=0.0)
+    assert bucket.allow(0.0)
+    assert bucket.allow(0.0)
+    assert not bucket.allow(0.0)
+    assert bucket.dropped == 1
+    assert bucket.allow(0.1)
+    assert not bucket.allow(0.1)
+    assert bucket.idle(1.0)
+
+
+def test_keyed_limiter_isolates_keys() -> None:
+    limiter: KeyedRateLimiter[str] = KeyedRateLimiter(1.0, burst=1.0)
+    assert limiter.allow("noisy", 0.0)
+    assert not limiter.allow("noisy", 0.0)
+    assert limiter.allow("quiet", 0.0)
+    assert limiter.dropped == 1
+    assert limiter.dropped_by_key() == {"noisy": 1}
+
+
+def test_keyed_limiter_bounds_key_count() -> None:
+    limiter: KeyedRateLimiter[int] = KeyedRateLimiter(1.0, max_keys=8)
+    for key in range(100):
+        limiter.allow(key, 0.0)
+    assert len(limiter._buckets) <= 8
+
+
+def test_ingest_guard_limits_source_and_node() -> None:
+    guard = IngestGuard(source_rate=100.0, node_rate=1.0)
+    v1 = pack_announcement(b"a" * 16, 5000, 1)
+    v2 = pack_announcement_v2(b"a" * 16, 5000, 2)
+    assert guard.admit(v1, len(v1), "10.0.0.1", 0.0)
+    assert guard.admit(v2, len(v2), "10.0.0.1", 0.0)
+    # Burst of two used up; the same node from another address is dropped too.
+    assert not guard.admit(v1, len(v1), "10.0.0.2", 0.0)
+    other = pack_announcement(b"b" * 16, 5000, 1)
+    assert guard.admit(other, len(other), "10.0.0.1", 0.0)
+    assert guard.drops == {"source": 0, "node": 1}
+
+    flood = IngestGuard(source_rate=1.0)
+    assert flood.admit(b"junk", 4, "10.0.0.9", 0.0)
+    assert flood.admit(b"junk", 4, "10.0.0.9", 0.0)
+    assert not flood.admit(b"junk", 4, "10.0.0.9", 0.0)
+    assert flood.drops == {"source": 1, "node": 0}
@@ -0,0 +1,94 @@
+import asyncio
+import json
+import os
+import signal
+import subprocess
+from typing import Callable
+
+import pytest  # type: ignore[import-not-found]
+from click.testing import CliRunner
+
+import audiomesh
+from audiomesh import cli
+from audiomesh.registry import StreamRegistry, is_alive
+
+
+@pytest.fixture
+def other_process(
+    spawn_script: Callable[[str], subprocess.Popen[bytes]],
+) -> subprocess.Popen[bytes]:
+    """A stream registered as if by another ``audio-core`` invocation."""
+    proc = spawn_script("sleeper")
+    with StreamRegistry() as registry:
+        registry.add(proc.pid, "10.0.0.9", "remote")
+    return proc
+
+
+def test_registry_tracks_liveness(other_process: subprocess.Popen[bytes]) -> None:
+    pid = other_process.pid
+    with StreamRegistry() as registry:
+        record = registry.get(pid)
+        assert record is not None and record.client_name == "remote"
+        assert record.start_ticks is not None
+        # Same PID, different start time: a reused PID is not our stream.
+        assert not is_alive(record._replace(start_ticks=record.start_ticks + 1))
+        other_process.kill()
+        other_process.wait()
+        assert registry.records() == []
+        assert registry.get(pid) is None
+
+
+def test_stop_stream_from_another_invocation(
+    other_process: subprocess.Popen[bytes],
+) -> None:
+    assert other_process.pid not in audiomesh._PROCESSES
+    runner = CliRunner()
+    result = runner.invoke(cli.audio_core, ["list", "--format", "json"])
+    assert [s["pid"] for s in json.loads(result.output)] == [other_process.pid]
+
+    result = runner.invoke(cli.audio_core, ["stop", str(other_process.pid)])
+    assert result.exit_code == 0
+    assert other_process.wait(timeout=5) == -signal.SIGTERM
+    assert audiomesh.list_streams() == []
+
+
+def test_stop_stream_async_escalates_for_other_invocation(
+    spawn_script: Callable[[str], subprocess.Popen[bytes]],
+) -> None:
+    proc = spawn_script("stubborn")
+    with StreamRegistry() as registry:
+        registry.add(proc.pid, "10.0.0.9", "remote")
+    asyncio.run(audiomesh.stop_stream_async(proc.pid, timeout=0.2))
+    assert proc.wait(timeout=5) == -signal.SIGKILL
+    with pytest.raises(audiomesh.JackError):
+        audiomesh.stop_stream(proc.pid)
+
+
+def test_watch_streams_reaps_exited_children(
+    monkeypatch: pytest.MonkeyPatch,
+    jacktrip_script: Callable[..., list[tuple[str, str]]],
+) -> None:
+    jacktrip_script("sleeper")
+    monkeypatch.setattr(audiomesh, "_PROCESSES", {})
+
+    async def scenario() -> int:
+        watcher = audiomesh.watch_streams()
+        pid = audiomesh.start_stream("10.0.0.1", "local")
+        assert [r.pid for r in audiomesh.list_streams()] == [pid]
+        await asyncio.sleep(0.05)  # the watch is scheduled on the loop
+        assert pid in watcher
+        os.kill(pid, signal.SIGKILL)
+        for _ in range(100):
+            if pid not in audiomesh._PROCESSES:
+                break
+            await asyncio.sleep(0.01)
+        watcher.close()
+        return pid
+
+    pid = asyncio.run(scenario())
+    with pytest.raises(ChildProcessError):
+        os.waitpid(pid, os.WNOHANG)
+    with StreamRegistry() as registry:
+        # Removed on exit, not merely filtered out as stale on lookup.
+        rows = registry._db.execute("SELECT COUNT(*) FROM streams").fetchone()
+        assert rows == (0,)
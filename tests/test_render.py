@@ -0,0 +1,65 @@
+import asyncio
+import io
+from typing import Any
+
+from audiomesh.render import CLEAR_BELOW, CLEAR_LINE, NEXT_LINE, TableRenderer
+
+
+def _peers(*names: str) -> dict[str, dict[str, Any]]:
+    return {name: {"ip": "10.0.0.1", "port": 5000, "ts": 0.0} for name in names}
+
+
+def test_render_only_when_dirty() -> None:
+    out = io.StringIO()
+    renderer = TableRenderer(_peers("aa"), lambda nid: 3.0, stream=out, in_place=False)
+    assert not renderer.render()
+    renderer.mark_dirty()
+    renderer.mark_dirty()
+    assert renderer.render()
+    assert not renderer.render()
+    text = out.getvalue()
+    assert text.count("LAST SEEN") == 1
+    assert "aa" in text and "3s ago" in text
+
+
+def test_render_in_place_rewrites_changed_rows() -> None:
+    out = io.StringIO()
+    peers = _peers("aa", "bb")
+    renderer = TableRenderer(peers, lambda nid: 1.0, stream=out, in_place=True)
+    renderer.mark_dirty()
+    renderer.render()
+    first = out.getvalue()
+    out.seek(0)
+    out.truncate()
+
+    peers["bb"]["port"] = 6000
+    renderer.mark_dirty()
+    renderer.render()
+    update = out.getvalue()
+    assert update.startswith("\x1b[4F")
+    # Header, rule and the unchanged row are skipped; only "bb" is rewritten.
+    assert update.count(NEXT_LINE) == 3
+    assert update.count(CLEAR_LINE) == 1 and "6000" in update
+    assert "aa" not in update and "aa" in first
+
+    out.seek(0)
+    out.truncate()
+    del peers["bb"]
+    renderer.mark_dirty()
+    renderer.render()
+    assert out.getvalue().endswith(CLEAR_BELOW)
+
+
+def test_renderer_task_throttles_and_flushes_on_stop() -> None:
+    out = io.StringIO()
+    renderer = TableRenderer(_peers(), refresh=0.01, stream=out, in_place=False)
+
+    async def scenario() -> None:
+        renderer.start()
+        renderer.mark_dirty()
+        await asyncio.sleep(0.05)
+        renderer.mark_dirty()
+        await renderer.stop()
+
+    asyncio.run(scenario())
+    assert out.getvalue() == "no peers\nno peers\n"
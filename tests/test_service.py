@@ -0,0 +1,97 @@
+import asyncio
+import json
+from pathlib import Path
+from typing import Any
+
+from discovery.listener import Listener
+from discovery.service import PeerTableServer, fetch_peers, read_peers, subscribe_peers
+
+
+def test_peer_table_snapshot_and_deltas(tmp_path: Path) -> None:
+    path = tmp_path / "d.sock"
+
+    async def runner() -> None:
+        server: PeerTableServer
+        listener = Listener(
+            lambda nid, *_: server.publish(nid, "added"),
+            on_removed=lambda nid: server.publish(nid, "removed"),
+        )
+        listener._loop = asyncio.get_running_loop()
+        server = PeerTableServer(listener, path)
+        await server.start()
+        listener._handle_announcement(b"a" * 16, "1.1.1.1", 10, 1)
+
+        table = await fetch_peers(path)
+        assert table["version"] == 1
+        assert table["peers"][(b"a" * 16).hex()]["ip"] == "1.1.1.1"
+        sync_table = await asyncio.to_thread(read_peers, path)
+        assert sync_table["peers"].keys() == table["peers"].keys()
+
+        events: list[dict[str, Any]] = []
+
+        async def consume() -> None:
+            async for message in subscribe_peers(path):
+                events.append(message)
+                if len(events) == 3:
+                    return
+
+        task = asyncio.create_task(consume())
+        while not server._subscribers:
+            await asyncio.sleep(0.001)
+        listener._handle_announcement(b"b" * 16, "2.2.2.2", 20, 1)
+        listener._expire(b"a" * 16)
+        await asyncio.wait_for(task, 2)
+        await server.stop()
+
+        assert set(events[0]["peers"]) == {(b"a" * 16).hex()}
+        assert events[1]["event"] == "added"
+        assert events[1]["ip"] == "2.2.2.2"
+        assert events[1]["version"] == 2
+        assert events[2] == {"version": 3, "event": "removed", "id": (b"a" * 16).hex()}
+        assert not path.exists()
+
+    asyncio.run(runner())
+
+
+def test_slow_subscriber_is_dropped(tmp_path: Path) -> None:
+    async def runner() -> None:
+        listener = Listener(lambda *_: None)
+        listener._loop = asyncio.get_running_loop()
+        server = PeerTableServer(listener, tmp_path / "d.sock", max_pending=2)
+        await server.start()
+        reader, writer = await asyncio.open_unix_connection(str(server.path))
+        writer.write(b"subscribe\n")
+        await writer.drain()
+        await reader.readline()
+        for i in range(10):
+            server.publish(bytes([i]) * 16, "removed")
+        assert not server._subscribers
+        writer.close()
+        await server.stop()
+
+    asyncio.run(runner())
+
+
+def test_large_tables_are_read_whole(tmp_path: Path) -> None:
+    path = tmp_path / "d.sock"
+
+    async def runner() -> None:
+        listener = Listener(lambda *_: None)
+        listener._loop = asyncio.get_running_loop()
+        server = PeerTableServer(listener, path)
+        await server.start()
+        for n in range(1000):
+            node = n.to_bytes(16, "big")
+            for ts in (1000, 2000):
+                listener._handle_announcement(node, f"10.0.{n // 256}.{n % 256}", 1, ts)
+
+        table = await fetch_peers(path)
+        assert len(table["peers"]) == 1000
+        # Past asyncio's default 64 KiB line limit.
+        assert len(json.dumps(table)) > 64 * 1024
+        async for message in subscribe_peers(path):
+            assert len(message["peers"]) == 1000
+            break
+        await server.stop()
+
+    asyncio.run(runner())
@@ -0,0 +1,167 @@
+import asyncio
+import socket
+from typing import Any
+
+import pytest  # type: ignore
+
+from discovery import sharded
+from discovery.listener import Announcement
+from discovery.protocol import pack_announcement, pack_announcement_v2
+from discovery.sharded import (
+    ShardedListener,
+    ShardGuard,
+    decode_batch,
+    encode_batch,
+    shard_of,
+)
+
+
+def test_batch_roundtrip() -> None:
+    batch = [
+        Announcement(b"a" * 16, "10.0.0.1", 5000, 7),
+        Announcement(b"b" * 16, "10.0.0.2", 5001, 8, b"\x01\x01\x02"),
+    ]
+    received, decoded, drops = decode_batch(encode_batch(batch, 12.5, (3, 4)))
+    assert received == 12.5
+    assert decoded == batch
+    assert drops == (3, 4)
+
+
+def test_shard_guard_splits_node_ids() -> None:
+    ids = [bytes([i]) * 16 for i in range(32)]
+    guards = [ShardGuard(i, 3) for i in range(3)]
+    owners = []
+    for nid in ids:
+        pkt = (
+            pack_announcement_v2(nid, 1, 1)
+            if nid[0] % 2
+            else pack_announcement(nid, 1, 1)
+        )
+        admitted = [g.admit(pkt, len(pkt), "1.1.1.1", 0.0) for g in guards]
+        assert admitted.count(True) == 1
+        owners.append(admitted.index(True))
+    assert owners == [shard_of(nid, 3) for nid in ids]
+    assert not guards[0].admit(b"junk", 4, "1.1.1.1", 0.0)
+
+
+def test_sharded_listener_merges_workers() -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    added: list[bytes] = []
+    removed: list[bytes] = []
+    ids = [bytes([i]) * 16 for i in range(1, 21)]
+
+    async def scenario() -> None:
+        listener = ShardedListener(
+            lambda nid, *_: added.append(nid),
+            port=port,
+            workers=2,
+            fanout=False,
+            timeout=0.5,
+            on_removed=removed.append,
+        )
+        await listener.start()
+        senders = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in range(4)]
+        try:
+            for ts in (1, 2):
+                for i, nid in enumerate(ids):
+                    pkt = pack_announcement(nid, 5000, ts)
+                    senders[i % 4].sendto(pkt, ("127.0.0.1", port))
+            for _ in range(100):
+                if len(listener.peers) == len(ids):
+                    break
+                await asyncio.sleep(0.02)
+            assert sorted(listener.peers) == ids
+            for _ in range(100):
+                if len(removed) == len(ids):
+                    break
+                await asyncio.sleep(0.02)
+        finally:
+            for sock in senders:
+                sock.close()
+            await listener.stop()
+
+    asyncio.run(scenario())
+    assert sorted(added) == ids
+    assert sorted(removed) == ids
+
+
+def test_sharded_listener_reports_worker_drops() -> None:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+
+    async def scenario() -> dict[str, int]:
+        listener = ShardedListener(
+            lambda *_: None, port=port, workers=2, fanout=False, node_rate_limit=1.0
+        )
+        await listener.start()
+        try:
+            with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sender:
+                for ts in range(1, 21):
+                    pkt = pack_announcement(b"a" * 16, 5000, ts)
+                    sender.sendto(pkt, ("127.0.0.1", port))
+            for _ in range(150):
+                if listener.drops["node"] >= 15:
+                    break
+                await asyncio.sleep(0.02)
+            return listener.drops
+        finally:
+            await listener.stop()
+
+    drops = asyncio.run(scenario())
+    # A burst of two is admitted; the rest of the twenty is dropped.
+    assert drops == {"source": 0, "node": 18}
+
+
+def test_sharded_listener_restarts_dead_workers(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(sharded, "RESPAWN_DELAY", 0.01)
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    ids = [bytes([i]) * 16 for i in range(1, 21)]
+
+    async def scenario() -> None:
+        listener = ShardedListener(lambda *_: None, port=port, workers=2, fanout=False)
+        await listener.start()
+        heard: set[int] = set()
+        read_worker = listener._read_worker
+
+        def record(index: int, conn: Any) -> None:
+            heard.add(index)
+            read_worker(index, conn)
+
+        listener._read_worker = record  # type: ignore[method-assign]
+        try:
+            dead = listener._procs[0]
+            dead.kill()
+            for _ in range(500):
+                if listener._procs[0] is not dead and not listener._respawns:
+                    break
+                await asyncio.sleep(0.02)
+            assert listener._procs[0].is_alive() and not listener._respawns
+            heard.clear()
+            # The kernel spreads the senders over both workers again.
+            senders = [socket.socket(socket.AF_INET, socket.SOCK_DGRAM) for _ in ids]
+            for nid, sender in zip(ids, senders):
+                sender.sendto(pack_announcement(nid, 5000, 1), ("127.0.0.1", port))
+                sender.close()
+            for _ in range(100):
+                if len(listener.peers) == len(ids):
+                    break
+                await asyncio.sleep(0.02)
+            assert sorted(listener.peers) == ids
+            # Only readers added since are recorded: the new worker's.
+            assert heard == {0}
+        finally:
+            await listener.stop()
+
+    asyncio.run(scenario())
+
+
+def test_sharded_listener_rejects_zero_workers() -> None:
+    with pytest.raises(ValueError):
+        ShardedListener(lambda *_: None, workers=0)
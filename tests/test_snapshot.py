@@ -0,0 +1,61 @@
+import asyncio
+import json
+import time
+from pathlib import Path
+
+from discovery.listener import Listener
+from discovery.snapshot import (
+    export_peers,
+    read_snapshot,
+    restore_snapshot,
+    write_snapshot,
+)
+
+
+def test_snapshot_roundtrip_seeds_provisional_peers(tmp_path: Path) -> None:
+    path = tmp_path / "peers.json"
+    now = time.time()
+    fresh = (b"f" * 16).hex()
+    stale = (b"o" * 16).hex()
+    write_snapshot(
+        path,
+        {
+            fresh: {"ip": "1.1.1.1", "port": 10, "seen": now - 2, "caps": "010102"},
+            stale: {"ip": "2.2.2.2", "port": 20, "seen": now - 60},
+        },
+    )
+    assert not list(tmp_path.glob(".peers.json.*"))
+
+    events: list[bytes] = []
+    loop = asyncio.new_event_loop()
+    listener = Listener(lambda nid, *_: events.append(nid), timeout=10.0)
+    listener._loop = loop
+
+    restored = restore_snapshot(listener, path, now=now)
+    assert list(restored) == [fresh]
+    peer = listener.peers[b"f" * 16]
+    assert peer.provisional
+    assert peer.capabilities == {"channels": 2}
+    age = listener.age(b"f" * 16)
+    assert age is not None and 1.5 < age < 3
+    assert events == []
+
+    table = export_peers(listener, now=now)
+    assert table[fresh]["provisional"] is True
+
+    # Confirmation by a real announcement counts as a state change.
+    listener._handle_announcement(b"f" * 16, "1.1.1.1", 10, 0)
+    listener._handle_announcement(b"f" * 16, "1.1.1.1", 10, 1)
+    assert export_peers(listener)[fresh]["link"]["samples"] == 2
+    loop.close()
+    assert events == [b"f" * 16]
+    assert not listener.peers[b"f" * 16].provisional
+
+
+def test_read_snapshot_tolerates_bad_files(tmp_path: Path) -> None:
+    path = tmp_path / "peers.json"
+    assert read_snapshot(path, 10.0) == {}
+    path.write_text("{not json")
+    assert read_snapshot(path, 10.0) == {}
+    path.write_text(json.dumps({"version": 99, "peers": {}}))
+    assert read_snapshot(path, 10.0) == {}
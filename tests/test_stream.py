@@ -1,8 +1,13 @@
+import asyncio
 import os
 import shutil
 import signal
 import subprocess
-from typing import Optional
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Optional
 
 import pytest  # type: ignore
 
@@ -35,7 +40,7 @@ def test_start_stream_runs_jacktrip(monkeypatch: pytest.MonkeyPatch) -> None:
 
     assert calls == [
         (
-            ["jacktrip", "-C", "192.168.1.2", "--clientname", "mysource"],
+            ["/usr/bin/jacktrip", "-C", "192.168.1.2", "--clientname", "mysource"],
             subprocess.DEVNULL,
             subprocess.DEVNULL,
         )
@@ -107,3 +112,198 @@ def test_stop_stream_unknown_pid_raises(
 
     with pytest.raises(audiomesh.JackError):
         audiomesh.stop_stream(123)
+
+
+def test_async_stream_lifecycle(
+    fake_jacktrip: Callable[[str], list[tuple[str, ...]]],
+) -> None:
+    calls = fake_jacktrip("sleeper")
+
+    async def scenario() -> Optional[int]:
+        pid = await audiomesh.start_stream_async("192.168.1.2", "mysource")
+        proc = audiomesh._ASYNC_PROCESSES[pid]
+        await audiomesh.stop_stream_async(pid)
+        with pytest.raises(audiomesh.JackError):
+            await audiomesh.stop_stream_async(pid)
+        return proc.returncode
+
+    assert asyncio.run(scenario()) == -signal.SIGTERM
+    assert calls == [
+        ("/usr/bin/jacktrip", "-C", "192.168.1.2", "--clientname", "mysource")
+    ]
+
+
+def test_async_stop_escalates_to_sigkill(
+    fake_jacktrip: Callable[[str], list[tuple[str, ...]]],
+) -> None:
+    fake_jacktrip("stubborn")
+
+    async def scenario() -> Optional[int]:
+        pid = await audiomesh.start_stream_async("192.168.1.2", "mysource")
+        proc = audiomesh._ASYNC_PROCESSES[pid]
+        await audiomesh.stop_stream_async(pid, timeout=0.1)
+        return proc.returncode
+
+    assert asyncio.run(scenario()) == -signal.SIGKILL
+
+
+def test_async_stop_cancelled_kills_process(
+    fake_jacktrip: Callable[[str], list[tuple[str, ...]]],
+) -> None:
+    fake_jacktrip("stubborn")
+
+    async def scenario() -> Optional[int]:
+        pid = await audiomesh.start_stream_async("192.168.1.2", "mysource")
+        proc = audiomesh._ASYNC_PROCESSES[pid]
+        task = asyncio.create_task(audiomesh.stop_stream_async(pid, timeout=30))
+        await asyncio.sleep(0.1)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await asyncio.wait_for(proc.wait(), 5)
+
+    assert asyncio.run(scenario()) == -signal.SIGKILL
+
+
+def test_async_stop_cancelled_at_once_kills_process(
+    fake_jacktrip: Callable[[str], list[tuple[str, ...]]],
+) -> None:
+    fake_jacktrip("stubborn")
+
+    async def scenario() -> Optional[int]:
+        pid = await audiomesh.start_stream_async("192.168.1.2", "mysource")
+        proc = audiomesh._ASYNC_PROCESSES[pid]
+        task = asyncio.create_task(audiomesh.stop_stream_async(pid, timeout=30))
+        await asyncio.sleep(0)  # up to the stop's first await
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        return await asyncio.wait_for(proc.wait(), 5)
+
+    assert asyncio.run(scenario()) == -signal.SIGKILL
+    assert audiomesh.list_streams() == []
+
+
+def test_bulk_stop_runs_concurrently(
+    fake_jacktrip: Callable[[str], list[tuple[str, ...]]],
+) -> None:
+    fake_jacktrip("stubborn")
+
+    async def scenario() -> tuple[list[audiomesh.StreamResult], float]:
+        started = await audiomesh.start_streams(
+            [("10.0.0.1", "a"), ("10.0.0.2", "b"), ("10.0.0.3", "c")]
+        )
+        assert all(result.ok for result in started)
+        pids = [result.pid for result in started if result.pid is not None]
+        begin = time.monotonic()
+        stopped = await audiomesh.stop_streams(pids + [123], timeout=0.3)
+        return stopped, time.monotonic() - begin
+
+    results, elapsed = asyncio.run(scenario())
+    # Each stop escalates after 0.3s; in sequence this would take 0.9s.
+    assert elapsed < 0.8
+    assert [result.ok for result in results] == [True, True, True, False]
+    assert results[3] == audiomesh.StreamResult(123, "unknown stream 123")
+
+
+def test_bulk_start_respects_concurrency(monkeypatch: pytest.MonkeyPatch) -> None:
+    running = peak = 0
+
+    def fake_start(peer_ip: str, source_name: str) -> int:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        time.sleep(0.05)
+        running -= 1
+        if peer_ip == "bad":
+            raise audiomesh.JackError("jacktrip not installed")
+        return int(source_name)
+
+    monkeypatch.setattr(audiomesh, "start_stream", fake_start)
+    streams = [("10.0.0.1", str(n)) for n in range(6)] + [("bad", "0")]
+    results = asyncio.run(
+        audiomesh.start_streams(streams, concurrency=2, threaded=True)
+    )
+    assert [result.pid for result in results[:6]] == list(range(6))
+    assert results[6] == audiomesh.StreamResult(None, "jacktrip not installed")
+    assert peak == 2
+
+
+def test_jacktrip_is_resolved_once(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    lookups: list[str] = []
+
+    def which(name: str) -> str:
+        lookups.append(name)
+        return "/usr/bin/jacktrip"
+
+    monkeypatch.setattr(shutil, "which", which)
+    assert audiomesh.resolve_jacktrip() == "/usr/bin/jacktrip"
+    assert audiomesh.resolve_jacktrip() == "/usr/bin/jacktrip"
+    assert lookups == ["jacktrip"]
+
+    fake = tmp_path / "jacktrip"
+    fake.write_text("")
+    monkeypatch.setenv("AUDIOMESH_JACKTRIP", str(fake))
+    with pytest.raises(audiomesh.JackError):
+        audiomesh.resolve_jacktrip(refresh=True)
+    fake.chmod(0o755)
+    assert audiomesh.resolve_jacktrip(refresh=True) == str(fake)
+
+
+def test_async_registry_calls_run_off_the_loop(
+    monkeypatch: pytest.MonkeyPatch,
+    fake_jacktrip: Callable[[str], list[tuple[str, ...]]],
+) -> None:
+    fake_jacktrip("sleeper")
+    threads: list[threading.Thread] = []
+    real_register, real_forget = audiomesh._register, audiomesh._forget
+
+    def register(*args: Any) -> None:
+        threads.append(threading.current_thread())
+        real_register(*args)
+
+    def forget(pid: int) -> None:
+        threads.append(threading.current_thread())
+        real_forget(pid)
+
+    monkeypatch.setattr(audiomesh, "_register", register)
+    monkeypatch.setattr(audiomesh, "_forget", forget)
+
+    async def scenario() -> None:
+        pid = await audiomesh.start_stream_async("192.168.1.2", "mysource")
+        os.kill(pid, signal.SIGKILL)
+        await audiomesh.wait_stream(pid)
+        # The record is gone by the time the wait returns.
+        assert audiomesh.list_streams() == []
+
+    asyncio.run(scenario())
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+def test_async_stream_output_is_captured(monkeypatch: pytest.MonkeyPatch) -> None:
+    script = (
+        "import sys\n"
+        "print('Buffer Size = 64')\n"
+        "print('Ring buffer underrun', file=sys.stderr)\n"
+    )
+    monkeypatch.setattr(
+        audiomesh, "_jacktrip_command", lambda *_: [sys.executable, "-c", script]
+    )
+    monkeypatch.setattr(audiomesh, "_ASYNC_PROCESSES", {})
+
+    async def scenario() -> int:
+        pid = await audiomesh.start_stream_async("10.0.0.2", "a", capture=True)
+        await audiomesh.wait_stream(pid)
+        return pid
+
+    pid = asyncio.run(scenario())
+    # Still available after the process exited.
+    assert audiomesh.stream_metrics(pid) == audiomesh.StreamMetrics(
+        lines=2, underruns=1, overflows=0, reconnects=0, buffer_size=64
+    )
+    assert audiomesh.stream_output(pid) == ["Buffer Size = 64", "Ring buffer underrun"]
+    with pytest.raises(audiomesh.JackError):
+        audiomesh.stream_metrics(-1)
@@ -0,0 +1,173 @@
+import asyncio
+import signal
+from typing import Any, Callable
+
+import pytest  # type: ignore[import-not-found]
+from click.testing import CliRunner
+
+import audiomesh
+from audiomesh import cli
+from audiomesh.supervisor import Supervisor
+from discovery.events import PeerEvent
+
+
+@pytest.fixture
+def launches(
+    jacktrip_script: Callable[..., list[tuple[str, str]]],
+) -> list[tuple[str, str]]:
+    """Sessions to ``crash*`` peers crash at once; the others keep running."""
+    return jacktrip_script(
+        lambda peer_ip: "crasher" if peer_ip.startswith("crash") else "sleeper"
+    )
+
+
+async def _until(check: Callable[[], Any], timeout: float = 5.0) -> None:
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + timeout
+    while not check():
+        assert loop.time() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_backoff_is_capped_and_exponential() -> None:
+    sup = Supervisor(min_backoff=1.0, max_backoff=8.0, jitter=0.0)
+    assert [sup.backoff(n) for n in range(1, 6)] == [1.0, 2.0, 4.0, 8.0, 8.0]
+    jittered = Supervisor(min_backoff=1.0, jitter=0.1).backoff(1)
+    assert 0.9 <= jittered <= 1.1
+
+
+def test_crashed_session_is_restarted(launches: list[tuple[str, str]]) -> None:
+    async def scenario() -> None:
+        sup = Supervisor(min_backoff=0.01, max_backoff=0.05)
+        session = sup.add("crash-host", "a")
+        await _until(lambda: session.restarts >= 3)
+        assert session.last_exit == 3
+        assert session.failures >= 3
+        await sup.close()
+        assert session.state == "stopped"
+
+    asyncio.run(scenario())
+    assert launches[0] == ("crash-host", "a")
+
+
+def test_supervisor_reports_captured_metrics(launches: list[tuple[str, str]]) -> None:
+    async def scenario() -> None:
+        sup = Supervisor(min_backoff=0.01, max_backoff=0.05, capture=True)
+        session = sup.add("crash-host", "a")
+        await _until(lambda: session.restarts >= 1)
+        # Taken when the run exited, with its output read to the end.
+        assert session.as_dict()["metrics"]["underruns"] == 1
+        await sup.close()
+
+    asyncio.run(scenario())
+
+
+def test_sessions_follow_discovery(launches: list[tuple[str, str]]) -> None:
+    node = b"n" * 16
+
+    async def scenario() -> None:
+        sup = Supervisor()
+        session = sup.add("10.0.0.1", "a", parked=True)
+        assert session.state == "parked" and not launches
+
+        sup.peer_seen(node, "10.0.0.1")
+        await _until(lambda: session.state == "running")
+        first = session.pid
+        assert first is not None and [r.pid for r in audiomesh.list_streams()] == [
+            first
+        ]
+
+        sup.peer_removed(node, "10.0.0.1")
+        assert session.state == "parked"
+        await _until(lambda: not audiomesh.list_streams())
+
+        # The peer returns on a new address: resume there, bound by node id.
+        sup.peer_seen(node, "10.0.0.2")
+        await _until(lambda: session.state == "running")
+        assert session.pid != first
+        await sup.close()
+        assert audiomesh.list_streams() == []
+
+    asyncio.run(scenario())
+    assert launches == [("10.0.0.1", "a"), ("10.0.0.2", "a")]
+
+
+def test_follow_applies_listener_events(launches: list[tuple[str, str]]) -> None:
+    class FakeStream:
+        def __init__(self, events: list[PeerEvent]) -> None:
+            self.events = events
+
+        async def __aenter__(self) -> "FakeStream":
+            return self
+
+        async def __aexit__(self, *exc: object) -> None:
+            pass
+
+        def __aiter__(self) -> "FakeStream":
+            return self
+
+        async def __anext__(self) -> PeerEvent:
+            if not self.events:
+                raise StopAsyncIteration
+            return self.events.pop(0)
+
+    class FakeListener:
+        peers: dict[bytes, Any] = {}
+
+        def events(self) -> FakeStream:
+            return FakeStream(
+                [
+                    PeerEvent("added", b"x" * 16, "10.0.0.5", 4464, 1),
+                    PeerEvent("removed", b"x" * 16, "10.0.0.5", 4464, 2),
+                ]
+            )
+
+    async def scenario() -> None:
+        sup = Supervisor()
+        session = sup.add("10.0.0.5", "b", parked=True)
+        await sup.follow(FakeListener())  # type: ignore[arg-type]
+        # Resumed on "added", then parked again on "removed".
+        assert session.state == "parked"
+        assert session.node_id == b"x" * 16
+        await sup.close()
+
+    asyncio.run(scenario())
+
+
+def test_cli_supervise_watches_streams(monkeypatch: pytest.MonkeyPatch) -> None:
+    watchers: list[audiomesh.StreamWatcher] = []
+    real_watch = audiomesh.watch_streams
+
+    def watch() -> audiomesh.StreamWatcher:
+        watchers.append(real_watch())
+        return watchers[-1]
+
+    class StopNow:
+        async def wait(self) -> None:
+            return
+
+    monkeypatch.setattr(cli, "watch_streams", watch)
+    asyncio_mod: Any = cli.asyncio  # type: ignore[attr-defined]
+    monkeypatch.setattr(asyncio_mod, "Event", StopNow)
+    monkeypatch.setattr(signal, "signal", lambda *a, **k: None)
+
+    asyncio.run(cli._supervise([], False, "0.0.0.0", 0.1, 1.0))
+    assert len(watchers) == 1
+    assert watchers[0] not in audiomesh._WATCHERS
+
+
+def test_cli_supervise_installs_loop(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls: list[tuple[Any, ...]] = []
+    loops: list[str] = []
+
+    async def fake_supervise(*args: Any) -> None:
+        calls.append(args)
+
+    monkeypatch.setattr(cli, "_supervise", fake_supervise)
+    monkeypatch.setattr(cli, "install_event_loop", lambda name: loops.append(name))
+    result = CliRunner().invoke(
+        cli.audio_core, ["supervise", "10.0.0.1:a", "--loop", "asyncio"]
+    )
+    assert result.exit_code == 0, result.output
+    assert loops == ["asyncio"]
+    assert calls[0][0] == [("10.0.0.1", "a")]